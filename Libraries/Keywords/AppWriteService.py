@@ -1,10 +1,131 @@
+from robot.api import logger
 from robot.api.deco import keyword
 from appwrite.client import Client
+from appwrite.exception import AppwriteException
 from appwrite.services.databases import Databases
 from appwrite.id import ID
 from appwrite.query import Query
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import importlib
+import json
+import os
+import random
+import threading
 import time
 
+# Status codes of throttled or temporarily unavailable requests, retried with backoff by batch writes
+RETRYABLE_STATUS_CODES = (429, 503)
+# Query methods replaced by the cursor and page size of document iteration
+PAGINATION_METHODS = ("limit", "offset", "cursorAfter", "cursorBefore")
+# Attribute type in a declarative schema -> keyword method creating it
+ATTRIBUTE_CREATORS = {
+    "string": "create_string_attribute",
+    "integer": "create_integer_attribute",
+    "float": "create_float_attribute",
+    "boolean": "create_boolean_attribute",
+    "datetime": "create_datetime_attribute",
+    "email": "create_email_attribute",
+    "url": "create_url_attribute",
+    "ip": "create_ip_attribute",
+    "enum": "create_enum_attribute",
+    "relationship": "create_relationship_attribute"
+}
+# Schema option -> argument name of the creating keyword, where they differ
+ATTRIBUTE_ARGUMENTS = { "min": "min_val", "max": "max_val", "related_collection": "related_collection_id" }
+# Options compared with the existing attribute or index to report drift
+ATTRIBUTE_DRIFT_FIELDS = ("required", "array", "size", "min", "max", "default", "elements")
+INDEX_DRIFT_FIELDS = ("type", "attributes", "orders")
+# Condition operator -> builder of its query string; the null checks ignore the value
+_QUERY_OPERATORS = {
+    "equal": Query.equal,
+    "not_equal": Query.not_equal,
+    "less_than": Query.less_than,
+    "less_than_equal": Query.less_than_equal,
+    "greater_than": Query.greater_than,
+    "greater_than_equal": Query.greater_than_equal,
+    "search": Query.search,
+    "is_null": lambda field, value: Query.is_null(field),
+    "is_not_null": lambda field, value: Query.is_not_null(field),
+    "between": lambda field, value: Query.between(field, value[ 0 ], value[ 1 ]),
+    "starts_with": Query.starts_with,
+    "ends_with": Query.ends_with,
+    "contains": Query.contains
+}
+_QUERY_OPERATOR_ALIASES = { "=": "equal", "==": "equal", "!=": "not_equal", "<": "less_than",
+                            "<=": "less_than_equal", ">": "greater_than", ">=": "greater_than_equal" }
+
+
+def _freeze(value):
+    """
+    Make a query value hashable for the query caches.
+
+    Scalars are tagged with their type, as True, 1 and 1.0 are equal cache keys but different queries.
+    Raises TypeError for values that cannot be hashed, e.g. dictionaries.
+    """
+    if isinstance(value, (list, tuple)):
+        return ("list", tuple(_freeze(item) for item in value))
+    hash(value)
+    return (type(value).__name__, value)
+
+
+def _thaw(value):
+    """Turn a frozen query value back into the value Query expects"""
+    kind, frozen = value
+    if kind == "list":
+        return [ _thaw(item) for item in frozen ]
+    return frozen
+
+
+def _condition_query(field, operator, value):
+    """Serialized query of one condition; cached unless the value cannot be hashed"""
+    try:
+        frozen = _freeze(value)
+    except TypeError:
+        return _build_condition_query(field, operator, value)
+    return _cached_condition_query(field, operator, frozen)
+
+
+@lru_cache(maxsize = 4096)
+def _cached_condition_query(field, operator, value):
+    """Serialized query of one condition, cached by field, operator and frozen value"""
+    return _build_condition_query(field, operator, _thaw(value))
+
+
+def _build_condition_query(field, operator, value):
+    name = _QUERY_OPERATOR_ALIASES.get(operator, operator)
+    builder = _QUERY_OPERATORS.get(name)
+    if builder is None:
+        raise ValueError(f"Unknown query operator '{operator}', expected one of "
+                         f"{', '.join(list(_QUERY_OPERATORS) + list(_QUERY_OPERATOR_ALIASES))}")
+    return builder(field, value)
+
+
+@lru_cache(maxsize = 1024)
+def _compiled_queries(conditions, order_by, limit, offset, cursor_after, cursor_before, select_fields):
+    """Serialized queries of a whole request, cached by its normalized inputs with frozen values"""
+    return tuple(_assemble_queries(
+        [ _cached_condition_query(field, operator, value) for field, operator, value in conditions ],
+        order_by, limit, offset, cursor_after, cursor_before, select_fields
+    ))
+
+
+def _assemble_queries(queries, order_by, limit, offset, cursor_after, cursor_before, select_fields):
+    """Append the order, select and paging queries to the serialized condition queries"""
+    for field, descending in order_by:
+        queries.append(Query.order_desc(field) if descending else Query.order_asc(field))
+    if select_fields:
+        queries.append(Query.select(list(select_fields)))
+    if limit is not None:
+        queries.append(Query.limit(limit))
+    if offset:
+        queries.append(Query.offset(offset))
+    if cursor_after:
+        queries.append(Query.cursor_after(cursor_after))
+    if cursor_before:
+        queries.append(Query.cursor_before(cursor_before))
+    return queries
+
 
 class AppWriteService:
     def __init__(self, endpoint, project_id, api_key):
@@ -634,50 +755,89 @@ class AppWriteService:
             raise e
 
     @keyword("Query Documents")
-    def query_documents(self, database_id, collection_id, field, operator, value):
+    def query_documents(self, database_id, collection_id, field, operator, value = None):
         """Query documents with specific conditions
 
         Arguments:
         - database_id: Database ID
         - collection_id: Collection ID
         - field: Field to query
-        - operator: Query operator
-        - value: Query value
+        - operator: Query operator, see Build Queries
+        - value: Query value (not needed for is_null and is_not_null)
 
         Returns queried documents
         """
         try:
-            query = [ Query.equal(field, value) ]
-
-            if operator == "not_equal":
-                query = [ Query.not_equal(field, value) ]
-            elif operator == "less_than":
-                query = [ Query.less_than(field, value) ]
-            elif operator == "less_than_equal":
-                query = [ Query.less_than_equal(field, value) ]
-            elif operator == "greater_than":
-                query = [ Query.greater_than(field, value) ]
-            elif operator == "greater_than_equal":
-                query = [ Query.greater_than_equal(field, value) ]
-            elif operator == "search":
-                query = [ Query.search(field, value) ]
-            elif operator == "is_null":
-                query = [ Query.is_null(field) ]
-            elif operator == "is_not_null":
-                query = [ Query.is_not_null(field) ]
-            elif operator == "between":
-                query = [ Query.between(field, value[ 0 ], value[ 1 ]) ]
-            elif operator == "starts_with":
-                query = [ Query.starts_with(field, value) ]
-            elif operator == "ends_with":
-                query = [ Query.ends_with(field, value) ]
-            elif operator == "contains":
-                query = [ Query.contains(field, value) ]
+            result = self.databases.list_documents(
+                database_id = database_id,
+                collection_id = collection_id,
+                queries = [ _condition_query(field, str(operator).strip().lower(), value) ]
+            )
+            return result
+        except Exception as e:
+            raise e
+
+    @keyword("Build Queries")
+    def build_queries(self, conditions = None, order_by = None, limit = None, offset = None, cursor_after = None,
+                      cursor_before = None, select_fields = None):
+        """Build the query list for list_documents from conditions and paging options
+
+        Arguments:
+        - conditions: List of (field, operator, value) tuples or dictionaries with field, operator and value
+        - order_by: Field or list of fields to order by; prefix with - or add DESC for descending order
+        - limit: Maximum number of documents
+        - offset: Skip this number of documents
+        - cursor_after: Return documents after this document ID
+        - cursor_before: Return documents before this document ID
+        - select_fields: List of fields to return
+
+        Operators are equal (=, ==), not_equal (!=), less_than (<), less_than_equal (<=), greater_than (>),
+        greater_than_equal (>=), search, is_null, is_not_null, between (value is [low, high]),
+        starts_with, ends_with and contains. Built queries are cached by their inputs, so repeating
+        the same query costs only the lookup.
+
+        Returns list of query strings
+        """
+        try:
+            conditions = self._normalize_conditions(conditions)
+            arguments = (
+                self._normalize_order(order_by),
+                int(limit) if limit is not None else None,
+                int(offset) if offset else None,
+                cursor_after,
+                cursor_before,
+                self._normalize_fields(select_fields)
+            )
+            try:
+                frozen = tuple((field, operator, _freeze(value)) for field, operator, value in conditions)
+            except TypeError:
+                # A value that cannot be hashed (e.g. a dict) cannot be a cache key, so build it uncached
+                return _assemble_queries(
+                    [ _condition_query(field, operator, value) for field, operator, value in conditions ],
+                    *arguments
+                )
+            return list(_compiled_queries(frozen, *arguments))
+        except Exception as e:
+            raise e
+
+    @keyword("Find Documents")
+    def find_documents(self, database_id, collection_id, conditions = None, order_by = None, limit = None,
+                       offset = None, cursor_after = None, cursor_before = None, select_fields = None):
+        """Query documents matching all conditions, with ordering, paging and field selection
+
+        Arguments:
+        - database_id: Database ID
+        - collection_id: Collection ID
+        - conditions, order_by, limit, offset, cursor_after, cursor_before, select_fields: as for Build Queries
 
+        Returns queried documents
+        """
+        try:
             result = self.databases.list_documents(
                 database_id = database_id,
                 collection_id = collection_id,
-                queries = query
+                queries = self.build_queries(conditions, order_by, limit, offset, cursor_after, cursor_before,
+                                             select_fields)
             )
             return result
         except Exception as e:
@@ -769,52 +929,392 @@ class AppWriteService:
         except Exception as e:
             raise e
 
+    @keyword("Iterate Documents")
+    def iter_documents(self, database_id, collection_id, queries = None, page_size = 100, select_fields = None,
+                       max_items = None, prefetch = True):
+        """Iterate over all documents matching the queries, page by page
+
+        Arguments:
+        - database_id: Database ID
+        - collection_id: Collection ID
+        - queries: Optional query list; limit, offset and cursor queries are replaced
+        - page_size: Number of documents fetched per request (default: 100)
+        - select_fields: Optional list or comma separated string of fields to return ($id is always included)
+        - max_items: Stop after this many documents (default: all)
+        - prefetch: Fetch the next page while the current one is consumed (default: True)
+
+        Pages are fetched with Query.cursor_after, so every page costs the same however deep
+        into the collection it is, and only about two pages are held in memory.
+
+        Returns a generator of documents
+        """
+        page_size = max(1, int(page_size))
+        max_items = int(max_items) if max_items else None
+        base_queries = [ query for query in (queries or [ ]) if self._query_method(query) not in PAGINATION_METHODS ]
+        fields = list(self._normalize_fields(select_fields))
+        if fields:
+            if "$id" not in fields:
+                fields.append("$id")
+            base_queries.append(Query.select(fields))
+
+        def fetch(cursor, limit):
+            page_queries = base_queries + [ Query.limit(limit) ]
+            if cursor:
+                page_queries.append(Query.cursor_after(cursor))
+            return self.list_documents(database_id, collection_id, page_queries)[ 'documents' ]
+
+        executor = ThreadPoolExecutor(max_workers = 1, thread_name_prefix = "appwrite-prefetch") if prefetch else None
+        yielded = 0
+        try:
+            limit = min(page_size, max_items) if max_items else page_size
+            page = fetch(None, limit)
+            while page:
+                remaining = max_items - yielded - len(page) if max_items else None
+                next_page = None
+                if len(page) == limit and (remaining is None or remaining > 0):
+                    limit = min(page_size, remaining) if remaining is not None else page_size
+                    if executor is not None:
+                        next_page = executor.submit(fetch, page[ -1 ][ '$id' ], limit)
+                    else:
+                        next_page = lambda cursor = page[ -1 ][ '$id' ], size = limit: fetch(cursor, size)
+                for document in page:
+                    yield document
+                    yielded += 1
+                if next_page is None:
+                    break
+                page = next_page.result() if executor is not None else next_page()
+        finally:
+            if executor is not None:
+                executor.shutdown(wait = False)
+
+    @keyword("List All Documents")
+    def list_all_documents(self, database_id, collection_id, queries = None, page_size = 100, select_fields = None,
+                           max_items = None):
+        """List all documents matching the queries, following pages with a cursor
+
+        Arguments:
+        - database_id: Database ID
+        - collection_id: Collection ID
+        - queries: Optional query list; limit, offset and cursor queries are replaced
+        - page_size: Number of documents fetched per request (default: 100)
+        - select_fields: Optional list or comma separated string of fields to return ($id is always included)
+        - max_items: Stop after this many documents (default: all)
+
+        Returns list of documents
+        """
+        try:
+            return list(self.iter_documents(database_id, collection_id, queries, page_size, select_fields,
+                                            max_items))
+        except Exception as e:
+            raise e
+
+    @staticmethod
+    def _query_method(query):
+        """Return the method of a query string built by Query, or None"""
+        try:
+            return json.loads(query).get("method")
+        except (TypeError, ValueError, AttributeError):
+            return None
+
     @keyword("Create Documents Batch")
-    def create_documents_batch(self, database_id, collection_id, documents_data):
-        """Create multiple documents in batch
+    def create_documents_batch(self, database_id, collection_id, documents_data, max_workers = 1, max_retries = 5,
+                               backoff = 1, chunk_size = 100):
+        """Create multiple documents in batch, optionally in parallel
 
         Arguments:
         - database_id: Database ID
         - collection_id: Collection ID
         - documents_data: List of document data objects
+        - max_workers: Number of documents created at the same time (default: 1, sequential)
+        - max_retries: Retries of a document rejected with 429 or 503 (default: 5)
+        - backoff: First wait in seconds after a 429 or 503, doubled on every retry (default: 1)
+        - chunk_size: Number of documents between progress messages (default: 100)
 
-        Returns list of results
+        A 429 pauses all workers, so the batch slows down to the rate the server accepts.
+
+        Returns list of results in the order of documents_data; a failed document gives
+        a dictionary with error and data
         """
-        results = [ ]
-        for data in documents_data:
-            try:
-                result = self.create_document(database_id, collection_id, data)
-                results.append(result)
-            except Exception as e:
-                results.append({ "error": str(e), "data": data })
-        return results
+        def create(data):
+            return self.create_document(database_id, collection_id, data)
+
+        def failure(data, error):
+            return { "error": str(error), "data": data }
+
+        return self._run_batch("Create documents", documents_data, create, failure, max_workers, max_retries,
+                               backoff, chunk_size)
 
     @keyword("Update Documents Batch")
-    def update_documents_batch(self, database_id, collection_id, documents_updates):
-        """Update multiple documents in batch
+    def update_documents_batch(self, database_id, collection_id, documents_updates, max_workers = 1, max_retries = 5,
+                               backoff = 1, chunk_size = 100):
+        """Update multiple documents in batch, optionally in parallel
 
         Arguments:
         - database_id: Database ID
         - collection_id: Collection ID
         - documents_updates: List of update objects with document_id and data
+        - max_workers: Number of documents updated at the same time (default: 1, sequential)
+        - max_retries: Retries of a document rejected with 429 or 503 (default: 5)
+        - backoff: First wait in seconds after a 429 or 503, doubled on every retry (default: 1)
+        - chunk_size: Number of documents between progress messages (default: 100)
 
-        Returns list of results
+        Returns list of results in the order of documents_updates; a failed update gives
+        a dictionary with error and document_id
         """
-        results = [ ]
-        for update in documents_updates:
+        def update(item):
+            return self.update_document(
+                database_id,
+                collection_id,
+                item[ 'document_id' ],
+                item[ 'data' ],
+                item.get('permissions')
+            )
+
+        def failure(item, error):
+            return { "error": str(error), "document_id": item[ 'document_id' ] }
+
+        return self._run_batch("Update documents", documents_updates, update, failure, max_workers, max_retries,
+                               backoff, chunk_size)
+
+    def _run_batch(self, label, items, operation, failure, max_workers, max_retries, backoff, chunk_size):
+        """Apply operation to every item on a bounded thread pool, keeping results in input order"""
+        items = list(items)
+        max_workers = max(1, int(max_workers or 1))
+        chunk_size = max(1, int(chunk_size or 100))
+        # Shared by the workers: time until which all of them hold back after a 429
+        throttle = { "until": 0.0, "lock": threading.Lock(), "retries": 0 }
+
+        def run(item):
             try:
-                result = self.update_document(
-                    database_id,
-                    collection_id,
-                    update[ 'document_id' ],
-                    update[ 'data' ],
-                    update.get('permissions')
-                )
-                results.append(result)
+                return self._call_with_backoff(operation, item, int(max_retries), float(backoff), throttle)
             except Exception as e:
-                results.append({ "error": str(e), "document_id": update[ 'document_id' ] })
+                return failure(item, e)
+
+        results = [ ]
+        started = time.time()
+        executor = ThreadPoolExecutor(max_workers = max_workers, thread_name_prefix = "appwrite-batch") \
+            if max_workers > 1 and len(items) > 1 else None
+        try:
+            # Submitting chunk by chunk bounds the pending work and gives progress from the main thread,
+            # where Robot records log messages
+            for offset in range(0, len(items), chunk_size):
+                chunk = items[ offset:offset + chunk_size ]
+                if executor is None:
+                    results.extend(run(item) for item in chunk)
+                else:
+                    results.extend(executor.map(run, chunk))
+                if len(items) > chunk_size:
+                    elapsed = time.time() - started
+                    logger.info(f"{label}: {len(results)}/{len(items)} done, "
+                                f"{sum(1 for result in results if self._is_batch_error(result))} failed, "
+                                f"{len(results) / elapsed if elapsed else 0:.1f}/s")
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        failed = sum(1 for result in results if self._is_batch_error(result))
+        logger.info(f"{label}: {len(items)} finished in {time.time() - started:.2f}s "
+                    f"(workers={max_workers}, failed={failed}, throttled retries={throttle[ 'retries' ]})")
         return results
 
+    @staticmethod
+    def _call_with_backoff(operation, item, max_retries, backoff, throttle):
+        """Call operation, retrying 429 and 503 responses with exponential backoff and jitter"""
+        attempt = 0
+        while True:
+            pause = throttle[ "until" ] - time.time()
+            if pause > 0:
+                time.sleep(pause)
+            try:
+                return operation(item)
+            except AppwriteException as e:
+                if e.code not in RETRYABLE_STATUS_CODES or attempt >= max_retries:
+                    raise
+                wait = min(backoff * 2 ** attempt, 30) * random.uniform(0.5, 1)
+                attempt += 1
+                with throttle[ "lock" ]:
+                    throttle[ "retries" ] += 1
+                    throttle[ "until" ] = max(throttle[ "until" ], time.time() + wait)
+
+    @staticmethod
+    def _is_batch_error(result):
+        return isinstance(result, dict) and "error" in result and "$id" not in result
+
+    @keyword("Wait For Schema Ready")
+    def wait_for_schema_ready(self, database_id, collection_id, attributes = None, indexes = None, timeout = 60,
+                              initial_interval = 0.25, max_interval = 2):
+        """Wait until many attributes and indexes of a collection are available
+
+        Arguments:
+        - database_id: Database ID
+        - collection_id: Collection ID
+        - attributes: Attribute keys to wait for
+        - indexes: Index keys to wait for
+        - timeout: Maximum wait time in seconds (default: 60)
+        - initial_interval: First wait between checks in seconds (default: 0.25)
+        - max_interval: Longest wait between checks in seconds (default: 2)
+
+        Every check lists only the keys still pending, with one request for the attributes and
+        one for the indexes. The wait grows by half while nothing changes and starts over from
+        initial_interval when a key becomes available. A key whose status is failed ends the wait.
+
+        Returns True if everything becomes available, False on timeout or failure
+        """
+        pending = {
+            "attributes": self._as_key_set(attributes),
+            "indexes": self._as_key_set(indexes)
+        }
+        listings = { "attributes": self.databases.list_attributes, "indexes": self.databases.list_indexes }
+        interval = float(initial_interval)
+        deadline = time.time() + float(timeout)
+        checks = 0
+        while True:
+            progressed = False
+            for kind, keys in pending.items():
+                if not keys:
+                    continue
+                try:
+                    statuses = self._list_statuses(listings[ kind ], database_id, collection_id, kind, keys)
+                except Exception as e:
+                    logger.debug(f"Listing {kind} failed, retrying: {e}")
+                    continue
+                failed = sorted(key for key, status in statuses.items() if status == 'failed')
+                if failed:
+                    logger.warn(f"{kind.capitalize()} {', '.join(failed)} of collection '{collection_id}' failed")
+                    return False
+                ready = { key for key, status in statuses.items() if status == 'available' }
+                if ready:
+                    keys -= ready
+                    progressed = True
+            checks += 1
+            if not pending[ "attributes" ] and not pending[ "indexes" ]:
+                logger.info(f"Schema of collection '{collection_id}' ready after {checks} check(s)")
+                return True
+
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                logger.warn(f"Schema of collection '{collection_id}' not ready after {timeout}s, pending "
+                            f"attributes: {sorted(pending[ 'attributes' ])}, indexes: {sorted(pending[ 'indexes' ])}")
+                return False
+            interval = float(initial_interval) if progressed else min(interval * 1.5, float(max_interval))
+            time.sleep(min(interval, remaining))
+
+    @keyword("Sync Database Schema")
+    def sync_database_schema(self, schema, database_id = None, max_workers = 4, timeout = 120, dry_run = False):
+        """Create whatever a declarative schema defines but the database does not have yet
+
+        Arguments:
+        - schema: Schema as a dictionary, a JSON string or the path of a JSON or YAML file
+        - database_id: Database ID, overriding the one in the schema
+        - max_workers: Number of create requests sent at the same time (default: 4)
+        - timeout: Maximum wait in seconds for the new attributes and indexes (default: 120)
+        - dry_run: Only report what would be created (default: False)
+
+        The schema has a database (id and name) and a list of collections, each with id, name,
+        optional permissions and document_security, attributes and indexes:
+
+        | database: { id: main, name: Main }
+        | collections:
+        |   - id: users
+        |     name: Users
+        |     attributes:
+        |       - { key: name, type: string, size: 255, required: true }
+        |       - { key: age, type: integer, min: 0 }
+        |       - { key: role, type: enum, elements: [ admin, user ] }
+        |     indexes:
+        |       - { key: by_name, type: key, attributes: [ name ], orders: [ ASC ] }
+
+        Attribute types are string, integer, float, boolean, datetime, email, url, ip, enum and
+        relationship (with related_collection, relation_type, two_way, two_way_key, on_delete).
+        The existing attributes and indexes are listed once per collection and only the missing
+        ones are created, so a re-run against an up-to-date database only lists. Attributes are
+        created concurrently and waited for in bulk before the indexes that use them are created.
+        Differences between the schema and existing attributes or indexes are reported, not changed.
+
+        Returns a report with created (database, collections, attributes, indexes), drift, pending
+        and ready
+        """
+        started = time.time()
+        spec = self._load_schema(schema)
+        database = spec.get('database') or { }
+        database_id = database_id or database.get('id')
+        if not database_id:
+            raise ValueError("The schema has no database id and none was given")
+        collections = spec.get('collections') or [ ]
+        max_workers = max(1, int(max_workers or 1))
+        report = {
+            "database": database_id,
+            "created": { "database": False, "collections": [ ], "attributes": [ ], "indexes": [ ] },
+            "drift": [ ],
+            "pending": [ ],
+            "ready": True
+        }
+        throttle = { "until": 0.0, "lock": threading.Lock(), "retries": 0 }
+
+        def call(operation, *args):
+            return self._call_with_backoff(lambda _: operation(*args), None, 5, 1.0, throttle)
+
+        try:
+            self.databases.get(database_id = database_id)
+        except AppwriteException as e:
+            if e.code != 404:
+                raise
+            report[ "created" ][ "database" ] = True
+            if not dry_run:
+                call(self.create_database, database_id, database.get('name') or database_id)
+
+        with ThreadPoolExecutor(max_workers = max_workers, thread_name_prefix = "appwrite-schema") as executor:
+            # Collections first: relationship attributes need their related collection
+            existing = list(executor.map(lambda collection: self._existing_schema(
+                database_id, collection, report[ "created" ][ "database" ], call), collections))
+            for collection, current in zip(collections, existing):
+                if current is None:
+                    report[ "created" ][ "collections" ].append(collection[ 'id' ])
+            if not dry_run:
+                list(executor.map(lambda item: call(self.databases.create_collection, database_id,
+                                                    item[ 'id' ], item.get('name') or item[ 'id' ],
+                                                    item.get('permissions'), item.get('document_security')),
+                                  [ collection for collection, current in zip(collections, existing)
+                                    if current is None ]))
+
+            plans = [ self._plan_collection(collection, current or { "attributes": { }, "indexes": { } }, report)
+                      for collection, current in zip(collections, existing) ]
+            if dry_run:
+                report[ "ready" ] = False if any(plan[ "attributes" ] or plan[ "indexes" ] for plan in plans) \
+                    else report[ "ready" ]
+                logger.info(f"Schema sync plan for database '{database_id}': {report[ 'created' ]}")
+                return report
+
+            attribute_jobs = [ (plan[ "id" ], attribute) for plan in plans for attribute in plan[ "attributes" ] ]
+            list(executor.map(lambda job: call(self._create_attribute_from_spec, database_id, job[ 0 ], job[ 1 ]),
+                              attribute_jobs))
+            deadline = time.time() + float(timeout)
+            waits = list(executor.map(
+                lambda plan: self.wait_for_schema_ready(database_id, plan[ "id" ], plan[ "wait_attributes" ],
+                                                        timeout = max(deadline - time.time(), 0)),
+                plans))
+
+            index_jobs = [ (plan[ "id" ], index) for plan, ready in zip(plans, waits) if ready
+                           for index in plan[ "indexes" ] ]
+            list(executor.map(lambda job: call(self.create_index, database_id, job[ 0 ], job[ 1 ][ 'key' ],
+                                               job[ 1 ].get('type', 'key'), job[ 1 ][ 'attributes' ],
+                                               job[ 1 ].get('orders')),
+                              index_jobs))
+            index_waits = list(executor.map(
+                lambda plan: self.wait_for_schema_ready(database_id, plan[ "id" ], indexes = plan[ "wait_indexes" ],
+                                                        timeout = max(deadline - time.time(), 0)),
+                [ plan for plan, ready in zip(plans, waits) if ready ]))
+
+        for plan, ready in zip(plans, waits):
+            if not ready:
+                report[ "pending" ].append(plan[ "id" ])
+        report[ "ready" ] = all(waits) and all(index_waits)
+        logger.info(f"Schema of database '{database_id}' synced in {time.time() - started:.2f}s: "
+                    f"created {report[ 'created' ]}, drift {len(report[ 'drift' ])}, ready {report[ 'ready' ]}")
+        for drift in report[ "drift" ]:
+            logger.warn(f"Schema drift: {drift}")
+        return report
+
     @keyword("Wait For Attribute")
     def wait_for_attribute(self, database_id, collection_id, key, timeout = 30):
         """Wait for attribute to be available
@@ -827,17 +1327,7 @@ class AppWriteService:
 
         Returns True if attribute becomes available, False if timeout
         """
-        start_time = time.time()
-        while time.time() - start_time < timeout:
-            try:
-                attributes = self.list_attributes(database_id, collection_id)
-                for attr in attributes[ 'attributes' ]:
-                    if attr[ 'key' ] == key and attr[ 'status' ] == 'available':
-                        return True
-                time.sleep(1)
-            except Exception:
-                time.sleep(1)
-        return False
+        return self.wait_for_schema_ready(database_id, collection_id, attributes = [ key ], timeout = timeout)
 
     @keyword("Wait For Index")
     def wait_for_index(self, database_id, collection_id, key, timeout = 30):
@@ -851,14 +1341,145 @@ class AppWriteService:
 
         Returns True if index becomes available, False if timeout
         """
-        start_time = time.time()
-        while time.time() - start_time < timeout:
+        return self.wait_for_schema_ready(database_id, collection_id, indexes = [ key ], timeout = timeout)
+
+    @staticmethod
+    def _list_statuses(listing, database_id, collection_id, kind, keys):
+        """Return the status of the given attribute or index keys, listing only those keys"""
+        statuses = { }
+        ordered = sorted(keys)
+        # A query takes at most 100 values
+        for offset in range(0, len(ordered), 100):
+            chunk = ordered[ offset:offset + 100 ]
+            result = listing(
+                database_id = database_id,
+                collection_id = collection_id,
+                queries = [ Query.equal("key", chunk), Query.limit(len(chunk)) ]
+            )
+            for item in result[ kind ]:
+                statuses[ item[ 'key' ] ] = item[ 'status' ]
+        return statuses
+
+    @staticmethod
+    def _as_key_set(keys):
+        if not keys:
+            return set()
+        if isinstance(keys, str):
+            keys = keys.split(",")
+        return { str(key).strip() for key in keys if str(key).strip() }
+
+    def _load_schema(self, schema):
+        """Return a declarative schema given as a dictionary, JSON string or JSON/YAML file"""
+        if isinstance(schema, dict):
+            return schema
+        text = str(schema).strip()
+        if text.startswith('{'):
+            return json.loads(text)
+        with open(text, encoding = "utf-8") as file:
+            content = file.read()
+        if os.path.splitext(text)[ 1 ].lower() in (".yml", ".yaml"):
             try:
-                indexes = self.list_indexes(database_id, collection_id)
-                for index in indexes[ 'indexes' ]:
-                    if index[ 'key' ] == key and index[ 'status' ] == 'available':
-                        return True
-                time.sleep(1)
-            except Exception:
-                time.sleep(1)
-        return False
+                yaml = importlib.import_module("yaml")
+            except ImportError:
+                raise ImportError("YAML schemas need the PyYAML package") from None
+            return yaml.safe_load(content)
+        return json.loads(content)
+
+    def _existing_schema(self, database_id, collection, database_created, call):
+        """Return the existing attributes and indexes of a collection by key, or None when it does not exist"""
+        if database_created:
+            return None
+        try:
+            self.databases.get_collection(database_id = database_id, collection_id = collection[ 'id' ])
+        except AppwriteException as e:
+            if e.code == 404:
+                return None
+            raise
+        return {
+            kind: { item[ 'key' ]: item for item in call(self._list_all, listing, database_id, collection[ 'id' ], kind) }
+            for kind, listing in (("attributes", self.databases.list_attributes),
+                                  ("indexes", self.databases.list_indexes))
+        }
+
+    @staticmethod
+    def _list_all(listing, database_id, collection_id, kind):
+        """List every attribute or index of a collection, page by page"""
+        items = [ ]
+        while True:
+            result = listing(
+                database_id = database_id,
+                collection_id = collection_id,
+                queries = [ Query.limit(100), Query.offset(len(items)) ]
+            )
+            items.extend(result[ kind ])
+            if len(result[ kind ]) < 100:
+                return items
+
+    @staticmethod
+    def _plan_collection(collection, current, report):
+        """Work out which attributes and indexes of a collection are missing, recording drift in the report"""
+        plan = { "id": collection[ 'id' ], "attributes": [ ], "indexes": [ ], "wait_attributes": [ ],
+                 "wait_indexes": [ ] }
+        for kind, fields in (("attributes", ATTRIBUTE_DRIFT_FIELDS), ("indexes", INDEX_DRIFT_FIELDS)):
+            for item in collection.get(kind) or [ ]:
+                existing = current[ kind ].get(item[ 'key' ])
+                if existing is None:
+                    plan[ kind ].append(item)
+                    plan[ f"wait_{kind}" ].append(item[ 'key' ])
+                    report[ "created" ][ kind ].append(f"{collection[ 'id' ]}.{item[ 'key' ]}")
+                    continue
+                if existing.get('status') != 'available':
+                    plan[ f"wait_{kind}" ].append(item[ 'key' ])
+                for field in fields:
+                    if field in item and field in existing and item[ field ] != existing[ field ]:
+                        report[ "drift" ].append(f"{collection[ 'id' ]}.{item[ 'key' ]}: {field} is "
+                                                 f"{existing[ field ]!r}, schema has {item[ field ]!r}")
+        return plan
+
+    def _create_attribute_from_spec(self, database_id, collection_id, attribute):
+        """Create one attribute of a declarative schema with the keyword for its type"""
+        attribute_type = str(attribute.get('type', '')).lower()
+        if attribute_type not in ATTRIBUTE_CREATORS:
+            raise ValueError(f"Unknown attribute type '{attribute.get('type')}' of '{attribute.get('key')}', "
+                             f"expected one of {', '.join(ATTRIBUTE_CREATORS)}")
+        arguments = { ATTRIBUTE_ARGUMENTS.get(name, name): value for name, value in attribute.items()
+                      if name != 'type' }
+        return getattr(self, ATTRIBUTE_CREATORS[ attribute_type ])(database_id, collection_id, **arguments)
+
+    @staticmethod
+    def _normalize_conditions(conditions):
+        """Return conditions as a list of (field, operator, value)"""
+        normalized = [ ]
+        for condition in conditions or [ ]:
+            if isinstance(condition, dict):
+                field = condition[ 'field' ]
+                operator = condition.get('operator', condition.get('op', 'equal'))
+                value = condition.get('value')
+            else:
+                field, operator, value = (list(condition) + [ None ])[ :3 ]
+            normalized.append((field, str(operator).strip().lower(), value))
+        return normalized
+
+    @staticmethod
+    def _normalize_order(order_by):
+        """Return the order as a tuple of (field, descending)"""
+        if not order_by:
+            return ()
+        if isinstance(order_by, str):
+            order_by = order_by.split(",")
+        order = [ ]
+        for item in order_by:
+            parts = str(item).split()
+            if not parts:
+                continue
+            field = parts[ 0 ]
+            descending = field.startswith("-") or (len(parts) > 1 and parts[ 1 ].upper() == "DESC")
+            order.append((field.lstrip("-"), descending))
+        return tuple(order)
+
+    @staticmethod
+    def _normalize_fields(select_fields):
+        """Return the selected fields as a tuple; a string is split at commas"""
+        if isinstance(select_fields, str):
+            select_fields = select_fields.split(",")
+        return tuple(str(field).strip() for field in select_fields or () if str(field).strip())
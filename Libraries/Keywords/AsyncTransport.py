@@ -0,0 +1,254 @@
+import asyncio
+import atexit
+import importlib
+import importlib.util
+import threading
+from typing import Dict, Any, Optional, List
+import requests
+from requests.auth import HTTPBasicAuth
+from requests.cookies import cookiejar_from_dict
+from requests.structures import CaseInsensitiveDict
+from robot.api import logger
+from robot.api.deco import library
+from RequestUtils import RequestUtils
+
+
+@library(doc_format = 'ROBOT', auto_keywords=True)
+class AsyncTransport:
+    """
+    Optional HTTP transport built on httpx.
+
+    All requests run on one asyncio event loop owned by the library and executed in a background
+    thread, using one AsyncClient per session alias. With HTTP/2 (requires the h2 package) concurrent
+    requests to the same host are multiplexed over a single connection. Responses are converted to
+    requests.Response objects, so the rest of the library handles them exactly like RequestsLibrary
+    responses.
+    """
+
+    def __init__(self, http2: bool = True, max_connections: int = 100):
+        """
+        Initialize the transport. httpx is imported lazily, so the library works without it.
+
+        :param http2: Negotiate HTTP/2 where the server supports it
+        :param max_connections: Maximum number of open connections per client
+        """
+        self.http2 = http2
+        self.max_connections = max_connections
+        self._httpx = None
+        self._loop = None
+        self._thread = None
+        self._clients = { }
+        self._lock = threading.Lock()
+        self.utils = RequestUtils()
+
+    @staticmethod
+    def is_available() -> bool:
+        """Check whether httpx is installed."""
+        return importlib.util.find_spec("httpx") is not None
+
+    def request(self, method: str, url: str, session: Optional[ requests.Session ] = None,
+                client_key: Optional[ str ] = None, **kwargs) -> requests.Response:
+        """
+        Send a request on the event loop and wait for its response.
+
+        Safe to call from several threads at once; their requests run concurrently on the loop.
+
+        :param method: HTTP method
+        :param url: Full request URL
+        :param session: requests session whose headers, cookies, auth and TLS settings apply
+        :param client_key: Key of the client to use, normally the session alias
+        :param kwargs: requests style arguments (headers, params, data, json, files, timeout, allow_redirects)
+        :return: The response converted to a requests.Response
+        """
+        loop = self._ensure_loop()
+        future = asyncio.run_coroutine_threadsafe(self._request(method, url, session, client_key, kwargs), loop)
+        return future.result()
+
+    def unsupported_reason(self, session: Optional[ requests.Session ], kwargs: Dict) -> Optional[ str ]:
+        """
+        Check whether a request can be sent over httpx without losing any of its settings.
+
+        Only basic authentication is converted, and proxies are not passed on, so such requests have
+        to go through requests instead.
+
+        :param session: requests session the request belongs to, if any
+        :param kwargs: requests style arguments of the request
+        :return: Why the request cannot use this transport, or None when it can
+        """
+        auth = kwargs.get('auth') or (session.auth if session is not None else None)
+        if auth is not None and self._convert_auth(auth) is None:
+            return f"{type(auth).__name__} authentication is not supported by the httpx transport"
+        if kwargs.get('proxies') or (session is not None and session.proxies):
+            return "proxies are not supported by the httpx transport"
+        return None
+
+    def close_client(self, client_key: Optional[ str ]) -> None:
+        """Close the client of one session alias, if it was created."""
+        with self._lock:
+            client = self._clients.pop(client_key, None)
+        if client is not None and self._loop is not None:
+            asyncio.run_coroutine_threadsafe(client.aclose(), self._loop).result()
+
+    def close(self) -> None:
+        """Close all clients and stop the event loop."""
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None:
+            return
+        for client in clients:
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(5)
+
+    def get_client_keys(self) -> List[ Optional[ str ] ]:
+        """Return the keys of the open clients."""
+        with self._lock:
+            return list(self._clients)
+
+    def get_info(self) -> Dict:
+        """Return the transport settings and the open clients."""
+        return {
+            "http2": self.http2 and self._http2_available(),
+            "max_connections": self.max_connections,
+            "loop_running": self._loop is not None,
+            "clients": sorted(str(key) for key in self._clients)
+        }
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """Start the event loop thread on first use."""
+        with self._lock:
+            if self._loop is None:
+                if self._httpx is None:
+                    self._httpx = importlib.import_module("httpx")
+                loop = asyncio.new_event_loop()
+                started = threading.Event()
+
+                def run_loop():
+                    asyncio.set_event_loop(loop)
+                    loop.call_soon(started.set)
+                    loop.run_forever()
+
+                self._thread = threading.Thread(target = run_loop, name = "api-async-transport", daemon = True)
+                self._thread.start()
+                started.wait()
+                self._loop = loop
+            return self._loop
+
+    def _http2_available(self) -> bool:
+        return importlib.util.find_spec("h2") is not None
+
+    def _get_client(self, client_key: Optional[ str ], session: Optional[ requests.Session ]) -> Any:
+        """Return the client for a key, creating it on first use. Runs on the event loop."""
+        client = self._clients.get(client_key)
+        if client is not None:
+            return client
+
+        http2 = self.http2 and self._http2_available()
+        if self.http2 and not http2:
+            logger.warn("HTTP/2 needs the h2 package, falling back to HTTP/1.1")
+        client_kwargs = {
+            "http2": http2,
+            "limits": self._httpx.Limits(max_connections = self.max_connections,
+                                         max_keepalive_connections = self.max_connections)
+        }
+        if session is not None:
+            client_kwargs[ "verify" ] = session.verify
+            client_kwargs[ "trust_env" ] = session.trust_env
+            if session.cert:
+                client_kwargs[ "cert" ] = session.cert
+            # Share the session cookie jar, so cookies are kept in sync with RequestsLibrary calls
+            client_kwargs[ "cookies" ] = session.cookies
+        client = self._httpx.AsyncClient(**client_kwargs)
+        with self._lock:
+            self._clients[ client_key ] = client
+        return client
+
+    async def _request(self, method: str, url: str, session: Optional[ requests.Session ],
+                       client_key: Optional[ str ], kwargs: Dict) -> requests.Response:
+        client = self._get_client(client_key, session)
+
+        headers = CaseInsensitiveDict(session.headers if session is not None else { })
+        headers.update(kwargs.get('headers') or { })
+        headers = { name: value for name, value in headers.items() if value is not None }
+
+        auth = kwargs.get('auth') or (session.auth if session is not None else None)
+        data = kwargs.get('data')
+        request_kwargs = {
+            "headers": headers,
+            "params": kwargs.get('params'),
+            "json": kwargs.get('json'),
+            "files": kwargs.get('files'),
+            "follow_redirects": kwargs.get('allow_redirects', method.upper() != 'HEAD'),
+            "timeout": self._convert_timeout(kwargs.get('timeout'))
+        }
+        # httpx takes raw bodies as content and form fields as data
+        if isinstance(data, (str, bytes)):
+            request_kwargs[ "content" ] = data
+        elif data is not None:
+            request_kwargs[ "data" ] = data
+        if auth is not None:
+            converted = self._convert_auth(auth)
+            if converted is None:
+                raise ValueError(f"{type(auth).__name__} authentication is not supported by the httpx transport")
+            request_kwargs[ "auth" ] = converted
+
+        response = await client.request(method.upper(), url, **request_kwargs)
+        return self._to_requests_response(response)
+
+    @staticmethod
+    def _convert_auth(auth: Any) -> Optional[ tuple ]:
+        """Convert requests basic authentication to the (user, password) tuple httpx takes, else None."""
+        if isinstance(auth, HTTPBasicAuth):
+            return auth.username, auth.password
+        if isinstance(auth, (tuple, list)) and len(auth) == 2:
+            return tuple(auth)
+        return None
+
+    def _convert_timeout(self, timeout: Any) -> Any:
+        """Convert a requests timeout (seconds or a (connect, read) tuple) to an httpx timeout."""
+        if isinstance(timeout, (tuple, list)):
+            connect, read = timeout
+            return self._httpx.Timeout(read, connect = connect)
+        return timeout
+
+    def _to_requests_response(self, response: Any) -> requests.Response:
+        """Convert an httpx response to a requests.Response."""
+        converted = self.utils.build_response(response.status_code, response.content, response.headers,
+                                              str(response.url), response.request.method, response.reason_phrase,
+                                              response.charset_encoding, response.elapsed.total_seconds())
+        converted.headers = CaseInsensitiveDict(response.headers)
+        converted.cookies = cookiejar_from_dict(dict(response.cookies))
+        converted.request = requests.Request(response.request.method, str(response.request.url),
+                                             headers = dict(response.request.headers)).prepare()
+        converted.http_version = response.http_version
+        return converted
+
+
+# Shared by all library instances, so a transport selected in a suite setup applies to every later test
+# and its event loop and connections are not left behind when a test's library instance goes away
+_selected = { "name": "requests", "transport": None }
+_selected_lock = threading.Lock()
+
+
+def get_selected_transport() -> Dict:
+    """Return the name of the selected transport and the AsyncTransport in use, if any."""
+    return dict(_selected)
+
+
+def select_transport(name: str, transport: Optional[ AsyncTransport ] = None) -> None:
+    """Select the transport for every request of this process, closing the one it replaces."""
+    with _selected_lock:
+        previous = _selected[ "transport" ]
+        _selected[ "name" ], _selected[ "transport" ] = name, transport
+    if previous is not None and previous is not transport:
+        previous.close()
+
+
+def _close_selected_transport() -> None:
+    select_transport("requests")
+
+
+atexit.register(_close_selected_transport)
@@ -0,0 +1,254 @@
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, Optional, List, Tuple
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+import requests
+from robot.api import logger
+from robot.api.deco import library
+from RequestUtils import RequestUtils
+
+_MODES = ('record', 'replay', 'auto')
+_MATCH_FIELDS = ('method', 'url', 'url_template', 'path', 'query', 'body')
+_active = { "cassette": None }
+
+
+class CassetteMiss(Exception):
+    """Raised in replay mode when no recorded interaction matches a request."""
+
+
+def get_active_cassette() -> Optional[ 'Cassette' ]:
+    """Return the cassette requests are recorded to or replayed from, or None."""
+    return _active[ "cassette" ]
+
+
+def set_active_cassette(cassette: Optional[ 'Cassette' ]) -> None:
+    """Activate a cassette (or None to send requests normally), closing the previous one."""
+    previous = _active[ "cassette" ]
+    if previous is not None and previous is not cassette:
+        previous.close()
+    _active[ "cassette" ] = cassette
+
+
+@library(doc_format = 'ROBOT', auto_keywords=True)
+class Cassette:
+    """
+    Records HTTP interactions to a JSON Lines file and serves them back without touching the network.
+
+    Modes:
+    - record: every request is sent and written to the cassette, which is started empty
+    - replay: requests are answered from the cassette only; a request without a match fails
+    - auto: requests with a recorded match are replayed, all others are sent and recorded
+    """
+
+    DEFAULT_REDACT_HEADERS = ('Authorization', 'Cookie', 'Set-Cookie', 'RefreshToken', 'Proxy-Authorization')
+
+    def __init__(self, path: str, mode: str = "auto", match_on: Optional[ List[ str ] ] = None,
+                 redact_headers: Optional[ List[ str ] ] = None, allow_repeats: bool = True):
+        """
+        Open a cassette.
+
+        :param path: Cassette file (JSON Lines, one interaction per line)
+        :param mode: record, replay or auto
+        :param match_on: Request fields that must be equal for a match: method, url, url_template,
+                         path, query and/or body (default method, url, body)
+        :param redact_headers: Header names whose values are replaced before writing
+        :param allow_repeats: Keep serving the last matching interaction once all matches were played
+        """
+        mode = (mode or "auto").lower()
+        if mode not in _MODES:
+            raise ValueError(f"Unknown cassette mode '{mode}', expected one of {', '.join(_MODES)}")
+        match_on = [ field.strip().lower() for field in (match_on or [ 'method', 'url', 'body' ]) ]
+        unknown = [ field for field in match_on if field not in _MATCH_FIELDS ]
+        if unknown:
+            raise ValueError(f"Unknown match fields {unknown}, expected any of {', '.join(_MATCH_FIELDS)}")
+
+        self.path = path
+        self.mode = mode
+        self.match_on = match_on
+        self.redact_headers = { name.lower() for name in (redact_headers or self.DEFAULT_REDACT_HEADERS) }
+        self.allow_repeats = allow_repeats
+        self.utils = RequestUtils()
+        self.stats = { "recorded": 0, "replayed": 0, "missed": 0 }
+        self._interactions = { }
+        self._last_played = { }
+        self._lock = threading.Lock()
+        self._file = None
+
+        if mode == "replay" and not os.path.exists(path):
+            raise FileNotFoundError(f"Cassette '{path}' does not exist")
+        if mode != "record" and os.path.exists(path):
+            self._load()
+        if mode != "replay":
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok = True)
+            self._file = open(path, "w" if mode == "record" else "a", encoding = "utf-8")
+
+    def play(self, method: str, url: str, kwargs: Dict) -> Optional[ requests.Response ]:
+        """
+        Find the recorded response for a request.
+
+        :param method: HTTP method
+        :param url: Full request URL (without params)
+        :param kwargs: Request arguments (params, json, data, files, headers)
+        :return: The recorded response, or None when nothing matches (or in record mode)
+        """
+        if self.mode == "record":
+            return None
+        key = self._match_key(self._describe_request(method, url, kwargs))
+        with self._lock:
+            queue = self._interactions.get(key)
+            if queue:
+                interaction = queue.popleft()
+                self._last_played[ key ] = interaction
+            elif self.allow_repeats and key in self._last_played:
+                interaction = self._last_played[ key ]
+            else:
+                self.stats[ "missed" ] += 1
+                return None
+            self.stats[ "replayed" ] += 1
+        return self._to_response(interaction, method, url)
+
+    def record(self, method: str, url: str, headers: Dict, kwargs: Dict, response: requests.Response) -> None:
+        """
+        Append an interaction to the cassette.
+
+        Streamed responses are not recorded, as reading them here would consume the body.
+
+        :param method: HTTP method
+        :param url: Full request URL (without params)
+        :param headers: Headers sent with the request
+        :param kwargs: Request arguments (params, json, data, files)
+        :param response: The response received
+        """
+        if self._file is None or response is None:
+            return
+        if getattr(response, '_content', None) is False:
+            logger.debug(f"Not recording streamed response of {method} {url}")
+            return
+
+        request = self._describe_request(method, url, kwargs)
+        request[ "headers" ] = self._redact(headers)
+        content = response.content or b""
+        interaction = {
+            "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "request": request,
+            "response": {
+                "status_code": response.status_code,
+                "reason": response.reason,
+                "url": response.url,
+                "headers": self._redact(response.headers),
+                "encoding": response.encoding,
+                "elapsed": response.elapsed.total_seconds() if response.elapsed else 0,
+                **self._encode_body(content)
+            }
+        }
+        line = json.dumps(interaction, ensure_ascii = False)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+            self.stats[ "recorded" ] += 1
+            if self.mode == "auto":
+                self._interactions.setdefault(self._match_key(request), deque()).append(interaction)
+
+    def close(self) -> None:
+        """Close the cassette file."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def get_stats(self) -> Dict:
+        """Return the cassette settings and the recorded, replayed and missed counters."""
+        with self._lock:
+            available = sum(len(queue) for queue in self._interactions.values())
+            return dict(self.stats, path = self.path, mode = self.mode, match_on = list(self.match_on),
+                        unplayed = available)
+
+    def _load(self) -> None:
+        """Index the interactions of an existing cassette by their match key."""
+        with open(self.path, encoding = "utf-8") as file:
+            for number, line in enumerate(file, 1):
+                if not line.strip():
+                    continue
+                try:
+                    interaction = json.loads(line)
+                except ValueError:
+                    logger.warn(f"Skipping invalid line {number} of cassette '{self.path}'")
+                    continue
+                key = self._match_key(interaction[ "request" ])
+                self._interactions.setdefault(key, deque()).append(interaction)
+
+    def _describe_request(self, method: str, url: str, kwargs: Dict) -> Dict:
+        """Build the recorded form of a request; every match field is derived from it."""
+        scheme, netloc, path, query, _ = urlsplit(url)
+        query_items = parse_qsl(query, keep_blank_values = True)
+        params = kwargs.get('params')
+        if isinstance(params, dict):
+            query_items += [ (str(key), str(item)) for key, value in params.items() if value is not None
+                             for item in (value if isinstance(value, (list, tuple)) else [ value ]) ]
+        elif isinstance(params, (list, tuple)):
+            query_items += [ (str(key), str(value)) for key, value in params ]
+        elif isinstance(params, (str, bytes)) and params:
+            query_items += parse_qsl(params.decode() if isinstance(params, bytes) else params)
+        query = urlencode(sorted(query_items))
+
+        return {
+            "method": method.upper(),
+            "url": urlunsplit((scheme, netloc, path, query, "")),
+            "url_template": f"{netloc}{self.utils.endpoint_template(path)}",
+            "path": path,
+            "query": query,
+            "body_hash": self._body_hash(kwargs)
+        }
+
+    def _match_key(self, request: Dict) -> Tuple:
+        fields = { "body": "body_hash" }
+        return tuple(request.get(fields.get(field, field)) for field in self.match_on)
+
+    @staticmethod
+    def _body_hash(kwargs: Dict) -> Optional[ str ]:
+        """Hash the request body in a form that does not depend on key order."""
+        if kwargs.get('json') is not None:
+            body = json.dumps(kwargs[ 'json' ], sort_keys = True, default = str).encode()
+        elif isinstance(kwargs.get('data'), dict):
+            body = urlencode(sorted((str(key), str(value)) for key, value in kwargs[ 'data' ].items())).encode()
+        elif isinstance(kwargs.get('data'), str):
+            body = kwargs[ 'data' ].encode()
+        elif isinstance(kwargs.get('data'), bytes):
+            body = kwargs[ 'data' ]
+        elif kwargs.get('files'):
+            # File contents may be streams, so only the field names identify the upload
+            files = kwargs[ 'files' ]
+            body = ("files:" + ",".join(sorted(files.keys() if isinstance(files, dict)
+                                               else (name for name, _ in files)))).encode()
+        else:
+            return None
+        return hashlib.sha256(body).hexdigest()
+
+    def _redact(self, headers: Any) -> Dict:
+        return { name: "REDACTED" if name.lower() in self.redact_headers else value
+                 for name, value in (headers or { }).items() }
+
+    @staticmethod
+    def _encode_body(content: bytes) -> Dict:
+        """Store text bodies readably and anything else as base64."""
+        try:
+            return { "body": content.decode("utf-8") }
+        except UnicodeDecodeError:
+            return { "body_base64": base64.b64encode(content).decode("ascii") }
+
+    def _to_response(self, interaction: Dict, method: str, url: str) -> requests.Response:
+        """Build a requests.Response from a recorded interaction."""
+        recorded = interaction[ "response" ]
+        if "body_base64" in recorded:
+            content = base64.b64decode(recorded[ "body_base64" ])
+        else:
+            content = (recorded.get("body") or "").encode("utf-8")
+        return self.utils.build_response(recorded[ "status_code" ], content, recorded.get("headers"),
+                                         recorded.get("url") or url, method, recorded.get("reason"),
+                                         recorded.get("encoding"), recorded.get("elapsed") or 0)
@@ -0,0 +1,355 @@
+import base64
+import fnmatch
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from typing import Dict, Any, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+import requests
+from robot.api import logger
+from robot.api.deco import library
+from RequestUtils import RequestUtils
+
+_CACHEABLE_METHODS = ('GET', 'HEAD')
+_CACHEABLE_STATUSES = (200, 203)
+_UNSAFE_METHODS = ('POST', 'PUT', 'PATCH', 'DELETE')
+_CONDITIONAL_HEADERS = ('if-none-match', 'if-modified-since', 'if-match', 'if-unmodified-since', 'if-range')
+_MAX_AGE = re.compile(r'(?:^|,)\s*max-age\s*=\s*"?(\d+)"?', re.IGNORECASE)
+_caches = { }
+# Counters of caches that were disabled or replaced, so the run summary stays complete
+_retired_stats = { }
+
+
+def get_http_cache(alias: Optional[ str ]) -> Optional[ 'HttpCache' ]:
+    """Return the response cache enabled for a session alias, or None."""
+    return _caches.get(alias) if alias else None
+
+
+def set_http_cache(alias: str, cache: Optional[ 'HttpCache' ]) -> None:
+    """Enable a response cache for a session alias, or disable it with None."""
+    previous = _caches.pop(alias, None)
+    if previous is not None and previous is not cache:
+        totals = _retired_stats.setdefault(alias, { })
+        for name, value in previous.stats.items():
+            totals[ name ] = totals.get(name, 0) + value
+    if cache is not None:
+        _caches[ alias ] = cache
+
+
+def get_http_cache_stats() -> Dict[ str, Dict ]:
+    """Return the statistics of every enabled cache per session alias."""
+    return { alias: cache.get_stats() for alias, cache in list(_caches.items()) }
+
+
+def format_http_cache_stats() -> Optional[ str ]:
+    """Summarize the cache counters of the run per session alias for the suite report."""
+    active = get_http_cache_stats()
+    lines = [ ]
+    for alias in sorted(set(active) | set(_retired_stats)):
+        stats = dict(_retired_stats.get(alias, { }))
+        for name, value in active.get(alias, { }).items():
+            stats[ name ] = stats.get(name, 0) + value
+        lines.append(f"{alias}: hits={stats.get('hits', 0)} revalidated={stats.get('revalidated', 0)} "
+                     f"misses={stats.get('misses', 0)} stores={stats.get('stores', 0)} "
+                     f"evictions={stats.get('evictions', 0)} entries={stats.get('entries', 0)}")
+    return "API response cache:\n" + "\n".join(lines) if lines else None
+
+
+@library(doc_format = 'ROBOT', auto_keywords=True)
+class HttpCache:
+    """
+    HTTP response cache for the GET and HEAD requests of one session.
+
+    Freshness follows Cache-Control (no-store, no-cache, max-age) and Expires. Stale entries with an
+    ETag or Last-Modified are revalidated with a conditional request, and a 304 answer is served from
+    the cache. A TTL override per endpoint pattern takes precedence over the response headers.
+    Entries are kept in an LRU bounded by count and size, and can be persisted to a directory so
+    other test processes reuse them.
+    """
+
+    def __init__(self, max_entries: int = 512, max_bytes: int = 32 * 1024 * 1024,
+                 ttl_overrides: Optional[ Dict[ str, float ] ] = None, persist_dir: Optional[ str ] = None):
+        """
+        Initialize the cache.
+
+        :param max_entries: Maximum number of responses kept in memory
+        :param max_bytes: Maximum total body size kept in memory
+        :param ttl_overrides: Seconds a response stays fresh per endpoint pattern (glob on the path or
+                              full URL, e.g. {"/lookups/*": 3600})
+        :param persist_dir: Directory entries are also written to and read from
+        """
+        self.max_entries = int(max_entries)
+        self.max_bytes = int(max_bytes)
+        self.ttl_overrides = { pattern: float(ttl) for pattern, ttl in (ttl_overrides or { }).items() }
+        self.persist_dir = persist_dir
+        self.utils = RequestUtils()
+        self.stats = { "hits": 0, "revalidated": 0, "misses": 0, "stores": 0, "evictions": 0,
+                       "bypassed": 0, "invalidations": 0, "disk_hits": 0 }
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        if persist_dir:
+            os.makedirs(persist_dir, exist_ok = True)
+
+    def is_cacheable_request(self, method: str, headers: Dict) -> bool:
+        """
+        Check whether a request may be answered from the cache.
+
+        Requests that carry their own conditional headers or ``Cache-Control: no-cache``/``no-store``
+        bypass the cache, so callers such as polling always see the server's answer.
+        """
+        if method.upper() not in _CACHEABLE_METHODS:
+            return False
+        lowered = { name.lower(): str(value).lower() for name, value in (headers or { }).items() if value is not None }
+        if any(name in lowered for name in _CONDITIONAL_HEADERS):
+            return False
+        cache_control = lowered.get('cache-control', '')
+        return 'no-cache' not in cache_control and 'no-store' not in cache_control
+
+    def send(self, method: str, url: str, headers: Dict, kwargs: Dict, send: Any) -> Any:
+        """
+        Answer a request from the cache, revalidate a stale entry, or send it and store the response.
+
+        :param method: HTTP method
+        :param url: Full request URL
+        :param headers: Headers the request is sent with (session and request headers)
+        :param kwargs: Request arguments; ``headers`` gets conditional headers on revalidation
+        :param send: Function sending the request, called with the request arguments
+        :return: The response
+        """
+        if not self.is_cacheable_request(method, headers):
+            self.stats[ "bypassed" ] += 1
+            response = send(kwargs)
+            # Invalidated once the write is done, so a GET running meanwhile cannot re-cache the old body;
+            # without a response the write may still have reached the server
+            if method.upper() in _UNSAFE_METHODS and (response is None or response.status_code < 400):
+                self.invalidate(url)
+            return response
+
+        key = self._key(method, url, headers, kwargs.get('params'))
+        entry = self._get(key)
+        if entry is not None and entry[ "vary" ] != self._vary_values(entry[ "vary" ].keys(), headers):
+            entry = None
+
+        if entry is not None and entry[ "expires_at" ] is not None and entry[ "expires_at" ] > time.time():
+            self.stats[ "hits" ] += 1
+            return self._to_response(entry, method)
+
+        if entry is not None and (entry[ "etag" ] or entry[ "last_modified" ]):
+            conditional = dict(kwargs.get('headers') or { })
+            if entry[ "etag" ]:
+                conditional[ 'If-None-Match' ] = entry[ "etag" ]
+            if entry[ "last_modified" ]:
+                conditional[ 'If-Modified-Since' ] = entry[ "last_modified" ]
+            response = send(dict(kwargs, headers = conditional))
+            if response is not None and response.status_code == 304:
+                self.stats[ "revalidated" ] += 1
+                entry = self._refresh(key, entry, response, url)
+                return self._to_response(entry, method)
+        else:
+            response = send(kwargs)
+
+        self.stats[ "misses" ] += 1
+        self._store(key, method, url, headers, response)
+        return response
+
+    def invalidate(self, url: str) -> None:
+        """Drop the cached responses of a URL, as done after an unsafe request to it."""
+        prefix = self._normalize_url(url, None)
+        with self._lock:
+            keys = [ key for key in self._entries if key[ 1 ] == prefix ]
+            for key in keys:
+                self._size -= len(self._entries.pop(key)[ "content" ])
+                self.stats[ "invalidations" ] += 1
+        for key in keys:
+            path = self._disk_path(key)
+            if path and os.path.exists(path):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def clear(self, include_disk: bool = False) -> None:
+        """Drop all entries from memory and, optionally, from the persist directory."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+        if include_disk and self.persist_dir:
+            for name in os.listdir(self.persist_dir):
+                if name.endswith(".json"):
+                    os.remove(os.path.join(self.persist_dir, name))
+
+    def get_stats(self) -> Dict:
+        """Return the hit, revalidation, miss and eviction counters and the current size."""
+        with self._lock:
+            return dict(self.stats, entries = len(self._entries), bytes = self._size)
+
+    def _key(self, method: str, url: str, headers: Dict, params: Any) -> Tuple:
+        # Responses for different credentials must never be shared
+        authorization = next((str(value) for name, value in (headers or { }).items()
+                              if name.lower() == 'authorization'), "")
+        return (method.upper(), self._normalize_url(url, params),
+                hashlib.sha256(authorization.encode()).hexdigest()[ :16 ])
+
+    @staticmethod
+    def _normalize_url(url: str, params: Any) -> str:
+        """Full URL with the query (including params) in a stable order."""
+        scheme, netloc, path, query, _ = urlsplit(url)
+        items = parse_qsl(query, keep_blank_values = True)
+        if isinstance(params, dict):
+            items += [ (str(key), str(item)) for key, value in params.items() if value is not None
+                       for item in (value if isinstance(value, (list, tuple)) else [ value ]) ]
+        elif isinstance(params, (list, tuple)):
+            items += [ (str(key), str(value)) for key, value in params ]
+        return urlunsplit((scheme, netloc, path, urlencode(sorted(items)), ""))
+
+    @staticmethod
+    def _vary_values(names: Any, headers: Dict) -> Dict:
+        lowered = { name.lower(): value for name, value in (headers or { }).items() }
+        return { name: lowered.get(name) for name in names }
+
+    def _get(self, key: Tuple) -> Optional[ Dict ]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+        entry = self._read_disk(key)
+        if entry is not None:
+            self.stats[ "disk_hits" ] += 1
+            self._put(key, entry)
+        return entry
+
+    def _store(self, key: Tuple, method: str, url: str, headers: Dict, response: Any) -> None:
+        if response is None or response.status_code not in _CACHEABLE_STATUSES:
+            return
+        if getattr(response, '_content', None) is False:
+            # Streamed bodies are left to the caller
+            return
+        cache_control = response.headers.get('Cache-Control', '').lower()
+        ttl = self._ttl_override(url)
+        if ttl is None:
+            if 'no-store' in cache_control:
+                return
+            ttl = 0 if 'no-cache' in cache_control else self._freshness(response)
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if not ttl and not etag and not last_modified:
+            # Could neither be served nor revalidated
+            return
+        vary = response.headers.get('Vary', '')
+        if vary.strip() == '*':
+            return
+
+        entry = {
+            "url": url,
+            "status_code": response.status_code,
+            "reason": response.reason,
+            "headers": dict(response.headers),
+            "encoding": response.encoding,
+            "content": response.content or b"",
+            "expires_at": time.time() + ttl if ttl else None,
+            "etag": etag,
+            "last_modified": last_modified,
+            "vary": self._vary_values([ name.strip().lower() for name in vary.split(',') if name.strip() ], headers)
+        }
+        if len(entry[ "content" ]) > self.max_bytes:
+            return
+        self._put(key, entry)
+        self.stats[ "stores" ] += 1
+        self._write_disk(key, entry)
+
+    def _refresh(self, key: Tuple, entry: Dict, response: Any, url: str) -> Dict:
+        """Update an entry after a 304 Not Modified."""
+        entry = dict(entry, headers = dict(entry[ "headers" ], **{
+            name: value for name, value in response.headers.items()
+            if name.lower() in ('cache-control', 'expires', 'etag', 'last-modified', 'date') }))
+        ttl = self._ttl_override(url)
+        if ttl is None:
+            cache_control = entry[ "headers" ].get('Cache-Control', '').lower()
+            ttl = 0 if 'no-cache' in cache_control else self._freshness(response)
+        entry[ "expires_at" ] = time.time() + ttl if ttl else None
+        entry[ "etag" ] = response.headers.get('ETag') or entry[ "etag" ]
+        self._put(key, entry)
+        self._write_disk(key, entry)
+        return entry
+
+    def _put(self, key: Tuple, entry: Dict) -> None:
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous[ "content" ])
+            self._entries[ key ] = entry
+            self._size += len(entry[ "content" ])
+            while self._entries and (len(self._entries) > self.max_entries or self._size > self.max_bytes):
+                _, evicted = self._entries.popitem(last = False)
+                self._size -= len(evicted[ "content" ])
+                self.stats[ "evictions" ] += 1
+
+    def _ttl_override(self, url: str) -> Optional[ float ]:
+        path = urlsplit(url).path
+        for pattern, ttl in self.ttl_overrides.items():
+            if fnmatch.fnmatch(path, pattern) or fnmatch.fnmatch(url, pattern):
+                return ttl
+        return None
+
+    @staticmethod
+    def _freshness(response: Any) -> float:
+        """Seconds a response stays fresh according to max-age, Age and Expires."""
+        match = _MAX_AGE.search(response.headers.get('Cache-Control', ''))
+        if match:
+            age = response.headers.get('Age', '0')
+            return max(int(match.group(1)) - (int(age) if age.isdigit() else 0), 0)
+        expires = response.headers.get('Expires')
+        if expires:
+            try:
+                date = response.headers.get('Date')
+                now = parsedate_to_datetime(date).timestamp() if date else time.time()
+                return max(parsedate_to_datetime(expires).timestamp() - now, 0)
+            except (TypeError, ValueError):
+                # An invalid Expires means already expired
+                return 0
+        return 0
+
+    def _to_response(self, entry: Dict, method: str) -> requests.Response:
+        return self.utils.build_response(entry[ "status_code" ], b"" if method.upper() == 'HEAD' else entry[ "content" ],
+                                         entry[ "headers" ], entry[ "url" ], method, entry[ "reason" ],
+                                         entry[ "encoding" ])
+
+    def _disk_path(self, key: Tuple) -> Optional[ str ]:
+        if not self.persist_dir:
+            return None
+        return os.path.join(self.persist_dir, hashlib.sha256(repr(key).encode()).hexdigest() + ".json")
+
+    def _read_disk(self, key: Tuple) -> Optional[ Dict ]:
+        path = self._disk_path(key)
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            with open(path, encoding = "utf-8") as file:
+                entry = json.load(file)
+            entry[ "content" ] = base64.b64decode(entry.pop("content_base64"))
+            return entry
+        except (OSError, ValueError, KeyError) as e:
+            logger.debug(f"Ignoring unreadable cache file {path}: {e}")
+            return None
+
+    def _write_disk(self, key: Tuple, entry: Dict) -> None:
+        path = self._disk_path(key)
+        if not path:
+            return
+        data = { name: value for name, value in entry.items() if name != "content" }
+        data[ "content_base64" ] = base64.b64encode(entry[ "content" ]).decode("ascii")
+        # Write to a temporary file first, so other processes never read a partial entry
+        temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temporary, "w", encoding = "utf-8") as file:
+                json.dump(data, file)
+            os.replace(temporary, path)
+        except OSError as e:
+            logger.debug(f"Could not persist cache entry to {path}: {e}")
@@ -0,0 +1,418 @@
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+# Marks a value that does not exist in the document (distinct from a JSON null)
+MISSING = object()
+
+_WILDCARD = ("wild",)
+
+_FILTER_TOKEN = re.compile(r"""\s*(?:
+    (?P<op>==|!=|<=|>=|=~|<|>)
+    |(?P<and>&&)
+    |(?P<or>\|\|)
+    |(?P<lp>\()
+    |(?P<rp>\))
+    |(?P<not>!)
+    |(?P<str>'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")
+    |(?P<num>-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?)
+    |(?P<kw>true|false|null)
+    |(?P<ref>@[^\s=!<>&|()~]*)
+)""", re.VERBOSE)
+
+_COMPARATORS = {
+    "==": lambda left, right: left == right,
+    "!=": lambda left, right: left != right,
+    "<": lambda left, right: left < right,
+    "<=": lambda left, right: left <= right,
+    ">": lambda left, right: left > right,
+    ">=": lambda left, right: left >= right,
+    "=~": lambda left, right: isinstance(left, str) and re.search(right, left) is not None,
+}
+
+
+class CompiledPath:
+    """
+    A parsed JSON path that can be evaluated many times without re-parsing.
+
+    Supported syntax (a leading ``$`` or ``$.`` is optional):
+
+    - ``data.user.id`` / ``items.0.name``: dot notation, digits index into lists
+    - ``items[0]``, ``items[-1]``, ``['key.with.dots']``: bracket index or quoted key
+    - ``items[*]`` or ``items.*``: every element of a list or every value of an object
+    - ``items[1:5]``, ``items[::2]``: slices
+    - ``items[?(@.status == 'active' && @.age >= 18)]``: filters with ``== != < <= > >= =~``,
+      ``&&``, ``||``, ``!`` and parentheses; ``[?(@.email)]`` keeps items where the field exists
+    - ``items[*].{id, email: owner.email}``: multi-select into a dictionary
+
+    A path without wildcards, slices or filters is *definite* and yields a single value;
+    any other path yields a list of all matches.
+    """
+
+    def __init__(self, path: str, steps: Tuple):
+        self.path = path
+        self.steps = steps
+        self.definite = all(step[ 0 ] in ("key", "index", "multi") for step in steps)
+
+    def find(self, data: Any, default: Any = None) -> Any:
+        """
+        Evaluate the path against a document.
+
+        :param data: Parsed JSON document
+        :param default: Value returned when a definite path does not match
+        :return: The value for a definite path, otherwise a list of matches
+        """
+        return _finalize(self, _evaluate(self.steps, [ data ]), default)
+
+    def __repr__(self) -> str:
+        return f"CompiledPath({self.path!r})"
+
+
+@lru_cache(maxsize = 1024)
+def compile_path(path: str) -> CompiledPath:
+    """
+    Parse a JSON path, caching the result so repeated lookups skip parsing.
+
+    :param path: The path expression
+    :return: The compiled path
+    :raises ValueError: If the expression cannot be parsed
+    """
+    return CompiledPath(path, tuple(_parse(path)))
+
+
+def find(data: Any, path: str, default: Any = None) -> Any:
+    """
+    Extract a value from a parsed JSON document.
+
+    :param data: Parsed JSON document
+    :param path: The path expression
+    :param default: Value returned when a definite path does not match
+    :return: The value for a definite path, otherwise a list of matches
+    """
+    return compile_path(path).find(data, default)
+
+
+def extract_many(data: Any, paths: Union[ List[ str ], Dict[ str, str ] ], default: Any = None) -> Dict[ str, Any ]:
+    """
+    Extract many paths in a single pass over the document.
+
+    The compiled paths are merged into a prefix tree, so a prefix shared by several paths
+    (for example ``data.items[*]``) is walked once for all of them.
+
+    :param data: Parsed JSON document
+    :param paths: List of paths, or a dictionary mapping result names to paths
+    :param default: Value used for definite paths that do not match
+    :return: Dictionary mapping each name (or path) to its extracted value
+    """
+    named = paths if isinstance(paths, dict) else { path: path for path in paths }
+
+    trie = { "children": { }, "targets": [ ] }
+    for name, path in named.items():
+        compiled = compile_path(path)
+        node = trie
+        for step in compiled.steps:
+            node = node[ "children" ].setdefault(step, { "children": { }, "targets": [ ] })
+        node[ "targets" ].append((name, compiled))
+
+    results = { }
+    pending = [ (trie, [ data ]) ]
+    while pending:
+        node, values = pending.pop()
+        for name, compiled in node[ "targets" ]:
+            results[ name ] = _finalize(compiled, values, default)
+        for step, child in node[ "children" ].items():
+            pending.append((child, _apply_step(step, values)))
+
+    return { name: results[ name ] for name in named }
+
+
+def _finalize(compiled: CompiledPath, values: List, default: Any) -> Any:
+    """Turn raw matches into the value returned for a path."""
+    matches = [ value for value in values if value is not MISSING ]
+    if compiled.definite:
+        return matches[ 0 ] if matches else default
+    return matches
+
+
+def _evaluate(steps: Tuple, values: List) -> List:
+    """Apply steps one after another to a list of current nodes."""
+    for step in steps:
+        if not values:
+            break
+        values = _apply_step(step, values)
+    return values
+
+
+def _apply_step(step: Tuple, values: List) -> List:
+    """Apply a single step to every current node and collect the results."""
+    kind = step[ 0 ]
+    result = [ ]
+
+    for value in values:
+        if kind == "key":
+            key = step[ 1 ]
+            if isinstance(value, dict):
+                if key in value:
+                    result.append(value[ key ])
+            elif isinstance(value, list) and _is_int(key):
+                index = int(key)
+                if -len(value) <= index < len(value):
+                    result.append(value[ index ])
+        elif kind == "index":
+            if isinstance(value, list) and -len(value) <= step[ 1 ] < len(value):
+                result.append(value[ step[ 1 ] ])
+        elif kind == "wild":
+            if isinstance(value, list):
+                result.extend(value)
+            elif isinstance(value, dict):
+                result.extend(value.values())
+        elif kind == "slice":
+            if isinstance(value, list):
+                result.extend(value[ slice(*step[ 1: ]) ])
+        elif kind == "filter":
+            items = value if isinstance(value, list) else value.values() if isinstance(value, dict) else [ ]
+            predicate = step[ 2 ]
+            result.extend(item for item in items if predicate(item))
+        elif kind == "multi":
+            result.append({ name: sub_path.find(value) for name, sub_path in step[ 1 ] })
+
+    return result
+
+
+def _is_int(text: str) -> bool:
+    return text.isdigit() or (text.startswith('-') and text[ 1: ].isdigit())
+
+
+def _find_closing(path: str, start: int) -> int:
+    """Find the bracket closing the one at ``start``, skipping quoted text and nested brackets."""
+    pairs = { "[": "]", "(": ")", "{": "}" }
+    stack = [ pairs[ path[ start ] ] ]
+    quote = None
+    i = start + 1
+    while i < len(path):
+        char = path[ i ]
+        if quote:
+            if char == "\\":
+                i += 1
+            elif char == quote:
+                quote = None
+        elif char in ("'", '"'):
+            quote = char
+        elif char in pairs:
+            stack.append(pairs[ char ])
+        elif char == stack[ -1 ]:
+            stack.pop()
+            if not stack:
+                return i
+        i += 1
+    raise ValueError(f"Unbalanced brackets in JSON path '{path}'")
+
+
+def _split_top_level(text: str, separator: str = ",") -> List[ str ]:
+    """Split on a separator that is not inside quotes or brackets."""
+    parts, depth, quote, current = [ ], 0, None, [ ]
+    i = 0
+    while i < len(text):
+        char = text[ i ]
+        if quote:
+            if char == "\\" and i + 1 < len(text):
+                current.append(char)
+                i += 1
+                char = text[ i ]
+            elif char == quote:
+                quote = None
+        elif char in ("'", '"'):
+            quote = char
+        elif char in "[({":
+            depth += 1
+        elif char in "])}":
+            depth -= 1
+        elif char == separator and depth == 0:
+            parts.append("".join(current).strip())
+            current = [ ]
+            i += 1
+            continue
+        current.append(char)
+        i += 1
+    parts.append("".join(current).strip())
+    return parts
+
+
+def _unquote(text: str) -> str:
+    return re.sub(r"\\(.)", r"\1", text[ 1:-1 ])
+
+
+def _parse(path: str) -> List[ Tuple ]:
+    """Parse a path expression into a list of steps."""
+    if not isinstance(path, str):
+        raise ValueError(f"JSON path must be a string, got {type(path)}")
+
+    steps = [ ]
+    path = path.strip()
+    i = 1 if path.startswith('$') else 0
+    while i < len(path):
+        char = path[ i ]
+        if char == '.':
+            i += 1
+        elif char == '[':
+            end = _find_closing(path, i)
+            steps.append(_parse_bracket(path[ i + 1:end ].strip(), path))
+            i = end + 1
+        elif char == '{':
+            end = _find_closing(path, i)
+            steps.append(_parse_multi(path[ i + 1:end ]))
+            i = end + 1
+        else:
+            end = i
+            while end < len(path) and path[ end ] not in '.[{':
+                end += 1
+            name = path[ i:end ]
+            steps.append(_WILDCARD if name == '*' else ("key", name))
+            i = end
+    return steps
+
+
+def _parse_bracket(content: str, path: str) -> Tuple:
+    """Parse the content of a ``[...]`` segment."""
+    if content == '*':
+        return _WILDCARD
+    if content.startswith('?'):
+        expression = content[ 1: ].strip()
+        return ("filter", expression, _compile_filter(expression))
+    if len(content) >= 2 and content[ 0 ] in ("'", '"') and content[ -1 ] == content[ 0 ]:
+        return ("key", _unquote(content))
+    if ':' in content:
+        try:
+            bounds = [ int(part) if part.strip() else None for part in content.split(':') ]
+        except ValueError:
+            raise ValueError(f"Invalid slice '[{content}]' in JSON path '{path}'")
+        if len(bounds) > 3:
+            raise ValueError(f"Invalid slice '[{content}]' in JSON path '{path}'")
+        return ("slice",) + tuple(bounds + [ None ] * (3 - len(bounds)))
+    if _is_int(content):
+        return ("index", int(content))
+    return ("key", content)
+
+
+def _parse_multi(content: str) -> Tuple:
+    """Parse a ``{a, b, alias: c.d}`` multi-select segment."""
+    fields = [ ]
+    for item in _split_top_level(content):
+        if not item:
+            continue
+        name, sub_path = item, item
+        match = re.match(r"^([A-Za-z_][\w-]*)\s*:\s*(.+)$", item)
+        if match:
+            name, sub_path = match.group(1), match.group(2)
+        fields.append((name, compile_path(sub_path)))
+    return ("multi", tuple(fields))
+
+
+@lru_cache(maxsize = 256)
+def _compile_filter(expression: str):
+    """Compile a filter expression such as ``(@.age > 18 && @.active == true)`` into a predicate."""
+    tokens = [ ]
+    position = 0
+    expression = expression.strip()
+    while position < len(expression):
+        match = _FILTER_TOKEN.match(expression, position)
+        if not match or match.end() == position:
+            if expression[ position: ].strip() == "":
+                break
+            raise ValueError(f"Invalid filter expression '{expression}'")
+        kind = match.lastgroup
+        tokens.append((kind, match.group(kind)))
+        position = match.end()
+
+    parser = _FilterParser(tokens, expression)
+    predicate = parser.parse_or()
+    if parser.position != len(tokens):
+        raise ValueError(f"Invalid filter expression '{expression}'")
+    return predicate
+
+
+class _FilterParser:
+    """Recursive descent parser producing predicate functions for filter expressions."""
+
+    def __init__(self, tokens: List[ Tuple[ str, str ] ], expression: str):
+        self.tokens = tokens
+        self.expression = expression
+        self.position = 0
+
+    def _peek(self) -> Optional[ str ]:
+        return self.tokens[ self.position ][ 0 ] if self.position < len(self.tokens) else None
+
+    def _take(self) -> Tuple[ str, str ]:
+        if self.position >= len(self.tokens):
+            raise ValueError(f"Unexpected end of filter expression '{self.expression}'")
+        token = self.tokens[ self.position ]
+        self.position += 1
+        return token
+
+    def parse_or(self):
+        predicates = [ self.parse_and() ]
+        while self._peek() == "or":
+            self._take()
+            predicates.append(self.parse_and())
+        if len(predicates) == 1:
+            return predicates[ 0 ]
+        return lambda item: any(predicate(item) for predicate in predicates)
+
+    def parse_and(self):
+        predicates = [ self.parse_unary() ]
+        while self._peek() == "and":
+            self._take()
+            predicates.append(self.parse_unary())
+        if len(predicates) == 1:
+            return predicates[ 0 ]
+        return lambda item: all(predicate(item) for predicate in predicates)
+
+    def parse_unary(self):
+        kind = self._peek()
+        if kind == "not":
+            self._take()
+            inner = self.parse_unary()
+            return lambda item: not inner(item)
+        if kind == "lp":
+            self._take()
+            inner = self.parse_or()
+            if self._take()[ 0 ] != "rp":
+                raise ValueError(f"Missing ')' in filter expression '{self.expression}'")
+            return inner
+        return self.parse_comparison()
+
+    def parse_comparison(self):
+        left = self.parse_operand()
+        if self._peek() != "op":
+            return lambda item: left(item) is not MISSING
+
+        comparator = _COMPARATORS[ self._take()[ 1 ] ]
+        right = self.parse_operand()
+
+        def predicate(item):
+            left_value, right_value = left(item), right(item)
+            if left_value is MISSING or right_value is MISSING:
+                return False
+            try:
+                return comparator(left_value, right_value)
+            except (TypeError, re.error):
+                return False
+
+        return predicate
+
+    def parse_operand(self):
+        kind, text = self._take()
+        if kind == "ref":
+            sub_path = compile_path(text[ 1: ]) if len(text) > 1 else None
+            if sub_path is None:
+                return lambda item: item
+            return lambda item: sub_path.find(item, MISSING)
+        if kind == "str":
+            value = _unquote(text)
+        elif kind == "num":
+            value = float(text) if any(char in text for char in ".eE") else int(text)
+        elif kind == "kw":
+            value = { "true": True, "false": False, "null": None }[ text ]
+        else:
+            raise ValueError(f"Unexpected '{text}' in filter expression '{self.expression}'")
+        return lambda item: value
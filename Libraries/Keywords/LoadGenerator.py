@@ -0,0 +1,307 @@
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, List
+from robot.api import logger
+from robot.api.deco import library
+from RequestPipeline import RequestContext
+from RequestUtils import RequestUtils
+
+# Upper bounds (ms) of the histogram buckets in load reports
+HISTOGRAM_BOUNDS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+
+class LatencyHistogram:
+    """
+    Latency histogram with logarithmic buckets.
+
+    Memory stays constant however many requests are recorded, and percentiles are accurate to about
+    ``resolution`` (relative), which is what a load run needs instead of keeping every sample.
+    """
+
+    def __init__(self, resolution: float = 0.02, min_value: float = 0.0001):
+        """
+        :param resolution: Relative width of a bucket
+        :param min_value: Smallest latency in seconds told apart from zero
+        """
+        self.min_value = min_value
+        self._log_growth = math.log(1 + resolution)
+        self._growth = 1 + resolution
+        self._buckets = { }
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def record(self, seconds: float) -> None:
+        """Add a latency in seconds."""
+        index = 0 if seconds <= self.min_value else int(math.ceil(math.log(seconds / self.min_value) / self._log_growth))
+        self._buckets[ index ] = self._buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+
+    def percentile(self, pct: float) -> Optional[ float ]:
+        """Return the latency in seconds below which pct percent of the recorded values fall."""
+        if not self.count:
+            return None
+        rank = max(1, int(math.ceil(self.count * float(pct) / 100)))
+        seen = 0
+        for index in sorted(self._buckets):
+            seen += self._buckets[ index ]
+            if seen >= rank:
+                return min(self.min_value * self._growth ** index, self.max)
+        return self.max
+
+    def counts(self, bounds_ms: tuple = HISTOGRAM_BOUNDS_MS) -> List[ Dict ]:
+        """Return the number of values per bucket of the given upper bounds, plus an open last bucket."""
+        counts = [ 0 ] * (len(bounds_ms) + 1)
+        for index, count in self._buckets.items():
+            upper_ms = self.min_value * self._growth ** index * 1000
+            position = next((i for i, bound in enumerate(bounds_ms) if upper_ms <= bound * (1 + 1e-9)),
+                            len(bounds_ms))
+            counts[ position ] += count
+        labels = [ f"<={bound}" for bound in bounds_ms ] + [ f">{bounds_ms[ -1 ]}" ]
+        return [ { "le_ms": label, "count": count } for label, count in zip(labels, counts) ]
+
+
+@library(doc_format = 'ROBOT', auto_keywords=True)
+class LoadGenerator:
+    """
+    Replays one request definition at a target rate or concurrency for a while and measures the result.
+
+    Every request runs through the request pipeline of the RequestSender, so sessions, token handling,
+    retries and metrics work exactly as for `Send API Request`. Responses are not wrapped or logged
+    while the load runs, and latencies are kept in a histogram rather than as samples.
+    """
+
+    def __init__(self, request_sender: Any):
+        """
+        :param request_sender: RequestSender whose pipeline sends the requests
+        """
+        self.request_sender = request_sender
+        self.utils = RequestUtils()
+        self.last_report = None
+
+    def run(self, method: Optional[ str ] = None, alias: Optional[ str ] = None, endpoint: Optional[ str ] = None,
+            url: Optional[ str ] = None, duration: float = 10, rate: Optional[ float ] = None,
+            concurrency: int = 10, max_requests: Optional[ int ] = None, **kwargs) -> Dict:
+        """
+        Send a request repeatedly and report latency, errors and throughput.
+
+        Without rate, ``concurrency`` workers send requests back to back (closed model). With rate,
+        requests are started at that many per second by at most ``concurrency`` workers (open model);
+        latency then counts from the scheduled start, so a slow server is not hidden by requests
+        that started late.
+
+        :param method: HTTP method
+        :param alias: Session alias
+        :param endpoint: Endpoint relative to the session URL
+        :param url: Full URL for requests without a session
+        :param duration: Seconds to generate load for
+        :param rate: Requests started per second (optional)
+        :param concurrency: Maximum number of requests in flight
+        :param max_requests: Stop after this many requests (optional)
+        :param kwargs: Request options as accepted by send_request (headers, json, expected_status, ...)
+        :return: The load report
+        """
+        duration = float(duration)
+        concurrency = max(1, int(concurrency or 1))
+        rate = float(rate) if rate else None
+        max_requests = int(max_requests) if max_requests else None
+        template = self.request_sender.prepare_request(method, alias, endpoint, url, **kwargs)
+        if template is None:
+            raise ValueError("The load request could not be prepared, see the log for the reason")
+        if hasattr(template.kwargs.get('data'), 'read'):
+            raise ValueError("Streamed request bodies cannot be replayed under load")
+        expected = self.utils.normalize_status_list(template.control_params.get('expected_status'))
+
+        state = {
+            "histogram": LatencyHistogram(),
+            "statuses": { },
+            "errors": 0,
+            "error_messages": [ ],
+            "timeline": { },
+            "max_lag": 0.0,
+            "lock": threading.Lock()
+        }
+        auto_log = self.request_sender.auto_log
+        # Logging every response would dominate the measurement
+        self.request_sender.auto_log = False
+        start = time.perf_counter()
+        try:
+            if rate:
+                sent = self._run_open(template, expected, state, start, duration, rate, concurrency, max_requests)
+            else:
+                sent = self._run_closed(template, expected, state, start, duration, concurrency, max_requests)
+        finally:
+            self.request_sender.auto_log = auto_log
+        elapsed = time.perf_counter() - start
+
+        self.last_report = self._build_report(template, state, sent, elapsed, rate, concurrency)
+        logger.info(self.format_report(self.last_report))
+        return self.last_report
+
+    def _run_closed(self, template: RequestContext, expected: List[ int ], state: Dict, start: float,
+                    duration: float, concurrency: int, max_requests: Optional[ int ]) -> int:
+        """Let each worker send the next request as soon as its previous one finished."""
+        deadline = start + duration
+        counter = { "sent": 0 }
+
+        def worker() -> None:
+            while time.perf_counter() < deadline:
+                with state[ "lock" ]:
+                    if max_requests is not None and counter[ "sent" ] >= max_requests:
+                        return
+                    counter[ "sent" ] += 1
+                self._send(template, expected, state, start, time.perf_counter())
+
+        threads = [ threading.Thread(target = worker, name = f"api-load-{i}", daemon = True)
+                    for i in range(concurrency) ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return counter[ "sent" ]
+
+    def _run_open(self, template: RequestContext, expected: List[ int ], state: Dict, start: float,
+                  duration: float, rate: float, concurrency: int, max_requests: Optional[ int ]) -> int:
+        """Start requests on a fixed schedule, with at most concurrency of them in flight."""
+        interval = 1.0 / rate
+        total = int(duration * rate)
+        if max_requests is not None:
+            total = min(total, max_requests)
+        slots = threading.BoundedSemaphore(concurrency)
+
+        def send(scheduled: float) -> None:
+            try:
+                self._send(template, expected, state, start, scheduled)
+            finally:
+                slots.release()
+
+        with ThreadPoolExecutor(max_workers = concurrency, thread_name_prefix = "api-load") as executor:
+            for index in range(total):
+                scheduled = start + index * interval
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                slots.acquire()
+                lag = time.perf_counter() - scheduled
+                if lag > state[ "max_lag" ]:
+                    state[ "max_lag" ] = lag
+                executor.submit(send, scheduled)
+        return total
+
+    def _send(self, template: RequestContext, expected: List[ int ], state: Dict, start: float,
+              scheduled: float) -> None:
+        """Send one request and record its outcome; never raises."""
+        context = template.copy()
+        error = None
+        try:
+            response = self.request_sender.pipeline.run(context)
+        except Exception as e:
+            response, error = None, e
+        finished = time.perf_counter()
+        status_code = response.status_code if response is not None else None
+        if status_code is None:
+            failed = True
+            error = error or context.error
+        elif expected:
+            failed = status_code not in expected
+        else:
+            failed = status_code >= 400
+
+        second = int(finished - start)
+        with state[ "lock" ]:
+            state[ "histogram" ].record(finished - scheduled)
+            key = str(status_code) if status_code is not None else "none"
+            state[ "statuses" ][ key ] = state[ "statuses" ].get(key, 0) + 1
+            slot = state[ "timeline" ].setdefault(second, [ 0, 0 ])
+            slot[ 0 ] += 1
+            if failed:
+                state[ "errors" ] += 1
+                slot[ 1 ] += 1
+                if error is not None and len(state[ "error_messages" ]) < 10:
+                    state[ "error_messages" ].append(f"{type(error).__name__}: {error}")
+
+    def _build_report(self, template: RequestContext, state: Dict, sent: int, elapsed: float,
+                      rate: Optional[ float ], concurrency: int) -> Dict:
+        histogram = state[ "histogram" ]
+
+        def ms(value: Optional[ float ]) -> Optional[ float ]:
+            return round(value * 1000, 3) if value is not None else None
+
+        completed = histogram.count
+        return {
+            "request": f"{template.method.upper()} {template.target}",
+            "alias": template.alias or "DIRECT",
+            "mode": "rate" if rate else "concurrency",
+            "target_rate": rate,
+            "concurrency": concurrency,
+            "duration_s": round(elapsed, 3),
+            "requests": completed,
+            "sent": sent,
+            "errors": state[ "errors" ],
+            "error_rate": round(state[ "errors" ] / completed, 4) if completed else 0.0,
+            "throughput": round(completed / elapsed, 2) if elapsed > 0 else 0.0,
+            "latency_ms": {
+                "min": ms(histogram.min),
+                "mean": ms(histogram.total / completed) if completed else None,
+                "p50": ms(histogram.percentile(50)),
+                "p90": ms(histogram.percentile(90)),
+                "p95": ms(histogram.percentile(95)),
+                "p99": ms(histogram.percentile(99)),
+                "max": ms(histogram.max)
+            },
+            "histogram": histogram.counts(),
+            "status_codes": dict(sorted(state[ "statuses" ].items())),
+            "error_messages": state[ "error_messages" ],
+            "timeline": [ { "second": second, "requests": counts[ 0 ], "errors": counts[ 1 ] }
+                          for second, counts in sorted(state[ "timeline" ].items()) ],
+            "max_schedule_lag_ms": ms(state[ "max_lag" ]) if rate else None
+        }
+
+    def check_thresholds(self, report: Optional[ Dict ] = None, max_p95_ms: Optional[ float ] = None,
+                         max_p99_ms: Optional[ float ] = None, max_error_rate: Optional[ float ] = None,
+                         min_throughput: Optional[ float ] = None) -> List[ str ]:
+        """
+        Compare a load report with limits.
+
+        :param report: Report returned by run (default: the last one)
+        :return: Descriptions of the limits that were exceeded, empty when all are met
+        """
+        report = report or self.last_report
+        if report is None:
+            raise ValueError("No load report available, run a load first")
+        latency = report[ "latency_ms" ]
+        violations = [ ]
+        if max_p95_ms is not None and (latency[ "p95" ] is None or latency[ "p95" ] > float(max_p95_ms)):
+            violations.append(f"p95 latency {latency[ 'p95' ]} ms exceeds {max_p95_ms} ms")
+        if max_p99_ms is not None and (latency[ "p99" ] is None or latency[ "p99" ] > float(max_p99_ms)):
+            violations.append(f"p99 latency {latency[ 'p99' ]} ms exceeds {max_p99_ms} ms")
+        if max_error_rate is not None and report[ "error_rate" ] > float(max_error_rate):
+            violations.append(f"error rate {report[ 'error_rate' ]} exceeds {max_error_rate}")
+        if min_throughput is not None and report[ "throughput" ] < float(min_throughput):
+            violations.append(f"throughput {report[ 'throughput' ]} req/s is below {min_throughput} req/s")
+        return violations
+
+    @staticmethod
+    def format_report(report: Dict) -> str:
+        """Render a load report as a short text summary."""
+        latency = report[ "latency_ms" ]
+        target = f"{report[ 'target_rate' ]} req/s" if report[ "target_rate" ] else "unthrottled"
+        lines = [
+            f"Load {report[ 'request' ]} for {report[ 'duration_s' ]}s ({target}, concurrency "
+            f"{report[ 'concurrency' ]}): {report[ 'requests' ]} requests, {report[ 'throughput' ]} req/s, "
+            f"{report[ 'errors' ]} errors ({report[ 'error_rate' ] * 100:.2f}%)",
+            "latency ms: " + ", ".join(f"{name} {value}" for name, value in latency.items()),
+            "status codes: " + ", ".join(f"{status}={count}" for status, count in report[ "status_codes" ].items()),
+            "histogram ms: " + ", ".join(f"{bucket[ 'le_ms' ]}: {bucket[ 'count' ]}"
+                                         for bucket in report[ "histogram" ] if bucket[ "count" ])
+        ]
+        if report[ "max_schedule_lag_ms" ]:
+            lines.append(f"max schedule lag: {report[ 'max_schedule_lag_ms' ]} ms")
+        lines += [ f"error: {message}" for message in report[ "error_messages" ] ]
+        return "\n".join(lines)
@@ -0,0 +1,360 @@
+import csv
+import json
+import os
+import socket
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, Optional, List
+import requests
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import NewConnectionError, ConnectTimeoutError
+from robot.api import logger
+from robot.api.deco import library
+from RequestUtils import RequestUtils
+
+_context = threading.local()
+
+
+def start_request_timing() -> Dict:
+    """Start collecting timings for the request sent by the current thread."""
+    timing = {
+        "attempts": 0, "connections": 0, "dns": 0.0, "connect": 0.0, "tls": 0.0,
+        "http": 0.0, "wait": 0.0, "ttfb": None, "alias": None, "method": None, "endpoint": None,
+        "status_code": None, "request_bytes": None, "response_bytes": None
+    }
+    _context.timing = timing
+    return timing
+
+
+def get_request_timing() -> Optional[ Dict ]:
+    """Return the timings being collected by the current thread, or None."""
+    return getattr(_context, 'timing', None)
+
+
+def stop_request_timing() -> None:
+    """Stop collecting timings for the current thread."""
+    _context.timing = None
+
+
+class _TimedConnectionMixin:
+    """Measures DNS resolution and TCP connect of new connections into the current request timing."""
+
+    def _new_conn(self):
+        timing = get_request_timing()
+        if timing is None:
+            return super()._new_conn()
+
+        start = time.perf_counter()
+        try:
+            addresses = socket.getaddrinfo(self._dns_host, self.port, 0, socket.SOCK_STREAM)
+        except OSError:
+            # Let urllib3 report the resolution error in its usual form
+            return super()._new_conn()
+        resolved = time.perf_counter()
+
+        # Connect to the resolved addresses, so the host is not looked up a second time
+        dns_host = self._dns_host
+        error = None
+        sock = None
+        try:
+            for address in dict.fromkeys(info[ 4 ][ 0 ] for info in addresses):
+                self._dns_host = address
+                try:
+                    sock = super()._new_conn()
+                    break
+                except (NewConnectionError, ConnectTimeoutError) as e:
+                    error = e
+        finally:
+            self._dns_host = dns_host
+        if sock is None:
+            raise error
+
+        timing[ "dns" ] += resolved - start
+        timing[ "connect" ] += time.perf_counter() - resolved
+        timing[ "connections" ] += 1
+        return sock
+
+
+class TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+
+    def connect(self):
+        timing = get_request_timing()
+        if timing is None:
+            return super().connect()
+
+        before = timing[ "dns" ] + timing[ "connect" ]
+        start = time.perf_counter()
+        super().connect()
+        # Whatever connect() spent beyond DNS and TCP connect is the TLS handshake
+        network = timing[ "dns" ] + timing[ "connect" ] - before
+        timing[ "tls" ] += max(time.perf_counter() - start - network, 0.0)
+
+
+class _PoolUsageMixin:
+    """Counts how often a connection pool ran out of free connections."""
+
+    num_exhausted = 0
+    num_discarded = 0
+    peak_in_use = 0
+
+    def _get_conn(self, timeout = None):
+        pool = self.pool
+        if pool is not None and pool.empty():
+            # Every connection is in use: the request waits (pool_block) or opens an extra connection
+            self.num_exhausted += 1
+        conn = super()._get_conn(timeout)
+        if pool is not None:
+            self.peak_in_use = max(self.peak_in_use, pool.maxsize - pool.qsize())
+        return conn
+
+    def _put_conn(self, conn) -> None:
+        pool = self.pool
+        if conn is not None and pool is not None and pool.full():
+            # urllib3 closes connections that do not fit back into the pool
+            self.num_discarded += 1
+        super()._put_conn(conn)
+
+
+class TimedHTTPConnectionPool(_PoolUsageMixin, HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(_PoolUsageMixin, HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+def instrument_session(session: Optional[ requests.Session ]) -> Optional[ requests.Session ]:
+    """
+    Make the connection pools of a session record DNS, connect and TLS timings and pool usage.
+
+    Only pools created after this call are instrumented, so call it right after creating the session.
+    """
+    if session is None:
+        return session
+    for adapter in session.adapters.values():
+        pool_manager = getattr(adapter, 'poolmanager', None)
+        if pool_manager is not None:
+            pool_manager.pool_classes_by_scheme = {
+                "http": TimedHTTPConnectionPool,
+                "https": TimedHTTPSConnectionPool
+            }
+    return session
+
+
+@library(doc_format = 'ROBOT', auto_keywords=True)
+class RequestMetrics:
+    """
+    Collects per-request latency samples and aggregates them per endpoint template and session alias.
+
+    A sample splits the time of one `Send API Request` call into DNS, connect, TLS, time to first byte,
+    HTTP time, retry waits and the remaining framework overhead (token checks, wrapping, logging).
+    """
+
+    def __init__(self, max_samples: int = 50000):
+        """
+        Initialize the collector.
+
+        :param max_samples: Number of most recent samples kept for the report
+        """
+        self.enabled = True
+        self.recorded = 0
+        self.utils = RequestUtils()
+        self._samples = deque(maxlen = max_samples)
+        self._lock = threading.Lock()
+
+    def record(self, timing: Dict, total: float) -> Dict:
+        """
+        Store a sample built from the timings collected for one request.
+
+        :param timing: Timings collected while the request was sent
+        :param total: Wall time of the whole call in seconds
+        :return: The stored sample
+        """
+        http_time = timing[ "http" ]
+        sample = {
+            "time": time.time(),
+            "alias": timing[ "alias" ] or "DIRECT",
+            "method": (timing[ "method" ] or "").upper(),
+            "endpoint": self.utils.endpoint_template(timing[ "endpoint" ]),
+            "status_code": timing[ "status_code" ],
+            "retries": max(timing[ "attempts" ] - 1, 0),
+            "new_connections": timing[ "connections" ],
+            "dns": timing[ "dns" ],
+            "connect": timing[ "connect" ],
+            "tls": timing[ "tls" ],
+            "ttfb": timing[ "ttfb" ],
+            "http": http_time,
+            "wait": timing[ "wait" ],
+            "overhead": max(total - http_time - timing[ "wait" ], 0.0),
+            "total": total,
+            "request_bytes": timing[ "request_bytes" ],
+            "response_bytes": timing[ "response_bytes" ]
+        }
+        with self._lock:
+            self.recorded += 1
+            sample[ "seq" ] = self.recorded
+            self._samples.append(sample)
+        return sample
+
+    def get_samples(self, since: int = 0) -> List[ Dict ]:
+        """
+        Return the stored samples.
+
+        :param since: Only return samples recorded after this sequence number
+        :return: List of sample dictionaries, oldest first
+        """
+        with self._lock:
+            return [ dict(sample) for sample in self._samples if sample[ "seq" ] > since ]
+
+    def get_report(self, group_by: str = "endpoint", samples: Optional[ List[ Dict ] ] = None) -> List[ Dict ]:
+        """
+        Aggregate samples per endpoint template ("METHOD /path/{id}") or per session alias.
+
+        Times are reported in milliseconds; groups are sorted by p95 total time, slowest first.
+
+        :param group_by: endpoint or alias
+        :param samples: Samples to aggregate (default: all stored samples)
+        :return: List of report rows
+        """
+        if group_by not in ("endpoint", "alias"):
+            raise ValueError(f"Unknown group_by '{group_by}', expected endpoint or alias")
+        samples = self.get_samples() if samples is None else samples
+
+        groups = { }
+        for sample in samples:
+            key = f"{sample[ 'method' ]} {sample[ 'endpoint' ]}" if group_by == "endpoint" else sample[ "alias" ]
+            groups.setdefault(key, [ ]).append(sample)
+
+        report = [ self._aggregate(group_by, key, group) for key, group in groups.items() ]
+        report.sort(key = lambda row: row[ "total_p95_ms" ] or 0, reverse = True)
+        return report
+
+    def export(self, path: str, include_samples: bool = False) -> str:
+        """
+        Write the endpoint and alias reports to a file; the format follows the extension (.csv or .json).
+
+        :param path: Output file path
+        :param include_samples: Also write the raw samples (JSON only)
+        :return: The path written
+        """
+        samples = self.get_samples()
+        endpoints = self.get_report("endpoint", samples)
+        aliases = self.get_report("alias", samples)
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok = True)
+        if path.lower().endswith(".csv"):
+            rows = endpoints + aliases
+            fieldnames = list(rows[ 0 ].keys()) if rows else [ "group_by", "group" ]
+            with open(path, "w", newline = "", encoding = "utf-8") as file:
+                writer = csv.DictWriter(file, fieldnames = fieldnames)
+                writer.writeheader()
+                writer.writerows(rows)
+        else:
+            data = { "requests": len(samples), "endpoints": endpoints, "aliases": aliases }
+            if include_samples:
+                data[ "samples" ] = samples
+            with open(path, "w", encoding = "utf-8") as file:
+                json.dump(data, file, indent = 2)
+        return path
+
+    def clear(self) -> None:
+        """Drop all stored samples."""
+        with self._lock:
+            self._samples.clear()
+
+    def format_report(self, report: List[ Dict ], limit: int = 20) -> str:
+        """Format report rows as a fixed-width table."""
+        lines = [ f"{'group':<50} {'count':>6} {'err':>4} {'retry':>5} {'p50':>8} {'p95':>8} {'p99':>8} "
+                  f"{'ttfb95':>8} {'ovh95':>7}" ]
+        for row in report[ :limit ]:
+            lines.append(f"{row[ 'group' ][ :50 ]:<50} {row[ 'count' ]:>6} {row[ 'errors' ]:>4} "
+                         f"{row[ 'retries' ]:>5} {self._ms(row[ 'total_p50_ms' ]):>8} "
+                         f"{self._ms(row[ 'total_p95_ms' ]):>8} {self._ms(row[ 'total_p99_ms' ]):>8} "
+                         f"{self._ms(row[ 'ttfb_p95_ms' ]):>8} {self._ms(row[ 'overhead_p95_ms' ]):>7}")
+        if len(report) > limit:
+            lines.append(f"... {len(report) - limit} more")
+        return "\n".join(lines)
+
+    def _aggregate(self, group_by: str, key: str, samples: List[ Dict ]) -> Dict:
+        """Build one report row from the samples of a group."""
+
+        def pct(field: str, value: float) -> Optional[ float ]:
+            values = [ sample[ field ] for sample in samples if sample[ field ] is not None ]
+            result = self.utils.percentile(values, value)
+            return round(result * 1000, 3) if result is not None else None
+
+        def mean(field: str) -> Optional[ float ]:
+            values = [ sample[ field ] for sample in samples if sample[ field ] is not None ]
+            return round(sum(values) / len(values) * 1000, 3) if values else None
+
+        return {
+            "group_by": group_by,
+            "group": key,
+            "count": len(samples),
+            "errors": sum(1 for sample in samples
+                          if sample[ "status_code" ] is None or sample[ "status_code" ] >= 400),
+            "retries": sum(sample[ "retries" ] for sample in samples),
+            "new_connections": sum(sample[ "new_connections" ] for sample in samples),
+            "total_p50_ms": pct("total", 50),
+            "total_p95_ms": pct("total", 95),
+            "total_p99_ms": pct("total", 99),
+            "ttfb_p50_ms": pct("ttfb", 50),
+            "ttfb_p95_ms": pct("ttfb", 95),
+            "ttfb_p99_ms": pct("ttfb", 99),
+            "dns_avg_ms": mean("dns"),
+            "connect_avg_ms": mean("connect"),
+            "tls_avg_ms": mean("tls"),
+            "overhead_p50_ms": pct("overhead", 50),
+            "overhead_p95_ms": pct("overhead", 95),
+            "request_bytes": sum(sample[ "request_bytes" ] or 0 for sample in samples),
+            "response_bytes": sum(sample[ "response_bytes" ] or 0 for sample in samples)
+        }
+
+    @staticmethod
+    def _ms(value: Optional[ float ]) -> str:
+        return f"{value:.1f}" if value is not None else "-"
+
+
+class RequestMetricsListener:
+    """
+    Library listener that reports the latency of the requests sent during a suite when the suite ends,
+    and optionally exports the cumulative report.
+    """
+
+    ROBOT_LISTENER_API_VERSION = 3
+
+    def __init__(self, metrics: RequestMetrics):
+        self.metrics = metrics
+        self.report_on_suite_end = True
+        self.export_path = None
+        # Functions returning extra summary text (or None) printed with the report
+        self.summary_providers = [ ]
+        self._reported = 0
+
+    def end_suite(self, data: Any, result: Any) -> None:
+        samples = self.metrics.get_samples(since = self._reported)
+        self._reported = self.metrics.recorded
+        if not samples:
+            return
+        if self.report_on_suite_end:
+            report = self.metrics.get_report("endpoint", samples)
+            summaries = [ summary for summary in (provider() for provider in self.summary_providers) if summary ]
+            logger.console("\n".join([ f"\nAPI latency for suite '{data.name}' ({len(samples)} requests, ms):",
+                                       self.metrics.format_report(report) ] + summaries))
+        if self.export_path:
+            try:
+                self.metrics.export(self.export_path)
+            except OSError as e:
+                logger.warn(f"Could not export API latency report to {self.export_path}: {e}")
+
+
+# Shared by all library instances, so samples survive the per-test library scope
+request_metrics = RequestMetrics()
+metrics_listener = RequestMetricsListener(request_metrics)
@@ -0,0 +1,193 @@
+import threading
+import time
+from typing import Dict, Any, Optional, List, Callable, Union
+from robot.api import logger
+from robot.api.deco import library
+
+# Outermost first; the transport always runs last and cannot be disabled
+DEFAULT_STAGES = ("metrics", "auth", "retry", "logging", "cache", "cassette")
+TRANSPORT_STAGE = "transport"
+# Shared by all library instances, so a pipeline configured in a suite setup applies to every test
+_stage_orders = { }
+_custom_stages = { }
+_stage_stats = { }
+_lock = threading.Lock()
+
+
+def register_middleware(name: str, middleware: Optional[ Callable ]) -> None:
+    """
+    Register a custom pipeline stage, or remove it with None.
+
+    A middleware is called as ``middleware(context, call_next)`` and returns the response; it calls
+    ``call_next(context)`` to run the rest of the pipeline. A registered stage runs only for the
+    aliases whose pipeline lists it (see set_pipeline_stages).
+
+    :param name: Stage name
+    :param middleware: Callable taking a RequestContext and the next stage
+    """
+    if name in DEFAULT_STAGES or name == TRANSPORT_STAGE:
+        raise ValueError(f"'{name}' is a built-in stage and cannot be replaced")
+    with _lock:
+        if middleware is None:
+            _custom_stages.pop(name, None)
+        else:
+            _custom_stages[ name ] = middleware
+
+
+def get_custom_middleware(name: str) -> Optional[ Callable ]:
+    """Return a registered custom stage, or None."""
+    return _custom_stages.get(name)
+
+
+def set_pipeline_stages(stages: Optional[ Union[ str, List[ str ] ] ], alias: Optional[ str ] = None) -> List[ str ]:
+    """
+    Set which stages run, and in which order, for a session alias or for all requests.
+
+    :param stages: Stage names, outermost first, as a list or comma separated string;
+                   None restores the default pipeline
+    :param alias: Session alias the order applies to; None sets the order for all other requests
+    :return: The stage order now in effect for the alias
+    """
+    with _lock:
+        if stages is None:
+            _stage_orders.pop(alias, None)
+            return get_pipeline_stages(alias)
+        if isinstance(stages, str):
+            stages = stages.split(",")
+        stages = [ stage.strip().lower() for stage in stages if stage and stage.strip() ]
+        unknown = [ stage for stage in stages if stage not in DEFAULT_STAGES and stage not in _custom_stages ]
+        if unknown:
+            raise ValueError(f"Unknown pipeline stages {unknown}, expected any of "
+                             f"{', '.join(DEFAULT_STAGES + tuple(_custom_stages))}")
+        if len(set(stages)) != len(stages):
+            raise ValueError(f"Pipeline stages must be unique: {stages}")
+        _stage_orders[ alias ] = tuple(stages)
+        return list(stages)
+
+
+def get_pipeline_stages(alias: Optional[ str ] = None) -> List[ str ]:
+    """Return the stage order used for a session alias, outermost first."""
+    stages = _stage_orders.get(alias)
+    if stages is None:
+        stages = _stage_orders.get(None, DEFAULT_STAGES)
+    return list(stages)
+
+
+def get_pipeline_stats() -> Dict[ str, Dict ]:
+    """Return per stage call count and total, mean and maximum time in milliseconds."""
+    with _lock:
+        return {
+            stage: {
+                "count": stats[ "count" ],
+                "total_ms": round(stats[ "total" ] * 1000, 3),
+                "mean_ms": round(stats[ "total" ] * 1000 / stats[ "count" ], 3),
+                "max_ms": round(stats[ "max" ] * 1000, 3)
+            }
+            for stage, stats in _stage_stats.items() if stats[ "count" ]
+        }
+
+
+def clear_pipeline_stats() -> None:
+    """Reset the per stage timings."""
+    with _lock:
+        _stage_stats.clear()
+
+
+class RequestContext:
+    """
+    State of one request while it passes through the pipeline.
+
+    Stages read and replace ``kwargs`` (the arguments for requests) and can use ``control_params``
+    (retries, expected status, token handling). ``stage_times`` holds the time spent in each stage
+    itself, without the stages it called, in seconds.
+    """
+
+    def __init__(self, method: str, alias: Optional[ str ], endpoint: Optional[ str ], url: Optional[ str ],
+                 control_params: Dict, kwargs: Dict):
+        self.method = method
+        self.alias = alias
+        self.endpoint = endpoint
+        self.url = url
+        self.control_params = control_params
+        self.kwargs = kwargs
+        self.attempt = 0
+        self.succeeded = False
+        self.error = None
+        self.stage_times = { }
+
+    @property
+    def target(self) -> Optional[ str ]:
+        """The endpoint for session requests, the URL otherwise."""
+        return self.endpoint if self.alias else self.url
+
+    def copy(self) -> 'RequestContext':
+        """Return a fresh context for sending the same request again; headers are copied, bodies are shared."""
+        kwargs = dict(self.kwargs)
+        if isinstance(kwargs.get('headers'), dict):
+            kwargs[ 'headers' ] = dict(kwargs[ 'headers' ])
+        return RequestContext(self.method, self.alias, self.endpoint, self.url, dict(self.control_params), kwargs)
+
+
+@library(doc_format = 'ROBOT', auto_keywords=True)
+class RequestPipeline:
+    """
+    Runs a request through an ordered chain of middleware stages.
+
+    Each stage is a callable ``stage(context, call_next)`` that may change the request, call the rest
+    of the chain (once, several times or not at all) and inspect or replace the response. The chain
+    ends with the transport stage, which sends the request. Which stages run, and in which order,
+    is configured per session alias with set_pipeline_stages.
+    """
+
+    def __init__(self, stages: Dict[ str, Callable ], transport: Callable):
+        """
+        Initialize the pipeline.
+
+        :param stages: Built-in stage callables by name
+        :param transport: Callable taking the context and returning the response
+        """
+        self.stages = dict(stages)
+        self.transport = transport
+
+    def run(self, context: RequestContext) -> Any:
+        """
+        Send a request through the stages configured for its alias.
+
+        :param context: The request
+        :return: The response returned by the outermost stage
+        """
+        chain = [ ]
+        for name in get_pipeline_stages(context.alias):
+            stage = self.stages.get(name) or get_custom_middleware(name)
+            if stage is None:
+                logger.debug(f"Skipping unavailable pipeline stage '{name}'")
+                continue
+            chain.append((name, stage))
+        chain.append((TRANSPORT_STAGE, lambda ctx, call_next: self.transport(ctx)))
+        # Time spent inside each stage, including the stages it called
+        inclusive = [ 0.0 ] * len(chain)
+
+        def call(index: int, ctx: RequestContext) -> Any:
+            name, stage = chain[ index ]
+            started = time.perf_counter()
+            try:
+                return stage(ctx, lambda next_ctx: call(index + 1, next_ctx))
+            finally:
+                inclusive[ index ] += time.perf_counter() - started
+
+        try:
+            return call(0, context)
+        finally:
+            for index, (name, _) in enumerate(chain):
+                inner = inclusive[ index + 1 ] if index + 1 < len(chain) else 0.0
+                context.stage_times[ name ] = max(inclusive[ index ] - inner, 0.0)
+            self._record(context.stage_times)
+
+    @staticmethod
+    def _record(stage_times: Dict[ str, float ]) -> None:
+        with _lock:
+            for name, seconds in stage_times.items():
+                stats = _stage_stats.setdefault(name, { "count": 0, "total": 0.0, "max": 0.0 })
+                stats[ "count" ] += 1
+                stats[ "total" ] += seconds
+                stats[ "max" ] = max(stats[ "max" ], seconds)
@@ -1,13 +1,31 @@
+import os
+import re
 import time
+import random
+import threading
 import requests
 import json
+from http.cookiejar import DefaultCookiePolicy
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
 from typing import Dict, Any, Optional, Union, Callable, List
 from robot.api import logger
 from robot.api.deco import keyword, library
+from robot.libraries.BuiltIn import BuiltIn
 from SessionManager import SessionManager
 from TokenManager import TokenManager
 from ResponseHandler import ResponseHandler
+from ResponseWrapper import is_body_consumed
+from RetryPolicy import RetryPolicy, get_retry_policy, set_retry_policy, circuit_breaker, retry_events
+from Cassette import Cassette, CassetteMiss, get_active_cassette
+from HttpCache import get_http_cache
+from AsyncTransport import AsyncTransport, get_selected_transport, select_transport
+from RequestMetrics import request_metrics, instrument_session, start_request_timing, get_request_timing, \
+    stop_request_timing
+from RequestPipeline import RequestPipeline, RequestContext
 from RequestUtils import RequestUtils
+from StreamTransfer import MultipartStream, TransferProgress, get_transfer_directory, resolve_transfer_path, \
+    filename_from_response, save_stream
 
 
 @library(doc_format = 'ROBOT', auto_keywords=True)
@@ -33,27 +51,91 @@ class RequestSender:
         self.utils = RequestUtils()
         self.auto_log = auto_log
         self.global_timeout = global_timeout
+        self.log_body_max_bytes = 4096
+        self.log_pretty_json = False
+        self.log_body_dir = None
+        self._body_file_lock = threading.Lock()
+        self.last_poll_summary = None
+        # Shared by all instances, see RetryPolicy
+        self.circuit_breaker = circuit_breaker
+        self.retry_events = retry_events
+        self._transport_fallbacks = set()
+        self.metrics = request_metrics
+        # Pooled session for requests sent by URL; like requests.request() it keeps no cookies between calls
+        self._direct_session = instrument_session(requests.Session())
+        self._direct_session.cookies.set_policy(DefaultCookiePolicy(allowed_domains = [ ]))
+        self.pipeline = RequestPipeline({
+            "metrics": self._metrics_stage,
+            "auth": self._auth_stage,
+            "retry": self._retry_stage,
+            "logging": self._logging_stage,
+            "cache": self._cache_stage,
+            "cassette": self._cassette_stage
+        }, self._transport_stage)
+
+    @property
+    def retry_policy(self) -> RetryPolicy:
+        """The retry policy shared by all tests of the run."""
+        return get_retry_policy()
+
+    @retry_policy.setter
+    def retry_policy(self, policy: RetryPolicy) -> None:
+        set_retry_policy(policy)
+
+    @property
+    def transport(self) -> str:
+        """Name of the transport shared by all tests of the run."""
+        return get_selected_transport()[ "name" ]
+
+    @property
+    def async_transport(self) -> Optional[ AsyncTransport ]:
+        """The httpx transport shared by all tests of the run, or None while requests is used."""
+        return get_selected_transport()[ "transport" ]
 
     def send_request(self, method: Optional[ str ] = None, alias: Optional[ str ] = None,
                      endpoint: Optional[ str ] = None, url: Optional[ str ] = None, **kwargs) -> Any:
         """
         Unified method for sending API requests with comprehensive options.
 
+        The request passes through the stages of the request pipeline configured for the alias
+        (by default metrics, auth, retry, logging, cache and cassette) before it is sent.
+
         :param method: HTTP method (GET, POST, etc.)
         :param alias: The session alias (optional)
         :param endpoint: API endpoint (relative to base URL)
         :param url: Full URL for the request (when not using session)
         :param kwargs: Additional request parameters including:
-            - max_retries: Maximum number of retries
-            - delay: Time between retries
+            - max_retries: Maximum number of attempts
+            - delay: Delay before the first retry; later delays follow the retry policy backoff
+            - retry_on_status: Status codes worth retrying for this call (overrides the retry policy)
+            - retry_budget: Maximum total seconds this call may spend waiting between retries
             - token: Authentication token
             - token_type: Type of token (default: Bearer)
             - token_check_on_failure: Whether to check/refresh token on failure
-            - custom_headers: Headers for this request only
+            - custom_headers: Headers layered over the session headers for this request only
+              (a header set to None is left out of the request)
             - random_session: Create a random session if alias not provided
             - expected_status: Expected HTTP status code(s)
+            - use_cache: Set to False to bypass the session's response cache for this request
+
+        Unless metrics are disabled, DNS, connect, TLS, time to first byte, total time, payload sizes
+        and retries of the call are recorded in the shared RequestMetrics collector.
+
         :return: Response object or None if failed
         """
+        context = self.prepare_request(method, alias, endpoint, url, **kwargs)
+        if context is None:
+            return self.response_handler.wrap_response(None)
+        return self.response_handler.wrap_response(self.pipeline.run(context))
+
+    def prepare_request(self, method: Optional[ str ] = None, alias: Optional[ str ] = None,
+                        endpoint: Optional[ str ] = None, url: Optional[ str ] = None,
+                        **kwargs) -> Optional[ RequestContext ]:
+        """
+        Resolve the arguments of send_request into the context the request pipeline runs.
+
+        :return: The request context, or None when the request cannot be sent (the reason is logged)
+        """
         # Extract parameters
         method, alias, endpoint, url, control_params, request_kwargs = self.utils.extract_request_params(
             method, alias, endpoint, url, **kwargs)
@@ -61,17 +143,17 @@ class RequestSender:
         # Handle session creation if needed
         if not alias and not url:
             logger.error("Either alias or URL must be provided")
-            return self.response_handler.wrap_response(None)
+            return None
 
         # Create random session if requested
         if not alias and control_params.get('random_session', False):
             if not url:
                 logger.error("URL is required for random session creation")
-                return self.response_handler.wrap_response(None)
+                return None
 
             # Parse URL to get base URL
             base_url, path = self.utils.parse_url(url)
-            headers = request_kwargs.get('headers', { })
+            headers = dict(request_kwargs.get('headers') or { })
 
             # Add token to headers if provided
             if control_params.get('token'):
@@ -82,185 +164,411 @@ class RequestSender:
             alias = self.session_manager.create_random_session(base_url, headers)
             endpoint = path
 
-        # Handle custom headers without creating a new session
-        elif alias and control_params.get('custom_headers'):
-            return self._send_with_custom_headers(method, alias, endpoint,
-                                                  control_params[ 'custom_headers' ], **request_kwargs)
-
-        # Handle retry strategy
-        max_retries = control_params.get('max_retries', 1)
-        delay = control_params.get('delay', 2)
+        if alias and not self.session_manager.session_exists(alias):
+            logger.warn(f"Session '{alias}' not found!")
+            return None
 
-        if max_retries > 1:
-            return self._send_with_retries(method, alias, endpoint, url, max_retries, delay,
-                                           control_params, request_kwargs)
+        # Overlay custom headers on this request only, reusing the session's connection pool
+        if control_params.get('custom_headers'):
+            request_kwargs[ 'headers' ] = self.utils.merge_headers(request_kwargs.get('headers'),
+                                                                   control_params[ 'custom_headers' ])
 
-        # Simple single request
-        if alias:
-            # Check token validity if configured
-            if control_params.get('token_check_on_failure', False):
-                return self._send_with_token_check(method, alias, endpoint, control_params, request_kwargs)
-            return self._send_session_request(method, alias, endpoint, **request_kwargs)
-        else:
-            return self._send_direct_request(method, url, **request_kwargs)
+        # Apply global timeout if not specified
+        if 'timeout' not in request_kwargs:
+            request_kwargs[ 'timeout' ] = self.global_timeout
 
-    def _send_session_request(self, method: str, alias: str, endpoint: str, **kwargs) -> Any:
-        """Send a request through an existing session."""
-        if not self.session_manager.session_exists(alias):
-            logger.warn(f"Session '{alias}' not found!")
-            return self.response_handler.wrap_response(None)
+        return RequestContext(method, alias, endpoint, url, control_params, request_kwargs)
 
-        # Apply global timeout if not specified
-        if 'timeout' not in kwargs:
-            kwargs[ 'timeout' ] = self.global_timeout
+    def _metrics_stage(self, context: RequestContext, call_next: Callable) -> Any:
+        """Pipeline stage collecting the timings of the request into the shared metrics."""
+        # A request sent while another one is timed (e.g. a token refresh) is part of that one
+        if not self.metrics.enabled or get_request_timing() is not None:
+            return call_next(context)
 
+        timing = start_request_timing()
+        start = time.perf_counter()
         try:
-            # Get the method function from RequestsLibrary
-            requests_lib = self.session_manager.requests_lib
-            method_func = getattr(requests_lib, f"{method.lower()}_request")
-            response = method_func(alias, endpoint, **kwargs)
+            response = call_next(context)
+        finally:
+            stop_request_timing()
+        self.metrics.record(timing, time.perf_counter() - start)
+        return response
 
-            if self.auto_log:
-                self._log_api_request(alias, method, endpoint, response)
+    def _auth_stage(self, context: RequestContext, call_next: Callable) -> Any:
+        """
+        Pipeline stage keeping the session token valid.
 
-            return self.response_handler.wrap_response(response)
-        except Exception as e:
-            logger.error(f"❌ REQUEST FAILED: {e}")
-            logger.error(f"   - Session: {alias}")
-            logger.error(f"   - Method: {method}")
-            logger.error(f"   - Endpoint: {endpoint}")
-            return self.response_handler.wrap_response(None)
+        A single attempt request checks the token first and refreshes it when expired. When retries
+        are enabled, a request that still fails with 401 or 403 gets one final attempt with a
+        refreshed token.
+        """
+        control_params = context.control_params
+        if not context.alias or not control_params.get('token_check_on_failure', False):
+            return call_next(context)
+
+        if control_params.get('max_retries', 1) <= 1:
+            headers = self.session_manager.get_session_headers(context.alias)
+            if not self.token_manager.validate_token(headers) \
+                    and not self._handle_token_refresh(context.alias, control_params):
+                logger.warn(f"Token is expired for session '{context.alias}' and refresh failed")
+                return None
+            return call_next(context)
+
+        response = call_next(context)
+        if context.succeeded or response is None or response.status_code not in (401, 403):
+            return response
+        logger.info("Attempting token refresh after failed retries")
+        if not self._handle_token_refresh(context.alias, control_params):
+            return response
+        # One final attempt with refreshed token
+        logger.info("Token refreshed, making final attempt")
+        if not self._rewind_body(context.kwargs):
+            return response
+        control_params[ 'max_retries' ] = 1
+        context.error = None
+        return call_next(context)
+
+    def _logging_stage(self, context: RequestContext, call_next: Callable) -> Any:
+        """Pipeline stage logging every attempt and its response."""
+        response = call_next(context)
+        # Failed sends were already logged with their error by the transport
+        if self.auto_log and context.error is None:
+            self._log_api_request(context.alias or "DIRECT", context.method, context.target, response)
+        return response
+
+    def _cache_stage(self, context: RequestContext, call_next: Callable) -> Any:
+        """Pipeline stage answering GET and HEAD requests from the session's response cache."""
+        cache = get_http_cache(context.alias) if context.control_params.get('use_cache', True) else None
+        if cache is None:
+            return call_next(context)
+
+        session = self.session_manager.get_session(context.alias)
+        request_url = self.session_manager.requests_lib._merge_url(session, context.endpoint)
+        headers = self.utils.merge_headers(session.headers, context.kwargs.get('headers'))
+        original_kwargs = context.kwargs
+        started = time.perf_counter()
+        sent = [ ]
+
+        def send(request_kwargs: Dict) -> Any:
+            # Revalidation adds conditional headers to this attempt only
+            sent.append(True)
+            context.kwargs = request_kwargs
+            return call_next(context)
 
-    def _send_direct_request(self, method: str, url: str, **kwargs) -> Any:
-        """Send a request directly without a session."""
         try:
-            # Apply global timeout if not specified
-            if 'timeout' not in kwargs:
-                kwargs[ 'timeout' ] = self.global_timeout
+            response = cache.send(context.method, request_url, headers, original_kwargs, send)
+        finally:
+            context.kwargs = original_kwargs
+        if not sent:
+            self._record_attempt(context.alias, context.method, context.target, response, started)
+        return response
 
-            response = requests.request(method.upper(), url, **kwargs)
+    def _cassette_stage(self, context: RequestContext, call_next: Callable) -> Any:
+        """Pipeline stage recording to, or replaying from, the active cassette."""
+        cassette = get_active_cassette()
+        if cassette is None:
+            return call_next(context)
 
-            if self.auto_log:
-                self._log_api_request("DIRECT", method, url, response)
+        if context.alias:
+            session = self.session_manager.get_session(context.alias)
+            request_url = self.session_manager.requests_lib._merge_url(session, context.endpoint)
+            headers = self.utils.merge_headers(session.headers, context.kwargs.get('headers'))
+        else:
+            request_url = context.url
+            headers = dict(context.kwargs.get('headers') or { })
+        started = time.perf_counter()
+        sent = [ ]
+
+        def send() -> Any:
+            sent.append(True)
+            return call_next(context)
+
+        response = self._send_with_cassette(cassette, context.method, request_url, headers, context.kwargs, send)
+        if not sent:
+            self._record_attempt(context.alias, context.method, context.target, response, started)
+        return response
 
-            return self.response_handler.wrap_response(response)
+    def _transport_stage(self, context: RequestContext) -> Any:
+        """Last pipeline stage: send the request over the selected transport."""
+        started = time.perf_counter()
+        response = None
+        context.error = None
+        try:
+            if context.alias:
+                response = self._session_transport(context.method, context.alias, context.endpoint, context.kwargs)
+            else:
+                response = self._direct_transport(context.method, context.url, context.kwargs)
         except Exception as e:
-            logger.error(f"❌ DIRECT REQUEST FAILED: {e}")
-            logger.error(f"   - Method: {method}")
-            logger.error(f"   - URL: {url}")
-            return self.response_handler.wrap_response(None)
+            context.error = e
+            if context.alias:
+                logger.error(f"❌ REQUEST FAILED: {e}")
+                logger.error(f"   - Session: {context.alias}")
+                logger.error(f"   - Method: {context.method}")
+                logger.error(f"   - Endpoint: {context.endpoint}")
+            else:
+                logger.error(f"❌ DIRECT REQUEST FAILED: {e}")
+                logger.error(f"   - Method: {context.method}")
+                logger.error(f"   - URL: {context.url}")
+        self._record_attempt(context.alias, context.method, context.target, response, started)
+        return response
+
+    def _session_transport(self, method: str, alias: str, endpoint: str, kwargs: Dict) -> Any:
+        """Send a session request over the selected transport."""
+        requests_lib = self.session_manager.requests_lib
+        session = self.session_manager.get_session(alias)
+        if self._use_async_transport(kwargs, session, alias):
+            return self.async_transport.request(method, requests_lib._merge_url(session, endpoint),
+                                                session = session, client_key = alias, **kwargs)
+        if kwargs.get('stream') or hasattr(kwargs.get('data'), 'read'):
+            # RequestsLibrary keywords do not accept stream and log request bodies with len(),
+            # so streamed requests use the live session directly
+            return session.request(method.upper(), requests_lib._merge_url(session, endpoint), **kwargs)
+        # Get the method function from RequestsLibrary
+        method_func = getattr(requests_lib, f"{method.lower()}_request")
+        return method_func(alias, endpoint, **kwargs)
+
+    def _direct_transport(self, method: str, url: str, kwargs: Dict) -> Any:
+        """Send a request by URL over the selected transport."""
+        if self._use_async_transport(kwargs, None, None):
+            return self.async_transport.request(method, url, **kwargs)
+        return self._direct_session.request(method.upper(), url, **kwargs)
+
+    def _use_async_transport(self, kwargs: Dict, session: Optional[ requests.Session ],
+                             alias: Optional[ str ]) -> bool:
+        """
+        Streamed responses and file-like request bodies always go through requests, as do requests
+        whose authentication or proxies httpx would not apply (warned once per session).
+        """
+        if self.async_transport is None or kwargs.get('stream') or hasattr(kwargs.get('data'), 'read'):
+            return False
+        reason = self.async_transport.unsupported_reason(session, kwargs)
+        if reason is None:
+            return True
+        if (alias, reason) not in self._transport_fallbacks:
+            self._transport_fallbacks.add((alias, reason))
+            logger.warn(f"Sending requests of '{alias or 'DIRECT'}' with requests: {reason}")
+        return False
+
+    def _send_with_cassette(self, cassette: Cassette, method: str, url: str, headers: Dict, kwargs: Dict,
+                            send: Callable[ [ ], Any ]) -> Any:
+        """
+        Serve a request from the active cassette, or send it and record the interaction.
+
+        :raises CassetteMiss: In replay mode when nothing in the cassette matches the request; it is not
+                              retried and fails the calling keyword
+        """
+        response = cassette.play(method, url, kwargs)
+        if response is not None:
+            logger.debug(f"Replayed {method.upper()} {url} from cassette '{cassette.path}'")
+            return response
+        if cassette.mode == "replay":
+            raise CassetteMiss(f"No interaction in cassette '{cassette.path}' matches {method.upper()} {url}")
+        response = send()
+        cassette.record(method, url, headers, kwargs, response)
+        return response
+
+    def _record_attempt(self, alias: Optional[ str ], method: str, endpoint: str, response: Any,
+                        started: float) -> None:
+        """Add one HTTP attempt to the timings of the request being sent, if metrics are collected."""
+        timing = get_request_timing()
+        if timing is None:
+            return
+        timing[ "attempts" ] += 1
+        timing[ "http" ] += time.perf_counter() - started
+        timing.update({ "alias": alias, "method": method, "endpoint": endpoint })
+        if response is None:
+            timing.update({ "status_code": None, "ttfb": None, "response_bytes": None })
+            return
+
+        timing[ "status_code" ] = response.status_code
+        # requests measures elapsed up to the parsed headers, including a new connection
+        elapsed = response.elapsed.total_seconds() if response.elapsed else None
+        if elapsed is not None:
+            timing[ "ttfb" ] = max(elapsed - timing[ "dns" ] - timing[ "connect" ] - timing[ "tls" ], 0.0)
+        body = getattr(response.request, 'body', None) if response.request is not None else None
+        timing[ "request_bytes" ] = len(body) if isinstance(body, (str, bytes)) else None
+        if is_body_consumed(response):
+            timing[ "response_bytes" ] = len(response.content or b"")
+        else:
+            content_length = response.headers.get('Content-Length')
+            timing[ "response_bytes" ] = int(content_length) if content_length and content_length.isdigit() else None
+
+    def set_transport(self, transport: str = "requests", http2: bool = True, max_connections: int = 100) -> str:
+        """
+        Select the HTTP transport used for all requests of the run.
+
+        ``requests`` sends through RequestsLibrary. ``httpx`` sends every request on one event loop
+        managed by the library, with HTTP/2 multiplexing where the server supports it; batch workers
+        and polling then share its connections instead of opening their own. Streamed requests always
+        use requests, and so do requests with authentication other than basic or with proxies, which
+        httpx would not apply. httpx is optional; when it is not installed the requests transport is kept.
+
+        The selection, the event loop and its connections are shared by all library instances of the
+        process, so they outlive the test that selected them; they are closed when another transport
+        is selected or when the process ends.
+
+        :param transport: requests or httpx
+        :param http2: Negotiate HTTP/2 with the httpx transport (needs the h2 package)
+        :param max_connections: Maximum open connections per session with the httpx transport
+        :return: Name of the transport in use
+        """
+        transport = (transport or "requests").lower()
+        if transport not in ("requests", "httpx"):
+            raise ValueError(f"Unknown transport '{transport}', expected requests or httpx")
+        if transport == "httpx" and not AsyncTransport.is_available():
+            logger.warn("Transport 'httpx' is not installed, falling back to requests")
+            transport = "requests"
+
+        select_transport(transport, AsyncTransport(http2, int(max_connections)) if transport == "httpx" else None)
+        return transport
+
+    def close_transport_session(self, alias: Optional[ str ] = None) -> None:
+        """Release the transport connections held for a session alias, or for all sessions when alias is None."""
+        if self.async_transport is None:
+            return
+        aliases = [ alias ] if alias is not None else list(self.async_transport.get_client_keys())
+        for client_key in aliases:
+            self.async_transport.close_client(client_key)
+
+    def _retry_stage(self, context: RequestContext, call_next: Callable) -> Any:
+        """
+        Pipeline stage retrying failed attempts.
+
+        Which attempts are retried and how long to wait is decided by the retry policy: only
+        retryable statuses (and missing responses) are retried, delays back off exponentially
+        with jitter, Retry-After is honored and the total wait is capped by the retry budget.
+        Every decision is recorded as a structured event in retry_events.
+        """
+        control_params = context.control_params
+        max_retries = control_params.get('max_retries', 1)
+        if max_retries <= 1:
+            return call_next(context)
 
-    def _send_with_retries(self, method: str, alias: Optional[ str ], endpoint: Optional[ str ],
-                           url: Optional[ str ], max_retries: int, delay: float,
-                           control_params: Dict, request_kwargs: Dict) -> Any:
-        """Send a request with retry logic."""
+        method, alias = context.method, context.alias
+        delay = control_params.get('delay', 2)
         expected_status = control_params.get('expected_status')
-        request_url = url if url else f"{self.session_manager.get_session_url(alias)}{endpoint}"
+        request_url = context.url if context.url else \
+            f"{self.session_manager.get_session_url(alias)}{context.endpoint}"
+        host = urlparse(request_url).netloc
+        policy = self.retry_policy.copy(
+            retry_statuses = self.utils.normalize_status_list(control_params[ 'retry_on_status' ])
+            if control_params.get('retry_on_status') is not None else None,
+            retry_budget = control_params.get('retry_budget'))
+        budget_left = float(policy.retry_budget) if policy.retry_budget is not None else None
         last_response = None
 
         for attempt in range(max_retries):
-            # Send the request
-            if alias:
-                response = self._send_session_request(method, alias, endpoint, **request_kwargs)
+            context.attempt = attempt + 1
+            if not self.circuit_breaker.allow(host):
+                self._record_retry_event("circuit_open", method, request_url, host, attempt + 1, None, 0,
+                                         "circuit breaker is open for host")
+                break
+
+            # A streamed body was consumed by the previous attempt
+            if attempt > 0 and not self._rewind_body(context.kwargs):
+                context.attempt = attempt
+                break
+
+            # Send the request, keeping the response for later use (even if None)
+            response = call_next(context)
+            last_response = response
+            status_code = response.status_code if response is not None else None
+
+            # A missing response, throttling or a server error counts against the host's circuit
+            if status_code is None or status_code == 429 or status_code >= 500:
+                if self.circuit_breaker.record_failure(host):
+                    logger.warn(f"Circuit breaker opened for host '{host}'")
             else:
-                response = self._send_direct_request(method, url, **request_kwargs)
+                self.circuit_breaker.record_success(host)
 
-            # Store the response for later use (even if None)
-            last_response = response
+            if status_code is not None:
+                # If no expected status specified, any valid response is successful
+                if expected_status is None:
+                    context.succeeded = True
+                    return response
 
-            # Check if we got a valid response
-            status_code = None
-            if response is not None:
-                status_code = self.response_handler.get_status_code(response)
+                # Check if status matches expected
+                if isinstance(expected_status, list):
+                    is_success = status_code in expected_status
+                else:
+                    is_success = status_code == expected_status
 
-            # If no response or no status code, log and retry
-            if response is None or status_code is None:
-                logger.warn(f"Retry {attempt + 1}/{max_retries} - No valid response received")
-                logger.warn(f"  - URL: {request_url}")
-                if attempt < max_retries - 1:
-                    time.sleep(delay)
-                continue
-
-            # If no expected status specified, any valid response is successful
-            if expected_status is None:
-                return response
-
-            # Check if status matches expected
-            is_success = False
-            if isinstance(expected_status, list):
-                is_success = status_code in expected_status
-            else:
-                is_success = status_code == expected_status
+                if is_success:
+                    context.succeeded = True
+                    return response
 
-            if is_success:
-                return response
+            reason = "no valid response received" if status_code is None \
+                else f"expected status {expected_status}, received {status_code}"
 
-            # Status didn't match expected
-            logger.warn(f"Retry {attempt + 1}/{max_retries} - Status check failed")
-            logger.warn(f"  - Expected status: {expected_status}")
-            logger.warn(f"  - Received status: {status_code}")
-            logger.warn(f"  - URL: {request_url}")
+            if not policy.is_retryable(status_code):
+                self._record_retry_event("give_up", method, request_url, host, attempt + 1, status_code, 0,
+                                         f"{reason}; status is not retryable")
+                break
 
             # Wait before next retry (if not the last attempt)
-            if attempt < max_retries - 1:
-                time.sleep(delay)
-
-        # All retries failed - check if token refresh might help
-        if alias and control_params.get('token_check_on_failure', False) and last_response is not None:
-            status_code = self.response_handler.get_status_code(last_response)
-            # Only attempt token refresh if we have a status code and it's 401 or 403
-            if status_code in (401, 403):
-                logger.info("Attempting token refresh after failed retries")
-                if self._handle_token_refresh(alias, control_params):
-                    # One final attempt with refreshed token
-                    logger.info("Token refreshed, making final attempt")
-                    return self._send_session_request(method, alias, endpoint, **request_kwargs)
-
-        logger.error(f"❌ REQUEST FAILED after {max_retries} retries")
+            if attempt >= max_retries - 1:
+                self._record_retry_event("give_up", method, request_url, host, attempt + 1, status_code, 0,
+                                         f"{reason}; no attempts left")
+                break
+
+            wait = policy.get_delay(attempt, delay, response.headers if response is not None else None)
+            if budget_left is not None and wait > budget_left:
+                self._record_retry_event("give_up", method, request_url, host, attempt + 1, status_code, wait,
+                                         f"{reason}; retry budget exhausted")
+                break
+
+            self._record_retry_event("retry", method, request_url, host, attempt + 1, status_code, wait,
+                                     f"{reason}; retry {attempt + 1}/{max_retries - 1}")
+            if budget_left is not None:
+                budget_left -= wait
+            time.sleep(wait)
+            timing = get_request_timing()
+            if timing is not None:
+                timing[ "wait" ] += wait
+
+        logger.error(f"❌ REQUEST FAILED after {context.attempt} of {max_retries} attempts")
         logger.error(f"   - Method: {method}")
         logger.error(f"   - URL: {request_url}")
 
         # Return the last response we got, even if it didn't meet expectations
         return last_response
 
-    def _send_with_token_check(self, method: str, alias: str, endpoint: str,
-                               control_params: Dict, request_kwargs: Dict) -> Any:
-        """Send a request with token validation."""
-        # Check token validity
-        headers = self.session_manager.get_session_headers(alias)
-        token_valid = self.token_manager.validate_token(headers)
-
-        if not token_valid:
-            if not self._handle_token_refresh(alias, control_params):
-                logger.warn(f"Token is expired for session '{alias}' and refresh failed")
-                return self.response_handler.wrap_response(None)
-
-        return self._send_session_request(method, alias, endpoint, **request_kwargs)
-
-    def _send_with_custom_headers(self, method: str, alias: str, endpoint: str,
-                                  custom_headers: Dict, **kwargs) -> Any:
-        """Send a request with custom headers without modifying the original session."""
-        # Create a temporary session with custom headers
-        temp_alias = f"temp_{alias}_{self.utils.generate_id()}"
-        original_details = self.session_manager.get_session_details(alias)
-
-        if not original_details:
-            return self.response_handler.wrap_response(None)
-
-        self.session_manager.create_session(
-            temp_alias,
-            original_details[ "url" ],
-            headers = custom_headers,
-            **original_details.get("kwargs", { })
-        )
-
-        # Send the request using the temporary session
-        response = self._send_session_request(method, temp_alias, endpoint, **kwargs)
+    @staticmethod
+    def _rewind_body(request_kwargs: Dict) -> bool:
+        """
+        Restart a streamed request body (see upload_file) before it is sent again.
 
-        # Clean up the temporary session
-        self.session_manager.delete_session(temp_alias)
+        :return: False when the body cannot be sent again, so the last response has to be kept
+        """
+        data = request_kwargs.get('data')
+        if not hasattr(data, 'rewind'):
+            return True
+        try:
+            data.rewind()
+            return True
+        except ValueError as e:
+            logger.warn(f"Not sending the request again: {e}")
+            return False
 
-        return response
+    def _record_retry_event(self, action: str, method: str, url: str, host: str, attempt: int,
+                            status_code: Optional[ int ], delay: float, reason: str) -> None:
+        """Record and log a structured retry decision."""
+        event = {
+            "time": time.time(),
+            "action": action,
+            "method": method.upper() if method else method,
+            "url": url,
+            "host": host,
+            "attempt": attempt,
+            "status_code": status_code,
+            "delay": round(delay, 3),
+            "reason": reason
+        }
+        self.retry_events.append(event)
+        if action == "retry":
+            logger.warn(f"Retrying {event[ 'method' ]} {url} in {event[ 'delay' ]}s: {reason}")
+        else:
+            logger.warn(f"Not retrying {event[ 'method' ]} {url}: {reason}")
 
     def _handle_token_refresh(self, alias: str, control_params: Dict) -> bool:
         """Handle token refresh logic."""
@@ -285,7 +593,7 @@ class RequestSender:
     def _check_expected_status(self, response: Any, expected_status: Any) -> bool:
         """
         Check if response status matches expected status.
-        IMPORTANT: This has been replaced with direct status checking in _send_with_retries,
+        IMPORTANT: This has been replaced with direct status checking in _retry_stage,
         but is kept for backward compatibility with other methods.
         """
         # Early exit for None response
@@ -315,29 +623,93 @@ class RequestSender:
         else:
             return status_code == expected_status
 
-    def _log_api_request(self, alias: str, method: str, endpoint: str, response: Any) -> None:
-        """Log API request and response details."""
-        status_code = self.response_handler.get_status_code(response)
-        content = "No Content"
-
-        if response:
-            try:
-                if self.response_handler.get_content_type(response).startswith('application/json'):
-                    content = self.response_handler.extract_json(response)
-                else:
-                    content = self.response_handler.get_content(response, as_text = True)
-            except Exception as e:
-                content = f"Could not parse response content: {str(e)}"
+    def set_logging_options(self, max_body_bytes: Optional[ int ] = None, pretty_json: Optional[ bool ] = None,
+                            body_dir: Optional[ str ] = None) -> None:
+        """
+        Configure how request/response bodies are logged.
 
-        # Format content for logging
-        if isinstance(content, (dict, list)):
+        :param max_body_bytes: Maximum body bytes written to the Robot log (0 logs no body)
+        :param pretty_json: Pretty print JSON bodies that fit within max_body_bytes
+        :param body_dir: Directory where full bodies are appended as JSONL, one file per test.
+                         Use an empty string to disable.
+        """
+        if max_body_bytes is not None:
+            self.log_body_max_bytes = max(int(max_body_bytes), 0)
+        if pretty_json is not None:
+            self.log_pretty_json = bool(pretty_json)
+        if body_dir is not None:
+            self.log_body_dir = body_dir or None
+
+    def _is_info_logged(self) -> bool:
+        """Check whether INFO messages would end up in the log at the current log level."""
+        try:
+            level = BuiltIn().get_variable_value('${LOG LEVEL}', 'INFO')
+        except Exception:
+            level = 'INFO'
+        return str(level).upper() in ('TRACE', 'DEBUG', 'INFO')
+
+    def _get_body_bytes(self, response: Any) -> bytes:
+        """Get the raw body of a response, without parsing or re-serializing it."""
+        if isinstance(response, (dict, list)):
+            body = { k: v for k, v in response.items() if k != '__response_metadata' } \
+                if isinstance(response, dict) else response
+            return json.dumps(body, default = str).encode('utf-8')
+        content = self.response_handler.get_content(response, as_text = False)
+        if isinstance(content, str):
+            return content.encode('utf-8')
+        return content or b""
+
+    def _format_body(self, body: bytes) -> str:
+        """Format a body for the Robot log, truncated to the configured byte budget."""
+        if not body:
+            return "No Content"
+        budget = self.log_body_max_bytes
+        if budget == 0:
+            return f"<{len(body)} bytes not logged>"
+
+        if self.log_pretty_json and len(body) <= budget:
             try:
-                content_str = json.dumps(content, indent = 2)
-            except:
-                content_str = str(content)
-        else:
-            content_str = str(content)
+                return json.dumps(json.loads(body), indent = 2)
+            except (ValueError, TypeError):
+                pass
+
+        text = body[ :budget ].decode('utf-8', errors = 'replace')
+        if len(body) > budget:
+            text += f"... [truncated, {len(body) - budget} of {len(body)} bytes not logged]"
+        return text
+
+    def _write_body_file(self, alias: str, method: str, endpoint: str, status_code: Optional[ int ],
+                         body: bytes) -> Optional[ str ]:
+        """Append the full body to the per-test JSONL side file and return its path."""
+        try:
+            builtin = BuiltIn()
+            name = builtin.get_variable_value('${TEST NAME}') or builtin.get_variable_value('${SUITE NAME}') \
+                   or 'api_bodies'
+        except Exception:
+            name = 'api_bodies'
+        file_name = re.sub(r'[^\w.-]+', '_', str(name)).strip('_') + '.jsonl'
+        path = os.path.join(self.log_body_dir, file_name)
+
+        record = {
+            "time": time.time(),
+            "session": alias,
+            "method": method.upper(),
+            "endpoint": endpoint,
+            "status_code": status_code,
+            "body": body.decode('utf-8', errors = 'replace')
+        }
+        try:
+            with self._body_file_lock:
+                os.makedirs(self.log_body_dir, exist_ok = True)
+                with open(path, 'a', encoding = 'utf-8') as body_file:
+                    body_file.write(json.dumps(record) + "\n")
+            return path
+        except OSError as e:
+            logger.warn(f"Could not write response body to '{path}': {e}")
+            return None
 
+    def _log_api_request(self, alias: str, method: str, endpoint: str, response: Any) -> None:
+        """Log API request and response details."""
         # Log differently based on response status
         if response is None:
             logger.error(f"❌ API REQUEST FAILED:")
@@ -345,7 +717,29 @@ class RequestSender:
             logger.error(f"   - Method: {method.upper()}")
             logger.error(f"   - Endpoint: {endpoint}")
             logger.error(f"   - Response: None (Request failed completely)")
-        elif status_code and status_code >= 400:
+            return
+
+        status_code = self.response_handler.get_status_code(response)
+        is_error = bool(status_code and status_code >= 400)
+
+        # Successful calls are logged at INFO, so skip all formatting when INFO is filtered out
+        if not is_error and not self._is_info_logged():
+            return
+
+        if not isinstance(response, (dict, list)) and not is_body_consumed(response):
+            content_str = "<streamed body not read>"
+        else:
+            try:
+                body = self._get_body_bytes(response)
+                content_str = self._format_body(body)
+                if self.log_body_dir and body:
+                    body_path = self._write_body_file(alias, method, endpoint, status_code, body)
+                    if body_path:
+                        content_str = f"{content_str}\n              (full body in {body_path})"
+            except Exception as e:
+                content_str = f"Could not read response content: {str(e)}"
+
+        if is_error:
             logger.error(f"❌ API REQUEST ERROR:")
             logger.error(f"   - Session: {alias}")
             logger.error(f"   - Method: {method.upper()}")
@@ -363,81 +757,316 @@ class RequestSender:
             """
             logger.info(log_message)
 
-    def send_batch_requests(self, requests_list: List[ Dict ], **kwargs) -> List[ Any ]:
+    def send_batch_requests(self, requests_list: List[ Dict ], max_workers: int = 1,
+                            per_host_limit: Optional[ int ] = None, **kwargs) -> List[ Any ]:
         """
-        Send multiple API requests.
+        Send multiple API requests, optionally in parallel.
+
+        Every item goes through ``send_request``, so retries, expected_status, token refresh and
+        cassette misses behave exactly as they do for a single request.
 
         :param requests_list: List of request dictionaries
+        :param max_workers: Number of requests in flight at once (1 sends them sequentially)
+        :param per_host_limit: Maximum number of concurrent requests against the same host
         :param kwargs: Common parameters for all requests
-        :return: List of response objects
+        :return: List of response objects in the same order as requests_list
         """
-        responses = [ ]
-
-        for i, request_data in enumerate(requests_list):
-            try:
-                # Merge common kwargs with individual request data
-                merged_kwargs = kwargs.copy()
-                merged_kwargs.update(request_data.get('kwargs', { }))
-
-                # Send individual request
-                response = self.send_request(
-                    method = request_data.get('method'),
-                    alias = request_data.get('alias'),
-                    endpoint = request_data.get('endpoint'),
-                    url = request_data.get('url'),
-                    **merged_kwargs
-                )
-                responses.append(response)
-            except Exception as e:
-                logger.error(f"Error processing request at index {i}: {e}")
-                responses.append(self.response_handler.wrap_response(None))
+        max_workers = max(1, int(max_workers or 1))
+        per_host_limit = int(per_host_limit) if per_host_limit else None
+
+        if max_workers == 1 or len(requests_list) <= 1:
+            return [ self._send_batch_item(i, request_data, kwargs)
+                     for i, request_data in enumerate(requests_list) ]
+
+        host_limits = { }
+        if per_host_limit:
+            for request_data in requests_list:
+                host = self._get_request_host(request_data)
+                if host not in host_limits:
+                    host_limits[ host ] = threading.BoundedSemaphore(per_host_limit)
+
+        def send_item(index: int, request_data: Dict) -> Any:
+            limiter = host_limits.get(self._get_request_host(request_data))
+            if limiter is None:
+                return self._send_batch_item(index, request_data, kwargs)
+            with limiter:
+                return self._send_batch_item(index, request_data, kwargs)
 
+        start_time = time.time()
+        with ThreadPoolExecutor(max_workers = min(max_workers, len(requests_list)),
+                                thread_name_prefix = "api-batch") as executor:
+            futures = [ executor.submit(send_item, i, request_data)
+                        for i, request_data in enumerate(requests_list) ]
+            responses = [ future.result() for future in futures ]
+
+        # Messages logged from worker threads are dropped by Robot, so summarize here
+        failed = sum(1 for response in responses if self.response_handler.get_status_code(response) is None)
+        logger.info(f"Batch of {len(requests_list)} requests finished in {time.time() - start_time:.2f}s "
+                    f"(workers={max_workers}, per_host_limit={per_host_limit}, failed={failed})")
         return responses
 
-    def wait_until_status(self, method: str, alias: str, endpoint: str, expected_status: Union[ int, List[ int ] ],
-                          timeout: int = 60, interval: int = 5, **kwargs) -> Any:
-        """Wait until an API endpoint returns an expected status code."""
-        start_time = time.time()
-        end_time = start_time + timeout
+    def _send_batch_item(self, index: int, request_data: Dict, common_kwargs: Dict) -> Any:
+        """Send a single item of a batch; only a cassette miss is raised, as it is for a single request."""
+        try:
+            # Merge common kwargs with individual request data
+            merged_kwargs = common_kwargs.copy()
+            merged_kwargs.update(request_data.get('kwargs', { }))
+
+            # Send individual request
+            return self.send_request(
+                method = request_data.get('method'),
+                alias = request_data.get('alias'),
+                endpoint = request_data.get('endpoint'),
+                url = request_data.get('url'),
+                **merged_kwargs
+            )
+        except CassetteMiss:
+            raise
+        except Exception as e:
+            logger.error(f"Error processing request at index {index}: {e}")
+            return self.response_handler.wrap_response(None)
 
-        if not isinstance(expected_status, (list, tuple)):
-            expected_status = [ expected_status ]
+    def _get_request_host(self, request_data: Dict) -> Optional[ str ]:
+        """Resolve the host a batch item will be sent to, used for per-host limits."""
+        url = request_data.get('url')
+        if not url and request_data.get('alias'):
+            url = self.session_manager.get_session_url(request_data.get('alias'))
+        return urlparse(url).netloc if url else None
+
+    def download_file(self, alias: Optional[ str ] = None, endpoint: Optional[ str ] = None,
+                      url: Optional[ str ] = None, path: Optional[ str ] = None, method: str = "GET",
+                      expected_hash: Optional[ str ] = None, hash_algorithm: Optional[ str ] = "sha256",
+                      chunk_size: int = 65536, progress_callback: Optional[ Union[ Callable, str ] ] = None,
+                      progress_interval: float = 1.0, **kwargs) -> Dict:
+        """
+        Download a response body straight to disk, without holding it in memory.
 
-        while time.time() < end_time:
-            try:
-                response = self.send_request(method, alias, endpoint = endpoint, **kwargs)
-                status_code = self.response_handler.get_status_code(response)
+        The request is sent with stream=True through send_request, so retries, tokens, custom headers,
+        cassettes and metrics apply as for any other request. Relative paths are resolved against
+        ${DOWNLOADS_DIRECTORY_PATH}; without a file name the name is taken from Content-Disposition
+        or the URL.
 
-                if status_code in expected_status:
-                    return response
+        :param alias: The session alias (optional)
+        :param endpoint: API endpoint (relative to base URL)
+        :param url: Full URL for the request (when not using session)
+        :param path: Destination file or directory
+        :param method: HTTP method
+        :param expected_hash: Expected hex digest of the body; a mismatch removes the file and fails
+        :param hash_algorithm: hashlib algorithm for the digest, or None to skip hashing
+        :param chunk_size: Bytes written per chunk
+        :param progress_callback: Callable or keyword name called with (downloaded_bytes, total_bytes)
+        :param progress_interval: Minimum seconds between progress calls
+        :param kwargs: Additional request parameters, as for send_request
+        :return: Dictionary with path, size, hash, algorithm, elapsed, status_code and content_type
+        """
+        kwargs[ 'stream' ] = True
+        response = self.response_handler.get_original_response(
+            self.send_request(method, alias, endpoint, url, **kwargs))
+        if response is None:
+            raise AssertionError(f"Download of {url or endpoint} failed: no response received")
+        if response.status_code >= 400:
+            response.close()
+            raise AssertionError(f"Download of {response.url} failed with status {response.status_code}")
+
+        destination = resolve_transfer_path("downloads", path) or get_transfer_directory("downloads")
+        if os.path.isdir(destination) or destination.endswith(('/', os.sep)):
+            destination = os.path.join(destination, filename_from_response(response))
+        total = response.headers.get('Content-Length')
+        # A Content-Length of an encoded body does not match the decoded bytes written
+        if total is None or response.headers.get('Content-Encoding', 'identity') != 'identity':
+            total = None
+        progress = TransferProgress(progress_callback, int(total) if total else None, progress_interval)
+
+        result = save_stream(response, destination, chunk_size, hash_algorithm, progress)
+        result[ "status_code" ] = response.status_code
+        result[ "content_type" ] = response.headers.get('Content-Type')
+        if expected_hash and result[ "hash" ] != expected_hash.strip().lower():
+            os.remove(destination)
+            raise AssertionError(f"{hash_algorithm} of {response.url} is {result[ 'hash' ]}, "
+                                 f"expected {expected_hash}")
+        logger.info(f"Downloaded {result[ 'size' ]} bytes to {destination} in {result[ 'elapsed' ]}s")
+        return result
+
+    def upload_file(self, alias: Optional[ str ] = None, endpoint: Optional[ str ] = None,
+                    url: Optional[ str ] = None, file: Any = None, field_name: str = "file",
+                    fields: Optional[ Dict ] = None, filename: Optional[ str ] = None,
+                    content_type: Optional[ str ] = None, method: str = "POST", chunk_size: int = 65536,
+                    progress_callback: Optional[ Union[ Callable, str ] ] = None, progress_interval: float = 1.0,
+                    **kwargs) -> Any:
+        """
+        Upload a file as multipart/form-data, streaming it from disk instead of loading it in memory.
 
-                logger.info(f"Waiting for API status {expected_status}, got {status_code}")
-            except Exception as e:
-                logger.warn(f"Error while waiting for API status: {e}")
+        Relative paths are resolved against ${UPLOADS_DIRECTORY_PATH}. The body is regenerated for
+        retries; a source that cannot be read again (a generator) is sent only once.
 
-            time.sleep(interval)
+        :param alias: The session alias (optional)
+        :param endpoint: API endpoint (relative to base URL)
+        :param url: Full URL for the request (when not using session)
+        :param file: File path, binary file object or iterable of bytes
+        :param field_name: Form field name of the file
+        :param fields: Additional form fields
+        :param filename: File name sent to the server (default: base name of the file)
+        :param content_type: Content type of the file part (default: guessed from the file name)
+        :param method: HTTP method
+        :param chunk_size: Bytes read per chunk
+        :param progress_callback: Callable or keyword name called with (uploaded_bytes, total_bytes)
+        :param progress_interval: Minimum seconds between progress calls
+        :param kwargs: Additional request parameters, as for send_request
+        :return: Response object or None if failed
+        """
+        if isinstance(file, str):
+            file = resolve_transfer_path("uploads", file)
+            if not os.path.isfile(file):
+                raise FileNotFoundError(f"Upload file '{file}' does not exist")
+        progress = TransferProgress(progress_callback, None, progress_interval)
+        body = MultipartStream(fields, [ { "name": field_name, "source": file, "filename": filename,
+                                           "content_type": content_type } ], chunk_size, progress)
+        progress.total = body.len
+        if not body.rewindable:
+            # send_request retries by default, which a one-shot source cannot support
+            if int(kwargs.get('max_retries', 1)) > 1:
+                logger.warn("Upload source cannot be read twice, sending it without retries")
+            kwargs[ 'max_retries' ] = 1
+
+        kwargs[ 'custom_headers' ] = self.utils.merge_headers(kwargs.get('custom_headers'),
+                                                              { 'Content-Type': body.content_type })
+        return self.send_request(method, alias, endpoint, url, data = body, **kwargs)
 
-        logger.error(f"Timeout after {timeout} seconds waiting for API status {expected_status}")
-        return self.response_handler.wrap_response(None)
+    def wait_until_status(self, method: str, alias: str, endpoint: str, expected_status: Union[ int, List[ int ] ],
+                          timeout: int = 60, interval: int = 5, backoff: float = 1.0,
+                          max_interval: Optional[ float ] = None, jitter: float = 0.0,
+                          terminal_status: Optional[ Union[ int, str, List[ int ] ] ] = None, **kwargs) -> Any:
+        """
+        Wait until an API endpoint returns an expected status code.
+
+        :param expected_status: Status code(s) that end the wait successfully
+        :param timeout: Maximum total wait in seconds
+        :param interval: Initial delay between polls in seconds
+        :param backoff: Multiplier applied to the delay after every poll (1 keeps it fixed)
+        :param max_interval: Upper bound for the delay between polls
+        :param jitter: Random +/- fraction applied to each delay (e.g. 0.1 for 10%)
+        :param terminal_status: Status code(s) that stop the wait immediately, as they will never change
+        :return: The matching response, the terminal response, or None on timeout
+        """
+        expected_status = self.utils.normalize_status_list(expected_status)
+
+        def status_matches(response: Any) -> bool:
+            return self.response_handler.get_status_code(response) in expected_status
+
+        return self._poll(method, alias, endpoint, status_matches, f"API status {expected_status}",
+                          timeout, interval, backoff, max_interval, jitter, terminal_status, kwargs)
 
     def wait_until_response(self, method: str, alias: str, endpoint: str, condition_func: Callable,
-                            timeout: int = 60, interval: int = 5, **kwargs) -> Any:
-        """Wait until an API endpoint returns a response that satisfies a condition."""
-        start_time = time.time()
-        end_time = start_time + timeout
+                            timeout: int = 60, interval: int = 5, backoff: float = 1.0,
+                            max_interval: Optional[ float ] = None, jitter: float = 0.0,
+                            terminal_status: Optional[ Union[ int, str, List[ int ] ] ] = None, **kwargs) -> Any:
+        """
+        Wait until an API endpoint returns a response that satisfies a condition.
+
+        Takes the same polling options as wait_until_status.
+        """
+        return self._poll(method, alias, endpoint, condition_func, "API response condition",
+                          timeout, interval, backoff, max_interval, jitter, terminal_status, kwargs)
+
+    def _poll(self, method: str, alias: str, endpoint: str, condition_func: Callable, description: str,
+              timeout: float, interval: float, backoff: float, max_interval: Optional[ float ], jitter: float,
+              terminal_status: Any, request_kwargs: Dict) -> Any:
+        """
+        Poll an endpoint until condition_func accepts a response, the deadline passes or a terminal status is seen.
+
+        Sleeps never run past the deadline. When the server sends an ETag, following polls use
+        If-None-Match, and a 304 Not Modified is treated as "unchanged" without evaluating the condition.
+        A summary of the polling is stored in last_poll_summary and logged.
+        """
+        timeout = float(timeout)
+        delay = max(float(interval), 0.0)
+        backoff = max(float(backoff), 1.0)
+        max_interval = float(max_interval) if max_interval else None
+        jitter = min(max(float(jitter), 0.0), 1.0)
+        terminal_status = self.utils.normalize_status_list(terminal_status)
+        base_headers = request_kwargs.pop('custom_headers', None) or { }
+
+        start_time = time.monotonic()
+        deadline = start_time + timeout
+        attempts = 0
+        not_modified = 0
+        total_wait = 0.0
+        latencies = [ ]
+        etag = None
+        outcome = "timeout"
+        result = None
+
+        while True:
+            attempts += 1
+            # Every poll must reach the server, never a cached response
+            kwargs = dict(request_kwargs, use_cache = False)
+            remaining = deadline - time.monotonic()
+            if 'timeout' not in kwargs:
+                # Never let a single poll run past the deadline
+                kwargs[ 'timeout' ] = max(min(self.global_timeout, remaining), 0.1)
+            # Nor let retries of a poll wait past it
+            budget = request_kwargs.get('retry_budget')
+            kwargs[ 'retry_budget' ] = max(min(float(budget), remaining) if budget is not None else remaining, 0.0)
+            if etag:
+                kwargs[ 'custom_headers' ] = self.utils.merge_headers(base_headers, { 'If-None-Match': etag })
+            elif base_headers:
+                kwargs[ 'custom_headers' ] = base_headers
 
-        while time.time() < end_time:
             try:
+                request_start = time.monotonic()
                 response = self.send_request(method, alias, endpoint = endpoint, **kwargs)
+                latencies.append(time.monotonic() - request_start)
+                status_code = self.response_handler.get_status_code(response)
 
-                if condition_func(response):
-                    return response
-
-                logger.info("Waiting for API response to satisfy condition")
+                if status_code == 304 and etag:
+                    not_modified += 1
+                    logger.debug(f"Waiting for {description}, resource not modified")
+                else:
+                    # Parsed JSON bodies keep their headers on the original response
+                    original = self.response_handler.get_original_response(response)
+                    etag = original.headers.get('ETag') if original is not None else None
+
+                    if condition_func(response):
+                        outcome, result = "success", response
+                        break
+                    if status_code in terminal_status:
+                        logger.error(f"Stopped waiting for {description}: received terminal status {status_code}")
+                        outcome, result = "terminal", response
+                        break
+                    logger.info(f"Waiting for {description}, got status {status_code}")
+            except CassetteMiss:
+                raise
             except Exception as e:
-                logger.warn(f"Error while waiting for API response: {e}")
-
-            time.sleep(interval)
+                logger.warn(f"Error while waiting for {description}: {e}")
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            sleep_time = delay * (1 + random.uniform(-jitter, jitter)) if jitter else delay
+            sleep_time = min(max(sleep_time, 0.0), remaining)
+            time.sleep(sleep_time)
+            total_wait += sleep_time
+            delay = delay * backoff
+            if max_interval is not None:
+                delay = min(delay, max_interval)
+
+        self.last_poll_summary = {
+            "outcome": outcome,
+            "attempts": attempts,
+            "not_modified": not_modified,
+            "elapsed": round(time.monotonic() - start_time, 3),
+            "total_wait": round(total_wait, 3),
+            "latency_p50": self._round(self.utils.percentile(latencies, 50)),
+            "latency_p95": self._round(self.utils.percentile(latencies, 95)),
+            "latency_max": self._round(max(latencies) if latencies else None)
+        }
+        logger.info(f"Polling summary for {description}: {self.last_poll_summary}")
+
+        if outcome == "timeout":
+            logger.error(f"Timeout after {timeout} seconds waiting for {description}")
+            return self.response_handler.wrap_response(None)
+        return result
 
-        logger.error(f"Timeout after {timeout} seconds waiting for API response condition")
-        return self.response_handler.wrap_response(None)
+    @staticmethod
+    def _round(value: Optional[ float ]) -> Optional[ float ]:
+        return round(value, 4) if value is not None else None
@@ -1,9 +1,16 @@
+import re
 import uuid
+from datetime import timedelta
 from urllib.parse import urlparse, urlunparse
 from typing import Dict, Any, Optional, Union, Tuple, List
+import requests
+from requests.structures import CaseInsensitiveDict
 from robot.api import logger
 from robot.api.deco import keyword, library
 
+# Path segments that identify a single resource: numbers, UUIDs and long tokens containing digits
+_ID_SEGMENT = re.compile(r'^(\d+|[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}'
+                         r'|(?=[A-Za-z_-]*\d)[A-Za-z0-9_-]{16,})$')
 
 @library(doc_format = 'ROBOT', auto_keywords=True)
 class RequestUtils:
@@ -57,11 +64,14 @@ class RequestUtils:
                 break
 
         # Extract control parameters safely (not for HTTP request)
-        control_params[ 'max_retries' ] = request_kwargs.pop('max_retries', 3)
-        control_params[ 'delay' ] = request_kwargs.pop('delay', 2)
+        control_params[ 'max_retries' ] = int(request_kwargs.pop('max_retries', 3))
+        control_params[ 'delay' ] = float(request_kwargs.pop('delay', 2))
         control_params[ 'token_check_on_failure' ] = request_kwargs.pop('token_check_on_failure', True)
         control_params[ 'auto_refresh' ] = request_kwargs.pop('auto_refresh', True)
         control_params[ 'random_session' ] = request_kwargs.pop('random_session', False)
+        control_params[ 'retry_on_status' ] = request_kwargs.pop('retry_on_status', None)
+        control_params[ 'retry_budget' ] = request_kwargs.pop('retry_budget', None)
+        control_params[ 'use_cache' ] = request_kwargs.pop('use_cache', True)
 
         # Safely handle custom_headers
         custom_headers = request_kwargs.pop('custom_headers', None)
@@ -218,3 +228,77 @@ class RequestUtils:
             if value is None:
                 missing.append(name)
         return missing
+
+    def percentile(self, values: List[ float ], pct: float) -> Optional[ float ]:
+        """
+        Calculate a percentile with linear interpolation.
+
+        :param values: Sample values
+        :param pct: Percentile between 0 and 100
+        :return: The percentile value or None for an empty sample
+        """
+        if not values:
+            return None
+        ordered = sorted(values)
+        rank = (len(ordered) - 1) * (float(pct) / 100)
+        lower = int(rank)
+        upper = min(lower + 1, len(ordered) - 1)
+        return ordered[ lower ] + (ordered[ upper ] - ordered[ lower ]) * (rank - lower)
+
+    def normalize_status_list(self, statuses: Any) -> List[ int ]:
+        """
+        Normalize one or more status codes (int, "400,404" string or list) to a list of ints.
+
+        :param statuses: Status code(s) in any of the supported forms
+        :return: List of integer status codes
+        """
+        if statuses is None or statuses == '':
+            return [ ]
+        if isinstance(statuses, str):
+            statuses = statuses.split(',')
+        elif not isinstance(statuses, (list, tuple, set)):
+            statuses = [ statuses ]
+        return [ int(str(status).strip()) for status in statuses if str(status).strip() ]
+
+    def endpoint_template(self, endpoint: Optional[ str ]) -> str:
+        """
+        Reduce an endpoint or URL to a template, so requests for different resources group together.
+
+        The query string is dropped and id-like path segments are replaced, e.g.
+        ``/users/42/orders?page=2`` becomes ``/users/{id}/orders``.
+
+        :param endpoint: Endpoint path or full URL
+        :return: The endpoint template
+        """
+        if not endpoint:
+            return "/"
+        path = urlparse(endpoint).path if '://' in endpoint else endpoint.split('?', 1)[ 0 ].split('#', 1)[ 0 ]
+        segments = [ "{id}" if _ID_SEGMENT.match(segment) else segment for segment in path.split('/') ]
+        return '/'.join(segments) or "/"
+
+    def build_response(self, status_code: int, content: bytes, headers: Optional[ Dict ] = None,
+                       url: Optional[ str ] = None, method: str = "GET", reason: Optional[ str ] = None,
+                       encoding: Optional[ str ] = None, elapsed: float = 0.0) -> requests.Response:
+        """
+        Build a requests.Response that did not come from the network, e.g. from a cache or cassette.
+
+        :param status_code: HTTP status code
+        :param content: Response body
+        :param headers: Response headers
+        :param url: URL of the response
+        :param method: Method of the request the response belongs to
+        :param reason: Reason phrase
+        :param encoding: Text encoding of the body
+        :param elapsed: Elapsed time in seconds
+        :return: The response
+        """
+        response = requests.Response()
+        response.status_code = status_code
+        response._content = content
+        response.headers = CaseInsensitiveDict(headers or { })
+        response.url = url
+        response.reason = reason
+        response.encoding = encoding
+        response.elapsed = timedelta(seconds = elapsed or 0)
+        response.request = requests.Request(method.upper(), url).prepare() if url else None
+        return response
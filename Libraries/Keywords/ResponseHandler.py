@@ -1,29 +1,140 @@
 import json
+import itertools
+import threading
 import requests
-from typing import Dict, Any, Optional, Union
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Union, List
 from robot.api import logger
-from ResponseWrapper import ResponseWrapper
+import JsonPath
+from ResponseWrapper import ResponseWrapper, decode_response_json, is_body_consumed
+from SchemaValidator import schema_validator
 from robot.api.deco import keyword, library
 
 
+class ResponseStore:
+    """
+    Bounded LRU store of original response objects.
+
+    Responses are keyed by a monotonically increasing id rather than id(), so an id is never
+    reused for a different response after garbage collection. The store is capped both by the
+    number of entries and by the total size of the cached bodies.
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 64 * 1024 * 1024):
+        """
+        Initialize the store.
+
+        :param max_entries: Maximum number of responses kept (0 disables caching)
+        :param max_bytes: Maximum total size of cached response bodies in bytes
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _body_size(response: Any) -> int:
+        """Size of the already downloaded body, without forcing a streamed body to be read."""
+        content = getattr(response, '_content', None)
+        return len(content) if isinstance(content, bytes) else 0
+
+    def add(self, response: Any) -> int:
+        """
+        Store a response and return its id.
+
+        :param response: The original response object
+        :return: The id assigned to the response
+        """
+        response_id = next(self._ids)
+        if self.max_entries <= 0:
+            return response_id
+
+        size = self._body_size(response)
+        with self._lock:
+            self._entries[ response_id ] = (response, size)
+            self.total_bytes += size
+            self._evict()
+        return response_id
+
+    def get(self, response_id: Any) -> Optional[ Any ]:
+        """
+        Get a stored response by id, marking it as recently used.
+
+        :param response_id: Id returned by add()
+        :return: The response object or None if it was evicted or never stored
+        """
+        with self._lock:
+            entry = self._entries.get(response_id)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(response_id)
+            self.hits += 1
+            return entry[ 0 ]
+
+    def configure(self, max_entries: Optional[ int ] = None, max_bytes: Optional[ int ] = None) -> None:
+        """Change the limits, evicting entries immediately if needed."""
+        with self._lock:
+            if max_entries is not None:
+                self.max_entries = int(max_entries)
+            if max_bytes is not None:
+                self.max_bytes = int(max_bytes)
+            self._evict()
+
+    def clear(self) -> None:
+        """Drop all stored responses."""
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def stats(self) -> Dict:
+        """Return size, limit and hit/miss/eviction counters."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.total_bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions
+            }
+
+    def _evict(self) -> None:
+        """Evict least recently used entries until both limits are met. Caller holds the lock."""
+        while self._entries and (len(self._entries) > max(self.max_entries, 0)
+                                 or (self.max_bytes and self.total_bytes > self.max_bytes)):
+            _, (_, size) = self._entries.popitem(last = False)
+            self.total_bytes -= size
+            self.evictions += 1
+
+
 @library(doc_format = 'ROBOT', auto_keywords=True)
 class ResponseHandler:
     """
     Handles response processing, validation, and data extraction.
     """
 
-    def __init__(self, auto_json: bool = True, detailed_response: bool = True, return_json: bool = True):
+    def __init__(self, auto_json: bool = True, detailed_response: bool = True, return_json: bool = True,
+                 cache_max_entries: int = 256, cache_max_bytes: int = 64 * 1024 * 1024):
         """
         Initialize response handler.
 
-        :param auto_json: Automatically parse JSON responses
+        :param auto_json: Kept for compatibility; JSON is always parsed on first use and then cached
         :param detailed_response: Return detailed ResponseWrapper objects
         :param return_json: Return JSON for JSON responses
+        :param cache_max_entries: Maximum number of original responses kept for lookups
+        :param cache_max_bytes: Maximum total body size of the kept responses
         """
         self.auto_json = auto_json
         self.detailed_response = detailed_response
         self.return_json = return_json
-        self._response_cache = {}
+        self.response_store = ResponseStore(cache_max_entries, cache_max_bytes)
 
     def wrap_response(self, response: Optional[ requests.Response ]) -> Union[
         ResponseWrapper, requests.Response, Dict, None ]:
@@ -38,23 +149,21 @@ class ResponseHandler:
             return None
 
         try:
-            # Generate a unique identifier for the response object
-            response_id = id(response)
-
-            # Store the original response in the cache
-            self._response_cache[ response_id ] = response
+            # Store the original response in the bounded cache under a unique identifier
+            response_id = self.response_store.add(response)
 
             # Always keep the original status code
             original_status_code = None
             if hasattr(response, 'status_code'):
                 original_status_code = response.status_code
 
-            # Try to parse JSON if return_json is enabled and the response appears to be JSON
-            if self.return_json and hasattr(response, 'headers'):
+            # Try to parse JSON if return_json is enabled and the response appears to be JSON.
+            # Streamed bodies are left unread and returned as a ResponseWrapper instead.
+            if self.return_json and hasattr(response, 'headers') and is_body_consumed(response):
                 content_type = response.headers.get('Content-Type', '')
                 if content_type and isinstance(content_type, str) and content_type.startswith('application/json'):
                     try:
-                        json_data = response.json()
+                        json_data = decode_response_json(response)
 
                         # Check if json_data is a dictionary before attempting to modify it
                         if isinstance(json_data, dict):
@@ -94,7 +203,7 @@ class ResponseHandler:
             # Fall back to ResponseWrapper if detailed_response is enabled
             if self.detailed_response:
                 try:
-                    wrapper = ResponseWrapper(response, self.auto_json)
+                    wrapper = ResponseWrapper(response)
                     wrapper._response_id = response_id  # Add the ID to the wrapper
                     return wrapper
                 except Exception as e:
@@ -112,17 +221,19 @@ class ResponseHandler:
         """
         Extract JSON data or a specific value from a response.
 
-        :param response: Response object or ResponseWrapper
-        :param json_path: Optional dot-notation path to extract
+        :param response: Response object, ResponseWrapper or already parsed JSON
+        :param json_path: Optional JSON path to extract (dot notation, wildcards, filters, multi-select)
         :param default: Default value to return if path not found
         :return: The JSON data or extracted value
         """
-        # Convert to ResponseWrapper if it's a regular response
-        if hasattr(response, 'json') and callable(response.json) and not isinstance(response, ResponseWrapper):
-            wrapped_response = ResponseWrapper(response, self.auto_json)
-        elif isinstance(response, ResponseWrapper):
-            wrapped_response = response
-        else:
+        # Already parsed JSON (return_json mode) is queried directly
+        if isinstance(response, (dict, list)):
+            if json_path:
+                return JsonPath.find(response, json_path, default)
+            return response
+
+        wrapped_response = self._as_wrapper(response)
+        if wrapped_response is None:
             logger.warn("Cannot extract JSON from invalid response object")
             return default
 
@@ -130,7 +241,52 @@ class ResponseHandler:
         if json_path:
             return wrapped_response.get_json_value(json_path, default)
         else:
-            return wrapped_response.json() or default
+            json_data = wrapped_response.json()
+            return default if json_data is None else json_data
+
+    def extract_json_values(self, response: Any, json_paths: Union[ List[ str ], Dict[ str, str ] ],
+                            default: Any = None) -> Dict[ str, Any ]:
+        """
+        Extract several values from a response in a single pass over the document.
+
+        :param response: Response object, ResponseWrapper or already parsed JSON
+        :param json_paths: List of paths, or a dictionary mapping result names to paths
+        :param default: Default value for single-value paths that are not found
+        :return: Dictionary mapping each name (or path) to its extracted value
+        """
+        if isinstance(response, (dict, list)):
+            return JsonPath.extract_many(response, json_paths, default)
+
+        wrapped_response = self._as_wrapper(response)
+        if wrapped_response is None:
+            logger.warn("Cannot extract JSON from invalid response object")
+            names = json_paths if isinstance(json_paths, dict) else { path: path for path in json_paths }
+            return { name: default for name in names }
+
+        return wrapped_response.get_json_values(json_paths, default)
+
+    def _as_wrapper(self, response: Any) -> Optional[ ResponseWrapper ]:
+        """Convert a regular response to a ResponseWrapper, or return None for invalid objects."""
+        if isinstance(response, ResponseWrapper):
+            return response
+        if hasattr(response, 'json') and callable(response.json):
+            return ResponseWrapper(response)
+        return None
+
+    def get_original_response(self, response: Any) -> Optional[ requests.Response ]:
+        """
+        Get the requests.Response behind any form returned by wrap_response.
+
+        :param response: Response object, ResponseWrapper or parsed JSON with response metadata
+        :return: The original response, or None when it is not available (e.g. evicted from the store)
+        """
+        if isinstance(response, ResponseWrapper):
+            return response.response
+        if isinstance(response, requests.Response):
+            return response
+        if isinstance(response, dict) and '__response_metadata' in response:
+            return self.response_store.get(response[ '__response_metadata' ].get('id'))
+        return None
 
     def get_status_code(self, response: Any) -> Optional[ int ]:
         """
@@ -157,14 +313,8 @@ class ResponseHandler:
                 return response[ '__response_metadata' ].get('status_code')
 
             # Case 4: ResponseWrapper or object with _response_id
-            if hasattr(response, '_response_id') and response._response_id in self._response_cache:
-                original_response = self._response_cache[ response._response_id ]
-                if hasattr(original_response, 'status_code'):
-                    return original_response.status_code
-
-            # Case 5: Try to find the response in the cache by id
-            if isinstance(response, (dict, list)) and id(response) in self._response_cache:
-                original_response = self._response_cache[ id(response) ]
+            if hasattr(response, '_response_id'):
+                original_response = self.response_store.get(response._response_id)
                 if hasattr(original_response, 'status_code'):
                     return original_response.status_code
 
@@ -242,31 +392,65 @@ class ResponseHandler:
 
         return cookies
 
-    def validate_response(self, response: Any, schema: Dict) -> bool:
+    def validate_response(self, response: Any, schema: Optional[ Union[ Dict, str ] ], max_errors: int = 50,
+                          sample_size: Optional[ int ] = None) -> bool:
         """
-        Simple validation that checks if response is valid JSON.
-
-        :param response: Response object or ResponseWrapper
-        :param schema: JSON schema to validate against (not used)
-        :return: True if valid JSON response, False otherwise
+        Validate a JSON response against a JSON schema, logging every error found.
+
+        :param response: Response object, ResponseWrapper or parsed JSON
+        :param schema: Schema as a dictionary, JSON string or file path; without a schema only
+                       checks that the body is JSON
+        :param max_errors: Stop after this many errors (0 for no limit)
+        :param sample_size: For large arrays, validate only this many evenly spread items
+        :return: True if the response is JSON and matches the schema, False otherwise
         """
         try:
-            # Extract JSON from response
-            if isinstance(response, ResponseWrapper):
-                response_json = response.json()
-            elif hasattr(response, 'json') and callable(response.json):
-                response_json = response.json()
-            elif isinstance(response, dict):
-                response_json = response  # Assume response is already parsed JSON
-            else:
-                logger.error("Invalid response object for validation")
-                return False
-
-            # If we successfully got JSON data, return True
-            return True
+            report = self.validate_response_schema(response, schema, max_errors, sample_size)
         except (ValueError, json.JSONDecodeError, AttributeError) as e:
             logger.error(f"Could not parse response as JSON: {e}")
             return False
+        if not report[ "valid" ]:
+            logger.error(schema_validator.format_report(report))
+        return report[ "valid" ]
+
+    def validate_response_schema(self, response: Any, schema: Optional[ Union[ Dict, str ] ], max_errors: int = 50,
+                                 sample_size: Optional[ int ] = None) -> Dict:
+        """
+        Validate a JSON response against a JSON schema and report all errors.
+
+        :param response: Response object, ResponseWrapper or parsed JSON
+        :param schema: Schema as a dictionary, JSON string or file path
+        :param max_errors: Stop after this many errors (0 for no limit)
+        :param sample_size: For large arrays, validate only this many evenly spread items
+        :return: Validation report (see SchemaValidator.validate)
+        :raises ValueError: If the response has no JSON body
+        """
+        document = self._get_json_document(response)
+        if not schema:
+            return { "valid": True, "error_count": 0, "errors": [ ], "truncated": False, "items_checked": None,
+                     "elapsed_ms": 0.0 }
+        return schema_validator.validate(document, schema, max_errors, sample_size)
+
+    def _get_json_document(self, response: Any) -> Any:
+        """Return the JSON body of a response as the server sent it, without the metadata added by wrap_response."""
+        if isinstance(response, dict) and '__response_metadata' in response:
+            if set(response) == { 'data', 'status_code', '__response_metadata' }:
+                # A list or scalar body was wrapped under data, unless the body was an object with only data
+                original = self.response_store.get(response[ '__response_metadata' ].get('id'))
+                content = getattr(original, 'content', None) or b""
+                if not content.lstrip().startswith(b"{"):
+                    return response[ 'data' ]
+            return { key: value for key, value in response.items()
+                     if key not in ('status_code', '__response_metadata') }
+        if isinstance(response, (dict, list)):
+            return response
+        wrapper = self._as_wrapper(response)
+        if wrapper is None:
+            raise ValueError("Invalid response object for validation")
+        document = wrapper.json()
+        if document is None and (wrapper.response is None or wrapper.response.content.strip() != b"null"):
+            raise ValueError("Response body is not JSON")
+        return document
 
     def get_content_type(self, response: Any) -> Optional[str]:
         """
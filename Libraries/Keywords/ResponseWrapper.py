@@ -1,8 +1,72 @@
 import json
+import importlib
 import requests
-from typing import Dict, Any, Optional, Union, List
+from typing import Dict, Any, Optional, Union, List, Iterator
 from robot.api import logger
 from robot.api.deco import library, keyword
+import JsonPath as json_path
+
+# Marks JSON that has not been parsed yet, so falsy results like {} or [] are cached too
+_UNSET = object()
+# Marks a body that already failed to parse, so it is not parsed again
+_INVALID = object()
+
+_JSON_BACKENDS = ('json', 'orjson', 'ujson')
+_json_backend = { "name": "json", "loads": json.loads }
+
+
+def set_json_backend(name: str = "json") -> str:
+    """
+    Select the decoder used for response bodies.
+
+    orjson and ujson are optional; if the module is not installed the standard json module is used.
+
+    :param name: One of json, orjson or ujson
+    :return: Name of the backend actually in use
+    """
+    name = (name or "json").lower()
+    if name not in _JSON_BACKENDS:
+        raise ValueError(f"Unknown JSON backend '{name}', expected one of {', '.join(_JSON_BACKENDS)}")
+
+    loads = json.loads
+    if name != "json":
+        try:
+            loads = importlib.import_module(name).loads
+        except ImportError:
+            logger.warn(f"JSON backend '{name}' is not installed, falling back to json")
+            name = "json"
+
+    _json_backend.update({ "name": name, "loads": loads })
+    return name
+
+
+def get_json_backend() -> str:
+    """Return the name of the JSON decoder backend in use."""
+    return _json_backend[ "name" ]
+
+
+def decode_response_json(response: requests.Response) -> Any:
+    """
+    Decode a response body as JSON with the selected backend.
+
+    UTF encoded bodies are decoded straight from the raw bytes, which avoids building the
+    intermediate text copy that response.json() creates.
+
+    :param response: The response to decode
+    :return: The decoded JSON data
+    :raises ValueError: If the body is not valid JSON
+    """
+    encoding = (getattr(response, 'encoding', None) or 'utf-8').lower().replace('_', '-')
+    if encoding.startswith('utf-8') or encoding in ('utf8', 'ascii', 'us-ascii'):
+        body = response.content
+    else:
+        body = response.text
+    return _json_backend[ "loads" ](body)
+
+
+def is_body_consumed(response: Any) -> bool:
+    """Return False for a streamed response whose body has not been read yet."""
+    return getattr(response, '_content', None) is not False
 
 
 @library(doc_format = 'ROBOT', auto_keywords=True)
@@ -12,59 +76,52 @@ class ResponseWrapper:
     Provides easy access to common response properties and attributes.
     """
 
-    def __init__(self, response: Optional[requests.Response], auto_json: bool = False):
+    def __init__(self, response: Optional[requests.Response]):
         """
         Initialize the ResponseWrapper with a requests.Response object.
 
+        JSON is parsed lazily on the first call to json() and the result is kept, so a
+        response that is only status-checked is never parsed.
+
         :param response: The original requests.Response object or None if request failed
-        :param auto_json: Whether to automatically parse JSON response
         """
         self.response = response
-        self._json_data = None
-        self._auto_json = auto_json
-
-        # Auto-parse JSON if enabled
-        if auto_json and response is not None and hasattr(response, 'content') and response.content:
-            try:
-                self._json_data = response.json()
-            except (ValueError, json.JSONDecodeError):
-                # Not JSON content, ignore
-                pass
+        self._json_data = _UNSET
 
     @property
     def status_code(self) -> Optional[int]:
         """Get the HTTP status code of the response."""
-        return self.response.status_code if self.response and hasattr(self.response, 'status_code') else None
+        return self.response.status_code if self.response is not None and hasattr(self.response, 'status_code') else None
 
     @property
     def ok(self) -> bool:
         """Return True if status_code is less than 400, False otherwise."""
-        return bool(self.response and hasattr(self.response, 'ok') and self.response.ok)
+        return bool(self.response is not None and hasattr(self.response, 'ok') and self.response.ok)
 
     @property
     def content(self) -> Optional[bytes]:
         """Get the raw content of the response."""
-        return self.response.content if self.response and hasattr(self.response, 'content') else None
+        return self.response.content if self.response is not None and hasattr(self.response, 'content') else None
 
     @property
     def text(self) -> Optional[str]:
         """Get the text content of the response."""
-        return self.response.text if self.response and hasattr(self.response, 'text') else None
+        return self.response.text if self.response is not None and hasattr(self.response, 'text') else None
 
     @property
     def headers(self) -> Optional[Dict]:
         """Get the headers of the response."""
-        return self.response.headers if self.response and hasattr(self.response, 'headers') else None
+        return self.response.headers if self.response is not None and hasattr(self.response, 'headers') else None
 
     @property
     def url(self) -> Optional[str]:
         """Get the URL of the response."""
-        return self.response.url if self.response and hasattr(self.response, 'url') else None
+        return self.response.url if self.response is not None and hasattr(self.response, 'url') else None
 
     @property
     def elapsed(self) -> Optional[float]:
         """Get the elapsed time of the request in seconds."""
-        if not self.response or not hasattr(self.response, 'elapsed'):
+        if self.response is None or not hasattr(self.response, 'elapsed'):
             return None
         if hasattr(self.response.elapsed, 'total_seconds'):
             return self.response.elapsed.total_seconds()
@@ -73,7 +130,7 @@ class ResponseWrapper:
     @property
     def cookies(self) -> Optional[Dict]:
         """Get the cookies from the response."""
-        if not self.response or not hasattr(self.response, 'cookies'):
+        if self.response is None or not hasattr(self.response, 'cookies'):
             return None
         if hasattr(self.response.cookies, 'get_dict'):
             return self.response.cookies.get_dict()
@@ -82,62 +139,82 @@ class ResponseWrapper:
     def json(self) -> Optional[Any]:
         """
         Parse the response content as JSON.
-        If auto_json is enabled, returns cached result.
+        The body is parsed once on first access and the result (or the failure) is cached.
         """
-        if self._auto_json and self._json_data is not None:
+        if self._json_data is _INVALID:
+            return None
+        if self._json_data is not _UNSET:
             return self._json_data
 
-        if not self.response or not hasattr(self.response, 'content') or not self.response.content:
+        if self.response is None or not hasattr(self.response, 'content') or not self.response.content:
             return None
 
         try:
-            if not self._json_data:
-                self._json_data = self.response.json()
+            self._json_data = decode_response_json(self.response)
             return self._json_data
-        except (ValueError, json.JSONDecodeError):
+        except (ValueError, TypeError, json.JSONDecodeError):
+            self._json_data = _INVALID
             logger.warn("Response content is not valid JSON")
             return None
 
+    def iter_content(self, chunk_size: int = 65536) -> Iterator[bytes]:
+        """
+        Iterate over the body in chunks.
+
+        For requests sent with stream=True the body is read from the socket chunk by chunk
+        instead of being loaded into memory at once.
+
+        :param chunk_size: Number of bytes per chunk
+        :return: Iterator over byte chunks
+        """
+        if self.response is None or not hasattr(self.response, 'iter_content'):
+            return iter(())
+        return self.response.iter_content(chunk_size = chunk_size)
+
+    @property
+    def content_length(self) -> Optional[int]:
+        """Get the body size from the Content-Length header without reading the body."""
+        length = self.headers.get('Content-Length') if self.headers else None
+        try:
+            return int(length) if length is not None else None
+        except ValueError:
+            return None
+
     def get_json_value(self, key_path: str, default: Any = None) -> Any:
         """
-        Extract a value from the JSON response using a dot-notation path.
+        Extract a value from the JSON response using a JSON path.
 
-        :param key_path: Path to the value (e.g., "data.user.id")
-        :param default: Default value to return if path not found
-        :return: The extracted value or default
+        Plain dot-notation paths (e.g. "data.user.id" or "items.0.name") behave as before.
+        Wildcards, slices, filters and multi-select are also supported, see JsonPath.CompiledPath.
+        Paths are compiled once and cached.
+
+        :param key_path: Path to the value (e.g., "data.user.id" or "data.items[*].id")
+        :param default: Default value to return if a single-value path is not found
+        :return: The extracted value, a list of matches for wildcard/filter paths, or default
         """
-        if not self.response:
+        if self.response is None:
             return default
 
         json_data = self.json()
-        if not json_data:
+        if json_data is None:
             return default
 
-        keys = key_path.split('.')
-        current = json_data
+        return json_path.find(json_data, key_path, default)
 
-        try:
-            for key in keys:
-                if isinstance(current, list) and key.isdigit():
-                    # Handle array indices in the path
-                    index = int(key)
-                    if 0 <= index < len(current):
-                        current = current[index]
-                    else:
-                        return default
-                elif isinstance(current, dict):
-                    if key in current:
-                        current = current[key]
-                    else:
-                        return default
-                else:
-                    # Current is neither a list nor a dict
-                    return default
-
-            # Return the extracted value
-            return current
-        except (KeyError, IndexError, TypeError):
-            return default
+    def get_json_values(self, key_paths: Union[List[str], Dict[str, str]], default: Any = None) -> Dict[str, Any]:
+        """
+        Extract several values from the JSON response in a single pass over the document.
+
+        :param key_paths: List of paths, or a dictionary mapping result names to paths
+        :param default: Default value for single-value paths that are not found
+        :return: Dictionary mapping each name (or path) to its extracted value
+        """
+        names = key_paths if isinstance(key_paths, dict) else { path: path for path in key_paths }
+        json_data = self.json() if self.response is not None else None
+        if json_data is None:
+            return { name: default for name in names }
+
+        return json_path.extract_many(json_data, names, default)
 
     def __bool__(self) -> bool:
         """Make the wrapper evaluate to True if response exists and status is ok."""
@@ -145,7 +222,7 @@ class ResponseWrapper:
 
     def __str__(self) -> str:
         """String representation of the response wrapper."""
-        if not self.response:
+        if self.response is None:
             return "ResponseWrapper(No Response)"
 
         status = self.status_code if self.status_code is not None else "unknown"
@@ -0,0 +1,217 @@
+import time
+import random
+import threading
+from collections import deque
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Optional
+from robot.api.deco import library
+
+
+@library(doc_format = 'ROBOT', auto_keywords=True)
+class RetryPolicy:
+    """
+    Decides which failed attempts are retried and how long to wait before the next attempt.
+    """
+
+    DEFAULT_RETRY_STATUSES = (408, 425, 429, 500, 502, 503, 504)
+
+    def __init__(self, retry_statuses: Optional[ Iterable[ int ] ] = None, retry_on_no_response: bool = True,
+                 backoff: float = 2.0, max_delay: float = 30.0, jitter: float = 0.1,
+                 respect_retry_after: bool = True, max_retry_after: float = 60.0,
+                 retry_budget: Optional[ float ] = None):
+        """
+        Initialize the retry policy.
+
+        :param retry_statuses: Status codes worth retrying; anything else (e.g. 400, 404) fails immediately
+        :param retry_on_no_response: Retry when no response was received at all (connection errors, timeouts)
+        :param backoff: Multiplier applied to the delay after every attempt
+        :param max_delay: Upper bound for a single delay in seconds
+        :param jitter: Random +/- fraction applied to each delay
+        :param respect_retry_after: Use the Retry-After header when the server sends one
+        :param max_retry_after: Upper bound for a delay taken from Retry-After
+        :param retry_budget: Maximum total seconds a single call may spend waiting between retries
+        """
+        self.retry_statuses = set(retry_statuses if retry_statuses is not None else self.DEFAULT_RETRY_STATUSES)
+        self.retry_on_no_response = retry_on_no_response
+        self.backoff = backoff
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.respect_retry_after = respect_retry_after
+        self.max_retry_after = max_retry_after
+        self.retry_budget = retry_budget
+
+    def copy(self, **overrides) -> 'RetryPolicy':
+        """Return a copy of the policy with some settings replaced, ignoring overrides that are None."""
+        settings = {
+            "retry_statuses": self.retry_statuses,
+            "retry_on_no_response": self.retry_on_no_response,
+            "backoff": self.backoff,
+            "max_delay": self.max_delay,
+            "jitter": self.jitter,
+            "respect_retry_after": self.respect_retry_after,
+            "max_retry_after": self.max_retry_after,
+            "retry_budget": self.retry_budget
+        }
+        settings.update({ key: value for key, value in overrides.items() if value is not None })
+        return RetryPolicy(**settings)
+
+    def is_retryable(self, status_code: Optional[ int ]) -> bool:
+        """
+        Check whether an attempt that ended with this status is worth retrying.
+
+        :param status_code: Status of the attempt or None when no response was received
+        :return: True if the attempt should be retried
+        """
+        if status_code is None:
+            return self.retry_on_no_response
+        return status_code in self.retry_statuses
+
+    def get_delay(self, attempt: int, base_delay: float, headers: Optional[ Dict ] = None) -> float:
+        """
+        Calculate the delay before the next attempt.
+
+        :param attempt: Zero-based number of the attempt that just failed
+        :param base_delay: Delay before the first retry
+        :param headers: Headers of the failed response, used for Retry-After
+        :return: Delay in seconds
+        """
+        if self.respect_retry_after and headers:
+            retry_after = self.parse_retry_after(headers.get('Retry-After'))
+            if retry_after is not None:
+                return min(retry_after, self.max_retry_after)
+
+        delay = float(base_delay) * (float(self.backoff) ** attempt)
+        if self.jitter:
+            delay *= 1 + random.uniform(-self.jitter, self.jitter)
+        return max(min(delay, self.max_delay), 0.0)
+
+    @staticmethod
+    def parse_retry_after(value: Any) -> Optional[ float ]:
+        """
+        Parse a Retry-After header given either in seconds or as an HTTP date.
+
+        :param value: Header value
+        :return: Seconds to wait, or None if the value is missing or invalid
+        """
+        if value is None or value == "":
+            return None
+        try:
+            return max(float(value), 0.0)
+        except (TypeError, ValueError):
+            pass
+        try:
+            retry_at = parsedate_to_datetime(str(value))
+            if retry_at.tzinfo is None:
+                retry_at = retry_at.replace(tzinfo = timezone.utc)
+            return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+        except (TypeError, ValueError, IndexError):
+            return None
+
+    def to_dict(self) -> Dict:
+        """Return the policy settings as a dictionary."""
+        return {
+            "retry_statuses": sorted(self.retry_statuses),
+            "retry_on_no_response": self.retry_on_no_response,
+            "backoff": self.backoff,
+            "max_delay": self.max_delay,
+            "jitter": self.jitter,
+            "respect_retry_after": self.respect_retry_after,
+            "max_retry_after": self.max_retry_after,
+            "retry_budget": self.retry_budget
+        }
+
+
+@library(doc_format = 'ROBOT', auto_keywords=True)
+class CircuitBreaker:
+    """
+    Per-host circuit breaker.
+
+    After ``failure_threshold`` consecutive failures against a host the circuit opens and calls to
+    that host fail fast for ``reset_timeout`` seconds. Then one trial call is let through
+    (half-open); its outcome closes the circuit again or re-opens it.
+    """
+
+    def __init__(self, failure_threshold: int = 0, reset_timeout: float = 30.0):
+        """
+        Initialize the circuit breaker.
+
+        :param failure_threshold: Consecutive failures that open the circuit (0 disables the breaker)
+        :param reset_timeout: Seconds an open circuit waits before allowing a trial call
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._hosts = { }
+        self._lock = threading.Lock()
+
+    def allow(self, host: str) -> bool:
+        """
+        Check whether a call to the host may be made.
+
+        :param host: Host (netloc) of the call
+        :return: False while the circuit for the host is open
+        """
+        if not self.failure_threshold:
+            return True
+        with self._lock:
+            state = self._hosts.get(host)
+            if state is None or state[ "state" ] == "closed":
+                return True
+            if state[ "state" ] == "open" and time.monotonic() - state[ "opened_at" ] >= self.reset_timeout:
+                state[ "state" ] = "half_open"
+                return True
+            return False
+
+    def record_success(self, host: str) -> None:
+        """Record a successful call, closing the circuit for the host."""
+        if not self.failure_threshold:
+            return
+        with self._lock:
+            self._hosts[ host ] = { "state": "closed", "failures": 0, "opened_at": None }
+
+    def record_failure(self, host: str) -> bool:
+        """
+        Record a failed call.
+
+        :param host: Host (netloc) of the call
+        :return: True if this failure opened the circuit
+        """
+        if not self.failure_threshold:
+            return False
+        with self._lock:
+            state = self._hosts.setdefault(host, { "state": "closed", "failures": 0, "opened_at": None })
+            state[ "failures" ] += 1
+            if state[ "state" ] == "half_open" or (state[ "state" ] == "closed"
+                                                  and state[ "failures" ] >= self.failure_threshold):
+                state[ "state" ] = "open"
+                state[ "opened_at" ] = time.monotonic()
+                return True
+            return False
+
+    def reset(self) -> None:
+        """Close all circuits."""
+        with self._lock:
+            self._hosts.clear()
+
+    def get_states(self) -> Dict[ str, Dict ]:
+        """Return the circuit state and failure count per host."""
+        with self._lock:
+            return { host: { "state": state[ "state" ], "failures": state[ "failures" ] }
+                     for host, state in self._hosts.items() }
+
+
+# Shared by all library instances, so a policy set in a suite setup, the circuit of every host and the
+# recorded retry decisions survive the per-test library scope
+_retry_policy = { "policy": RetryPolicy() }
+circuit_breaker = CircuitBreaker()
+retry_events = deque(maxlen = 1000)
+
+
+def get_retry_policy() -> RetryPolicy:
+    """Return the retry policy used by every request of this process."""
+    return _retry_policy[ "policy" ]
+
+
+def set_retry_policy(policy: RetryPolicy) -> None:
+    """Use a retry policy for every request of this process."""
+    _retry_policy[ "policy" ] = policy
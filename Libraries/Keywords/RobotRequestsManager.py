@@ -1,3 +1,4 @@
+import time
 import uuid
 from typing import Dict, Any, Optional, Union, Callable, List, Tuple
 from robot.api.deco import keyword, library
@@ -9,6 +10,14 @@ from RequestSender import RequestSender
 from TokenManager import TokenManager
 from ResponseHandler import ResponseHandler
 from RequestUtils import RequestUtils
+from ResponseWrapper import set_json_backend
+from RequestMetrics import request_metrics, metrics_listener
+from LoadGenerator import LoadGenerator
+from Cassette import Cassette, get_active_cassette, set_active_cassette
+from HttpCache import HttpCache, get_http_cache, set_http_cache, get_http_cache_stats, format_http_cache_stats
+from SessionRegistry import SessionRegistry, get_session_registry, set_session_registry
+from SchemaValidator import schema_validator
+from RequestPipeline import set_pipeline_stages, get_pipeline_stages, get_pipeline_stats, clear_pipeline_stats
 
 
 @library(doc_format = 'ROBOT', auto_keywords=True)
@@ -20,10 +29,14 @@ class RobotRequestsManager:
     - Session management (creation, deletion, updates)
     - Automatic retry for failed requests
     - Session expiry detection & auto-renewal
+    - Tokens shared between parallel (pabot) workers, so shared test users log in once
     - Global timeout for requests
     - Logging API requests & responses
     - JSON Schema validation for responses
     - Enhanced response objects with easy access to common attributes
+    - Latency metrics per endpoint and session, reported at suite end
+    - Request pipeline with stages that can be reordered or switched off per session
+    - Load generation replaying a request at a target rate or concurrency
     """
 
     def __init__(self, auto_json: bool = True, auto_log: bool = True, detailed_response: bool = True,
@@ -31,7 +44,7 @@ class RobotRequestsManager:
         """
         Initialize RequestsLibrary instance and session tracking.
 
-        :param auto_json: Automatically parse JSON responses
+        :param auto_json: Kept for compatibility; JSON is always parsed on first use and then cached
         :param auto_log: Automatically log requests and responses
         :param detailed_response: Return detailed ResponseWrapper objects instead of raw responses
         :param return_json: When True, returns JSON for JSON responses (overrides detailed_response for JSON)
@@ -44,6 +57,11 @@ class RobotRequestsManager:
         self.request_sender = RequestSender(self.session_manager, self.token_manager,
                                             self.response_handler, auto_log)
         self.utils = RequestUtils()
+        self.load_generator = LoadGenerator(self.request_sender)
+        # Reports request latency when a suite ends
+        self.ROBOT_LIBRARY_LISTENER = metrics_listener
+        if format_http_cache_stats not in metrics_listener.summary_providers:
+            metrics_listener.summary_providers.append(format_http_cache_stats)
 
         # Configuration options
         self.auto_json = auto_json
@@ -57,7 +75,7 @@ class RobotRequestsManager:
         """
         Configure how responses are handled and returned.
 
-        :param auto_json: Automatically parse JSON responses
+        :param auto_json: Kept for compatibility; JSON is always parsed on first use and then cached
         :param auto_log: Automatically log requests and responses
         :param detailed_response: Return detailed ResponseWrapper objects instead of raw responses
         :param return_json: When True, returns JSON for JSON responses (overrides detailed_response for JSON)
@@ -79,10 +97,28 @@ class RobotRequestsManager:
                     f"auto_log={self.auto_log}, detailed_response={self.detailed_response}, "
                     f"return_json={self.return_json}")
 
+    @keyword("Set JSON Decoder Backend")
+    def set_json_decoder_backend(self, backend = "json"):
+        """
+        Selects the decoder used for JSON response bodies: json, orjson or ujson.
+
+        orjson and ujson are optional packages; the standard json module is used when they are missing.
+        """
+        backend = set_json_backend(backend)
+        logger.info(f"JSON decoder backend set to: {backend}")
+        return backend
+
     # Session Management Methods
     @keyword("Create API Session")
     def create_session(self, alias, url, headers = None, **kwargs):
-        """Creates a new API session and stores it for tracking."""
+        """
+        Creates a new API session and stores it for tracking.
+
+        Besides the RequestsLibrary session options, the connection pool can be sized:
+        ``pool_connections`` (hosts), ``pool_maxsize`` (connections per host, size it to the concurrency
+        used with `Send Batch Requests`), ``pool_block``, ``tcp_keepalive`` with ``keepalive_idle``,
+        ``keepalive_interval`` and ``keepalive_count``. `Get Session Connection Stats` reports pool usage.
+        """
         return self.session_manager.create_session(alias, url, headers, **kwargs)
 
     @keyword("Create Random API Session")
@@ -93,11 +129,16 @@ class RobotRequestsManager:
     @keyword("Delete API Session")
     def delete_session(self, alias):
         """Deletes a specific API session."""
+        self.request_sender.close_transport_session(alias)
+        set_http_cache(alias, None)
         return self.session_manager.delete_session(alias)
 
     @keyword("Delete All API Sessions")
     def delete_all_sessions(self):
         """Deletes all stored API sessions."""
+        self.request_sender.close_transport_session()
+        for alias in list(get_http_cache_stats()):
+            set_http_cache(alias, None)
         return self.session_manager.delete_all_sessions()
 
     @keyword("Update Session Headers")
@@ -110,6 +151,11 @@ class RobotRequestsManager:
         """Retrieves the full details of a session."""
         return self.session_manager.get_session_details(alias)
 
+    @keyword("Get Session Connection Stats")
+    def get_session_connection_stats(self, alias):
+        """Reports pooled connection reuse and header update counters for a session."""
+        return self.session_manager.get_connection_stats(alias)
+
     # Request Sending Methods - Unified under send_api_request
     @keyword("Send API Request")
     def send_api_request(self, method = None, alias = None, endpoint = None, url = None, **kwargs):
@@ -121,26 +167,213 @@ class RobotRequestsManager:
         :param endpoint: API endpoint (relative to base URL)
         :param url: Full URL for the request (when not using session)
         :param kwargs: Additional request parameters including:
-            - max_retries: Maximum number of retries
-            - delay: Time between retries
+            - max_retries: Maximum number of attempts
+            - delay: Delay before the first retry; later delays follow the retry policy backoff
+            - retry_on_status: Status codes worth retrying for this call (overrides `Set Retry Policy`)
+            - retry_budget: Maximum total seconds this call may spend waiting between retries
             - token: Authentication token
             - token_type: Type of token (default: Bearer)
             - token_check_on_failure: Whether to check/refresh token on failure
-            - custom_headers: Headers for this request only
+            - custom_headers: Headers layered over the session headers for this request only
+              (a header set to None is left out of the request)
             - random_session: Create a random session if alias not provided
             - expected_status: Expected HTTP status code(s)
+            - stream: Leave the body unread so it can be consumed in chunks with iter_content
         """
         return self.request_sender.send_request(method, alias, endpoint, url, **kwargs)
 
     @keyword("Send Batch Requests")
-    def send_batch_requests(self, requests_list, **kwargs):
+    def send_batch_requests(self, requests_list, max_workers: int = 1, per_host_limit: int = None, **kwargs):
         """
-        Sends multiple API requests.
+        Sends multiple API requests, optionally in parallel.
+
+        Responses are returned in the same order as ``requests_list``. Each item keeps its own
+        retry, expected_status and token refresh handling.
 
         :param requests_list: List of request dictionaries
+        :param max_workers: Number of requests sent concurrently (default 1, sequential)
+        :param per_host_limit: Maximum concurrent requests per host (optional)
         :param kwargs: Common parameters for all requests
         """
-        return self.request_sender.send_batch_requests(requests_list, **kwargs)
+        return self.request_sender.send_batch_requests(requests_list, max_workers = max_workers,
+                                                       per_host_limit = per_host_limit, **kwargs)
+
+    @keyword("Run API Load")
+    def run_api_load(self, method = None, alias = None, endpoint = None, url = None, duration: float = 10,
+                     rate: float = None, concurrency: int = 10, max_requests: int = None, **kwargs):
+        """
+        Replays a `Send API Request` definition for ``duration`` seconds and returns a load report.
+
+        Without ``rate`` the ``concurrency`` workers send requests back to back; with ``rate`` requests
+        start at that many per second, at most ``concurrency`` at a time, and latency is measured from
+        the scheduled start. Sessions, token handling, retries and expected_status work as for single
+        requests; responses are not logged during the run. Size the session pool (``pool_maxsize`` of
+        `Create API Session`) to the concurrency.
+
+        The report holds requests, errors, error_rate, throughput (req/s), latency_ms (min, mean, p50,
+        p90, p95, p99, max), a latency histogram, status_codes, a per second timeline and, with a rate,
+        max_schedule_lag_ms (how far request starts fell behind the schedule).
+
+        :param method: HTTP method
+        :param alias: The session alias
+        :param endpoint: API endpoint (relative to base URL)
+        :param url: Full URL for the request (when not using session)
+        :param duration: Seconds to generate load for
+        :param rate: Requests started per second (optional)
+        :param concurrency: Maximum number of requests in flight
+        :param max_requests: Stop after this many requests (optional)
+        :param kwargs: Request parameters as for `Send API Request`
+        """
+        return self.load_generator.run(method, alias, endpoint, url, duration = duration, rate = rate,
+                                       concurrency = concurrency, max_requests = max_requests, **kwargs)
+
+    @keyword("API Load Should Meet")
+    def api_load_should_meet(self, report = None, max_p95_ms: float = None, max_p99_ms: float = None,
+                             max_error_rate: float = None, min_throughput: float = None):
+        """
+        Fails when a load report exceeds any of the given limits.
+
+        :param report: Report returned by `Run API Load` (default: the last run in this test)
+        :param max_p95_ms: Highest acceptable p95 latency in milliseconds
+        :param max_p99_ms: Highest acceptable p99 latency in milliseconds
+        :param max_error_rate: Highest acceptable share of failed requests, e.g. 0.01
+        :param min_throughput: Lowest acceptable throughput in requests per second
+        """
+        violations = self.load_generator.check_thresholds(report, max_p95_ms, max_p99_ms, max_error_rate,
+                                                          min_throughput)
+        if violations:
+            raise AssertionError("API load limits exceeded:\n" + "\n".join(f"  - {v}" for v in violations))
+
+    @keyword("Download API File")
+    def download_api_file(self, alias = None, endpoint = None, url = None, path = None, expected_hash = None,
+                          hash_algorithm = "sha256", chunk_size: int = 65536, progress_callback = None,
+                          progress_interval: float = 1.0, **kwargs):
+        """
+        Downloads a response body to a file chunk by chunk, computing its hash on the way.
+
+        The body is written to ``<path>.part`` and renamed when complete. Relative paths are resolved
+        against ${DOWNLOADS_DIRECTORY_PATH}; when ``path`` is empty or a directory, the file name comes
+        from Content-Disposition or the URL. Fails on a status >= 400 or a hash mismatch.
+
+        :param alias: The session alias (optional)
+        :param endpoint: API endpoint (relative to base URL)
+        :param url: Full URL for the request (when not using session)
+        :param path: Destination file or directory
+        :param expected_hash: Expected hex digest of the file
+        :param hash_algorithm: hashlib algorithm (sha256, md5, ...); ${NONE} skips hashing
+        :param chunk_size: Bytes written per chunk
+        :param progress_callback: Keyword called with downloaded bytes and total bytes (total may be None)
+        :param progress_interval: Minimum seconds between progress calls; a final call is always made
+        :param kwargs: Additional request parameters, as for `Send API Request` (method defaults to GET)
+        :return: Dictionary with path, size, hash, algorithm, elapsed, status_code and content_type
+        """
+        return self.request_sender.download_file(alias, endpoint, url, path, expected_hash = expected_hash,
+                                                 hash_algorithm = hash_algorithm, chunk_size = chunk_size,
+                                                 progress_callback = progress_callback,
+                                                 progress_interval = progress_interval, **kwargs)
+
+    @keyword("Upload API File")
+    def upload_api_file(self, alias = None, endpoint = None, url = None, file = None, field_name = "file",
+                        fields = None, filename = None, content_type = None, chunk_size: int = 65536,
+                        progress_callback = None, progress_interval: float = 1.0, **kwargs):
+        """
+        Uploads a file as multipart/form-data, streamed from disk with a Content-Length.
+
+        Relative paths are resolved against ${UPLOADS_DIRECTORY_PATH}. Retries re-read the file
+        from the start.
+
+        :param alias: The session alias (optional)
+        :param endpoint: API endpoint (relative to base URL)
+        :param url: Full URL for the request (when not using session)
+        :param file: Path of the file to upload
+        :param field_name: Form field name of the file
+        :param fields: Dictionary of additional form fields
+        :param filename: File name sent to the server (default: base name of the file)
+        :param content_type: Content type of the file part (default: guessed from the file name)
+        :param chunk_size: Bytes read per chunk
+        :param progress_callback: Keyword called with uploaded bytes and total bytes
+        :param progress_interval: Minimum seconds between progress calls; a final call is always made
+        :param kwargs: Additional request parameters, as for `Send API Request` (method defaults to POST)
+        :return: Response object or None if failed
+        """
+        return self.request_sender.upload_file(alias, endpoint, url, file, field_name = field_name, fields = fields,
+                                               filename = filename, content_type = content_type,
+                                               chunk_size = chunk_size, progress_callback = progress_callback,
+                                               progress_interval = progress_interval, **kwargs)
+
+    @keyword("Set HTTP Transport")
+    def set_http_transport(self, transport = "requests", http2: bool = True, max_connections: int = 100):
+        """
+        Selects the HTTP transport behind all request keywords; keywords and arguments stay the same.
+
+        - requests (default): blocking requests through RequestsLibrary.
+        - httpx: requests run on one event loop managed by the library, with HTTP/2 multiplexing
+          where the server supports it. `Send Batch Requests` with max_workers > 1 and the wait keywords
+          then share the same connections. Needs the optional httpx package (and h2 for HTTP/2).
+
+        Session headers, cookies, auth tuples and TLS settings are taken from the API session.
+        Streamed requests always use requests.
+
+        The transport applies to every later test of the run (per process, so per pabot worker), like
+        `Set Retry Policy`; select it once in a suite setup. Its connections are closed when another
+        transport is selected, when the session is deleted and when the run ends.
+
+        :param transport: requests or httpx
+        :param http2: Negotiate HTTP/2 with the httpx transport
+        :param max_connections: Maximum open connections per session with the httpx transport
+        :return: Name of the transport in use
+        """
+        transport = self.request_sender.set_transport(transport, http2, max_connections)
+        logger.info(f"HTTP transport: {transport}")
+        return transport
+
+    @keyword("Start HTTP Cassette")
+    def start_http_cassette(self, path, mode = "auto", match_on = "method,url,body", redact_headers = None,
+                            allow_repeats: bool = True):
+        """
+        Records requests to, or replays them from, a cassette file (JSON Lines).
+
+        - record: send every request and write it to a fresh cassette
+        - replay: answer requests from the cassette only, without touching the network;
+          a request without a recorded match raises CassetteMiss and fails the keyword, without retries
+        - auto: replay requests that have a match, send and record the rest
+
+        Applies to `Send API Request` and every keyword built on it until `Stop HTTP Cassette`.
+
+        :param path: Cassette file
+        :param mode: record, replay or auto
+        :param match_on: Comma separated request fields that must match: method, url (with sorted query),
+                         url_template (ids replaced by {id}), path, query, body (hash of the body)
+        :param redact_headers: Comma separated headers whose values are not written to the cassette
+                               (default Authorization, Cookie, Set-Cookie, RefreshToken, Proxy-Authorization)
+        :param allow_repeats: Keep serving the last match once all recorded matches were played
+        """
+        if isinstance(match_on, str):
+            match_on = match_on.split(',')
+        if isinstance(redact_headers, str):
+            redact_headers = [ name.strip() for name in redact_headers.split(',') if name.strip() ]
+        cassette = Cassette(path, mode, match_on, redact_headers, allow_repeats)
+        set_active_cassette(cassette)
+        logger.info(f"HTTP cassette started: {cassette.get_stats()}")
+
+    @keyword("Stop HTTP Cassette")
+    def stop_http_cassette(self):
+        """Stops recording or replaying and returns the cassette statistics."""
+        cassette = get_active_cassette()
+        if cassette is None:
+            logger.info("No HTTP cassette is active")
+            return None
+        stats = cassette.get_stats()
+        set_active_cassette(None)
+        cassette.close()
+        logger.info(f"HTTP cassette stopped: {stats}")
+        return stats
+
+    @keyword("Get HTTP Cassette Stats")
+    def get_http_cassette_stats(self):
+        """Returns path, mode and the recorded, replayed and missed counters of the active cassette."""
+        cassette = get_active_cassette()
+        return cassette.get_stats() if cassette is not None else None
 
     @keyword("Set Global API Timeout")
     def set_global_timeout(self, timeout_seconds):
@@ -148,6 +381,64 @@ class RobotRequestsManager:
         self.request_sender.global_timeout = timeout_seconds
         logger.info(f"Global timeout set to {timeout_seconds} seconds")
 
+    @keyword("Set Retry Policy")
+    def set_retry_policy(self, retry_statuses = None, retry_on_no_response: bool = None, backoff: float = None,
+                         max_delay: float = None, jitter: float = None, respect_retry_after: bool = None,
+                         max_retry_after: float = None, retry_budget: float = None,
+                         circuit_failure_threshold: int = None, circuit_reset_timeout: float = None):
+        """
+        Configure how `Send API Request` retries failed attempts (when max_retries > 1).
+
+        :param retry_statuses: Status codes worth retrying, e.g. "429,502,503" (default 408,425,429,500,502,503,504).
+                               Other statuses such as 400 or 404 fail without further attempts.
+        :param retry_on_no_response: Retry connection errors and timeouts (default True)
+        :param backoff: Multiplier applied to ``delay`` after every attempt (default 2)
+        :param max_delay: Upper bound for one delay in seconds (default 30)
+        :param jitter: Random +/- fraction applied to each delay (default 0.1)
+        :param respect_retry_after: Wait as long as the Retry-After header asks (default True)
+        :param max_retry_after: Upper bound for a Retry-After delay (default 60)
+        :param retry_budget: Maximum total seconds one call may wait between retries (default unlimited)
+        :param circuit_failure_threshold: Consecutive failures per host that open its circuit (0 disables, default)
+        :param circuit_reset_timeout: Seconds an open circuit fails fast before a trial call (default 30)
+
+        The policy, the circuit of every host and the recorded retry events are shared by all tests of
+        the run (per process, so per pabot worker), so settings made in a suite setup apply to every
+        later test until they are changed again.
+        """
+        self.request_sender.retry_policy = self.request_sender.retry_policy.copy(
+            retry_statuses = self.utils.normalize_status_list(retry_statuses) if retry_statuses is not None else None,
+            retry_on_no_response = retry_on_no_response, backoff = backoff, max_delay = max_delay, jitter = jitter,
+            respect_retry_after = respect_retry_after, max_retry_after = max_retry_after,
+            retry_budget = retry_budget)
+        if circuit_failure_threshold is not None:
+            self.request_sender.circuit_breaker.failure_threshold = circuit_failure_threshold
+        if circuit_reset_timeout is not None:
+            self.request_sender.circuit_breaker.reset_timeout = circuit_reset_timeout
+        logger.info(f"Retry policy: {self.request_sender.retry_policy.to_dict()}, "
+                    f"circuit_failure_threshold={self.request_sender.circuit_breaker.failure_threshold}, "
+                    f"circuit_reset_timeout={self.request_sender.circuit_breaker.reset_timeout}")
+
+    @keyword("Get Retry Events")
+    def get_retry_events(self, clear: bool = False):
+        """
+        Returns the recorded retry decisions as a list of dictionaries with time, action
+        (retry, give_up or circuit_open), method, url, host, attempt, status_code, delay and reason.
+        """
+        events = list(self.request_sender.retry_events)
+        if clear:
+            self.request_sender.retry_events.clear()
+        return events
+
+    @keyword("Get Circuit Breaker States")
+    def get_circuit_breaker_states(self):
+        """Returns the circuit state (closed, open or half_open) and failure count per host."""
+        return self.request_sender.circuit_breaker.get_states()
+
+    @keyword("Reset Circuit Breakers")
+    def reset_circuit_breakers(self):
+        """Closes all open circuits."""
+        self.request_sender.circuit_breaker.reset()
+
     # Token Management Methods
     @keyword("Check Token Expiration")
     def check_token_expiration(self, alias):
@@ -187,12 +478,148 @@ class RobotRequestsManager:
         self.token_manager.token_endpoint = endpoint
         logger.info(f"Token endpoint set to: {endpoint}")
 
+    @keyword("Set Token Cache Options")
+    def set_token_cache_options(self, refresh_margin: float = None, validation_ttl: float = None):
+        """
+        Configure token validity caching.
+
+        :param refresh_margin: Seconds before ``auth_expires_at`` at which a token is refreshed proactively
+        :param validation_ttl: Seconds a successful token check is trusted when no expiry is known
+        """
+        if refresh_margin is not None:
+            self.token_manager.refresh_margin = refresh_margin
+        if validation_ttl is not None:
+            self.token_manager.validation_ttl = validation_ttl
+        logger.info(f"Token cache options: refresh_margin={self.token_manager.refresh_margin}, "
+                    f"validation_ttl={self.token_manager.validation_ttl}")
+
+    @keyword("Clear Token Cache")
+    def clear_token_cache(self):
+        """Forget all cached token validity and refresh results; the cache is shared by all tests of the run."""
+        self.token_manager.clear_cache()
+
+    @keyword("Get Token Cache Stats")
+    def get_token_cache_stats(self):
+        """Returns token endpoint calls, cache hits and deduplicated concurrent calls since the run started."""
+        return dict(self.token_manager.stats)
+
+    @keyword("Enable Shared Session Registry")
+    def enable_shared_session_registry(self, path = None, refresh_margin: float = 30, lock_timeout: float = 60):
+        """
+        Shares tokens between all processes of a run, e.g. pabot workers, through a file-locked JSON file.
+
+        Besides `Get Shared Token` and `Create API Session With Shared Token`, token checks and refreshes
+        of every session are then shared, so a token refreshed by one worker is reused by the others.
+        The shared-token keywords use the default path without this keyword.
+
+        :param path: Registry file; every worker must use the same one (default:
+                     a directory of the run in the system temp directory, shared by the workers
+                     of a pabot run and removed after the run)
+        :param refresh_margin: Seconds before expiry at which a shared token is no longer reused
+        :param lock_timeout: Seconds to wait for a worker that is logging in
+        :return: Path of the registry file
+        """
+        registry = SessionRegistry(path, refresh_margin, lock_timeout)
+        set_session_registry(registry)
+        logger.info(f"Shared session registry: {registry.path}")
+        return registry.path
+
+    @keyword("Disable Shared Session Registry")
+    def disable_shared_session_registry(self):
+        """Stops sharing token checks and refreshes with other workers; stored tokens are kept."""
+        set_session_registry(None)
+
+    @keyword("Get Shared Token")
+    def get_shared_token(self, key, login_keyword, *login_args, ttl: float = 900):
+        """
+        Returns the token stored under ``key``, running ``login_keyword`` only when no valid token exists.
+
+        Across all workers only one runs the login for a key at a time; the others wait and reuse its
+        token. The login keyword returns the token, or a dictionary with the token (auth_token,
+        access_token or token) and optionally its expiry (auth_expires_at or expires_at as timestamp or
+        ISO 8601, or expires_in seconds).
+
+        :param key: Identifies the token; must include the environment as well as the user, e.g. ``staging:admin``
+        :param login_keyword: Keyword that logs in
+        :param login_args: Arguments of the login keyword
+        :param ttl: Seconds a token without an expiry is reused
+        :return: The token
+        """
+        return self._get_shared_token(key, login_keyword, login_args, ttl)
+
+    @keyword("Create API Session With Shared Token")
+    def create_session_with_shared_token(self, alias, url, key, login_keyword, *login_args, token_type = "Bearer",
+                                         ttl: float = 900, headers = None, **kwargs):
+        """
+        Creates an API session authorized with the token shared under ``key`` (see `Get Shared Token`).
+
+        :param alias: The session alias
+        :param url: The base URL for the session
+        :param key: Identifies the token; must include the environment as well as the user, e.g. ``staging:admin``
+        :param login_keyword: Keyword that logs in when no valid token is shared
+        :param login_args: Arguments of the login keyword
+        :param token_type: Authorization scheme
+        :param ttl: Seconds a token without an expiry is reused
+        :param headers: Additional session headers
+        :param kwargs: Additional parameters, as for `Create API Session`
+        """
+        token = self._get_shared_token(key, login_keyword, login_args, ttl)
+        headers = dict(headers or { })
+        headers[ "Authorization" ] = f"{token_type} {token}"
+        return self.session_manager.create_session(alias, url, headers = headers, **kwargs)
+
+    @keyword("Invalidate Shared Token")
+    def invalidate_shared_token(self, key):
+        """Removes a shared token, e.g. after it was revoked, so the next `Get Shared Token` logs in again."""
+        get_session_registry().invalidate(key)
+
+    @keyword("Get Shared Session Registry Stats")
+    def get_shared_session_registry_stats(self):
+        """Returns the registry path, valid entries, and the hits, waits and logins of this worker."""
+        return get_session_registry().get_stats()
+
+    def _get_shared_token(self, key: str, login_keyword: str, login_args: Tuple, ttl: float) -> str:
+        """Get a token from the shared registry, logging in with a keyword when needed."""
+        def login():
+            result = BuiltIn().run_keyword(login_keyword, *login_args)
+            if isinstance(result, dict):
+                token = result.get('auth_token') or result.get('access_token') or result.get('token')
+                expires_at = self.token_manager.parse_expiry(result.get('auth_expires_at', result.get('expires_at')))
+                if expires_at is None and result.get('expires_in') is not None:
+                    expires_at = time.time() + float(result[ 'expires_in' ])
+            else:
+                token, expires_at = result, None
+            if not token:
+                raise AssertionError(f"Login keyword '{login_keyword}' returned no token")
+            return { "token": str(token) }, expires_at
+
+        entry = get_session_registry().get_or_create(key, login, ttl = ttl)
+        token = entry[ "value" ][ "token" ]
+        self.token_manager.remember_token(token, entry[ "expires_at" ])
+        return token
+
     # Response Handling Methods
     @keyword("Extract JSON From Response")
     def extract_json_from_response(self, response, json_path = None, default = None):
-        """Extract JSON data or a specific value from a response."""
+        """
+        Extract JSON data or a specific value from a response.
+
+        ``json_path`` supports dot notation (``data.items.0.id``), ``[*]`` wildcards, slices,
+        ``[?(@.field == 'x')]`` filters and ``{a, b}`` multi-select. Compiled paths are cached.
+        """
         return self.response_handler.extract_json(response, json_path, default)
 
+    @keyword("Extract JSON Values From Response")
+    def extract_json_values_from_response(self, response, json_paths, default = None):
+        """
+        Extract several JSON paths from a response in one pass over the document.
+
+        ``json_paths`` is a list of paths or a dictionary mapping result names to paths.
+        Paths support dot notation, ``[*]`` wildcards, slices, ``[?(@.field == 'x')]`` filters
+        and ``{a, b}`` multi-select. Returns a dictionary of extracted values.
+        """
+        return self.response_handler.extract_json_values(response, json_paths, default)
+
     @keyword("Get Response Status Code")
     def get_response_status_code(self, response):
         """Get the status code from a response object."""
@@ -228,10 +655,215 @@ class RobotRequestsManager:
         """Get the elapsed time of a request in seconds."""
         return self.response_handler.get_elapsed_time(response)
 
+    @keyword("Set API Metrics Options")
+    def set_api_metrics_options(self, enabled: bool = None, report_on_suite_end: bool = None, export_path = None):
+        """
+        Configure the latency metrics recorded for every request.
+
+        :param enabled: Record metrics for each request (default True)
+        :param report_on_suite_end: Print the p50/p95/p99 latency per endpoint to the console when a suite ends
+        :param export_path: File (.csv or .json) the cumulative report is written to when a suite ends
+                            (empty string to stop exporting)
+        """
+        if enabled is not None:
+            request_metrics.enabled = enabled
+        if report_on_suite_end is not None:
+            metrics_listener.report_on_suite_end = report_on_suite_end
+        if export_path is not None:
+            metrics_listener.export_path = export_path or None
+        logger.info(f"API metrics options: enabled={request_metrics.enabled}, "
+                    f"report_on_suite_end={metrics_listener.report_on_suite_end}, "
+                    f"export_path={metrics_listener.export_path}")
+
+    @keyword("Get API Latency Report")
+    def get_api_latency_report(self, group_by = "endpoint"):
+        """
+        Returns latency statistics per endpoint template (e.g. "GET /users/{id}") or per session alias.
+
+        Every row holds count, errors, retries, new_connections, total and time-to-first-byte
+        p50/p95/p99, average DNS/connect/TLS time, framework overhead p50/p95 (all in ms)
+        and the request/response bytes.
+
+        :param group_by: endpoint or alias
+        """
+        report = request_metrics.get_report(group_by)
+        logger.info(request_metrics.format_report(report))
+        return report
+
+    @keyword("Export API Latency Report")
+    def export_api_latency_report(self, path, include_samples: bool = False):
+        """
+        Writes the latency report per endpoint and per alias to a .csv or .json file.
+
+        :param path: Output file; the extension selects the format
+        :param include_samples: Also write every recorded request (JSON only)
+        """
+        path = request_metrics.export(path, include_samples)
+        logger.info(f"API latency report written to {path}")
+        return path
+
+    @keyword("Clear API Metrics")
+    def clear_api_metrics(self):
+        """Drops all recorded latency samples and request pipeline stage timings."""
+        request_metrics.clear()
+        clear_pipeline_stats()
+
+    @keyword("Set Request Pipeline")
+    def set_request_pipeline(self, stages = None, alias = None):
+        """
+        Selects the stages every request passes through, outermost first, for one session or for all.
+
+        Built-in stages (default order): metrics, auth, retry, logging, cache, cassette. The transport
+        always runs last. Leaving a stage out switches its feature off without changing any call, e.g.
+        ``metrics,retry,cassette`` skips token checks, logging and the response cache. Stages registered
+        with ``RequestPipeline.register_middleware`` can be listed by name.
+
+        :param stages: Comma separated stage names or a list; empty restores the default pipeline
+        :param alias: Session alias the pipeline applies to; without it, the pipeline of every session
+                      that has no pipeline of its own
+        :return: The stages now used for the alias
+        """
+        stages = set_pipeline_stages(stages or None, alias)
+        logger.info(f"Request pipeline{f' for {alias}' if alias else ''}: {' -> '.join(stages + [ 'transport' ])}")
+        return stages
+
+    @keyword("Get Request Pipeline")
+    def get_request_pipeline(self, alias = None):
+        """Returns the stages requests of a session (or without a session) pass through, outermost first."""
+        return get_pipeline_stages(alias)
+
+    @keyword("Get Request Pipeline Stats")
+    def get_request_pipeline_stats(self):
+        """
+        Returns the time spent in each pipeline stage itself, excluding the stages it calls.
+
+        Per stage: count (requests), total_ms, and mean_ms and max_ms per request. The retry stage includes
+        the waits between attempts and the transport stage the network time.
+        """
+        stats = get_pipeline_stats()
+        logger.info("\n".join(f"{stage}: {values}" for stage, values in stats.items()))
+        return stats
+
+    @keyword("Enable HTTP Cache")
+    def enable_http_cache(self, alias, ttl_overrides = None, max_entries: int = 512, max_bytes: int = 32 * 1024 * 1024,
+                          persist_dir = None):
+        """
+        Caches the GET and HEAD responses of a session, for reference data that is fetched in many tests.
+
+        Freshness follows Cache-Control and Expires; stale responses with an ETag or Last-Modified are
+        revalidated with a conditional request. POST, PUT, PATCH and DELETE to a URL drop its cached
+        responses once they succeed. Responses are cached per Authorization header. Requests carrying their own conditional
+        or ``Cache-Control: no-cache`` headers, requests sent with ``use_cache=${False}`` and the wait
+        keywords always reach the server. Hit and miss counters are printed with the suite latency report.
+
+        :param alias: The session alias
+        :param ttl_overrides: Dictionary of endpoint glob pattern to seconds fresh, e.g. {"/lookups/*": 3600};
+                              takes precedence over the response headers
+        :param max_entries: Maximum number of cached responses kept in memory
+        :param max_bytes: Maximum total size of the cached bodies kept in memory
+        :param persist_dir: Directory the cache is also stored in, to share it with other test processes
+        """
+        if not self.session_manager.session_exists(alias):
+            logger.warn(f"Session '{alias}' not found!")
+            return
+        set_http_cache(alias, HttpCache(max_entries, max_bytes, ttl_overrides, persist_dir))
+        logger.info(f"HTTP cache enabled for session '{alias}' (max_entries={max_entries}, max_bytes={max_bytes}, "
+                    f"ttl_overrides={ttl_overrides}, persist_dir={persist_dir})")
+
+    @keyword("Disable HTTP Cache")
+    def disable_http_cache(self, alias):
+        """Stops caching the responses of a session and drops its cached responses."""
+        set_http_cache(alias, None)
+
+    @keyword("Clear HTTP Cache")
+    def clear_http_cache(self, alias, include_disk: bool = False):
+        """Drops the cached responses of a session, optionally also from its persist directory."""
+        cache = get_http_cache(alias)
+        if cache is not None:
+            cache.clear(include_disk)
+
+    @keyword("Get HTTP Cache Stats")
+    def get_http_cache_stats(self, alias = None):
+        """
+        Returns the hits, revalidated, misses, stores, evictions, bypassed, invalidations, disk_hits,
+        entries and bytes counters of a session's cache, or of all caches by alias when no alias is given.
+        """
+        if alias is None:
+            return get_http_cache_stats()
+        cache = get_http_cache(alias)
+        return cache.get_stats() if cache is not None else None
+
+    @keyword("Set Response Cache Limits")
+    def set_response_cache_limits(self, max_entries: int = None, max_bytes: int = None):
+        """Sets how many original responses (and how many body bytes) are kept for lookups."""
+        self.response_handler.response_store.configure(max_entries, max_bytes)
+        logger.info(f"Response cache limits set: {self.response_handler.response_store.stats()}")
+
+    @keyword("Get Response Cache Stats")
+    def get_response_cache_stats(self):
+        """Returns size, limits and hit/miss/eviction counters of the response cache."""
+        return self.response_handler.response_store.stats()
+
+    @keyword("Clear Response Cache")
+    def clear_response_cache(self):
+        """Drops all cached original responses."""
+        self.response_handler.response_store.clear()
+
     @keyword("Validate API Response")
-    def validate_response(self, response, schema):
-        """Validates API response against a JSON schema."""
-        return self.response_handler.validate_response(response, schema)
+    def validate_response(self, response, schema, max_errors: int = 50, sample_size: int = None):
+        """
+        Validates API response against a JSON schema and returns True or False; all errors are logged.
+
+        :param response: Response returned by the request keywords
+        :param schema: Schema as a dictionary, JSON string or file path
+        :param max_errors: Stop after this many errors (0 for no limit)
+        :param sample_size: For arrays of 1000 items or more, validate only this many evenly spread items
+        """
+        return self.response_handler.validate_response(response, schema, max_errors, sample_size)
+
+    @keyword("Response Should Match Schema")
+    def response_should_match_schema(self, response, schema, max_errors: int = 50, sample_size: int = None):
+        """
+        Fails with one report listing every schema error of the response (up to ``max_errors``).
+
+        Compiled schemas are cached per file (and modification time) or content, so checking
+        every response against the same contract costs only the validation itself. References to other
+        schema files are resolved relative to the schema file.
+
+        :param response: Response returned by the request keywords
+        :param schema: Schema as a dictionary, JSON string or file path
+        :param max_errors: Stop after this many errors (0 for no limit)
+        :param sample_size: For arrays of 1000 items or more, validate only this many evenly spread items
+        :return: Report with valid, error_count, errors (path, message, validator, schema_path),
+                 truncated, items_checked and elapsed_ms
+        """
+        report = self.response_handler.validate_response_schema(response, schema, max_errors, sample_size)
+        if not report[ "valid" ]:
+            raise AssertionError(schema_validator.format_report(report))
+        logger.info(schema_validator.format_report(report))
+        return report
+
+    @keyword("Get Schema Validation Stats")
+    def get_schema_validation_stats(self):
+        """Returns compiled and cached schemas, cache hits, validations and failures."""
+        return schema_validator.get_stats()
+
+    @keyword("Set API Logging Options")
+    def set_api_logging_options(self, max_body_bytes: int = None, pretty_json: bool = None, body_dir: str = None):
+        """
+        Configure how request/response bodies are logged by auto_log and `Log API Request`.
+
+        :param max_body_bytes: Maximum body bytes written to the Robot log (default 4096, 0 logs no body)
+        :param pretty_json: Pretty print JSON bodies that fit within max_body_bytes (default False)
+        :param body_dir: Directory where full bodies are appended as JSONL, one file per test,
+                         instead of bloating output.xml. An empty string disables it.
+
+        Successful requests are only formatted when the current log level includes INFO.
+        """
+        self.request_sender.set_logging_options(max_body_bytes, pretty_json, body_dir)
+        logger.info(f"API logging options: max_body_bytes={self.request_sender.log_body_max_bytes}, "
+                    f"pretty_json={self.request_sender.log_pretty_json}, "
+                    f"body_dir={self.request_sender.log_body_dir}")
 
     @keyword("Log API Request")
     def log_api_request(self, alias, method, endpoint, response):
@@ -241,21 +873,44 @@ class RobotRequestsManager:
     # Wait Methods
     @keyword("Wait Until API Status")
     def wait_until_api_status(self, method, alias, endpoint, expected_status = 200, timeout = 60, interval = 5,
-                              **kwargs):
-        """Wait until an API endpoint returns an expected status code."""
+                              backoff: float = 1.0, max_interval: float = None, jitter: float = 0.0,
+                              terminal_status = None, **kwargs):
+        """
+        Wait until an API endpoint returns an expected status code.
+
+        :param backoff: Multiplier applied to the delay after every poll (default 1, fixed interval)
+        :param max_interval: Upper bound for the delay between polls
+        :param jitter: Random +/- fraction applied to each delay, e.g. 0.1
+        :param terminal_status: Status code(s) such as "400,404" that stop the wait immediately
+
+        Sleeps never overshoot ``timeout``. Polls use If-None-Match when the server sends an ETag.
+        See `Get Last Polling Summary` for attempts, waiting time and latency percentiles.
+        """
         return self.request_sender.wait_until_status(method, alias, endpoint, expected_status,
-                                                     timeout, interval, **kwargs)
+                                                     timeout, interval, backoff, max_interval, jitter,
+                                                     terminal_status, **kwargs)
 
     @keyword("Wait Until API Response")
-    def wait_until_api_response(self, method, alias, endpoint, condition_func, timeout = 60, interval = 5, **kwargs):
-        """Wait until an API endpoint returns a response that satisfies a condition."""
+    def wait_until_api_response(self, method, alias, endpoint, condition_func, timeout = 60, interval = 5,
+                                backoff: float = 1.0, max_interval: float = None, jitter: float = 0.0,
+                                terminal_status = None, **kwargs):
+        """
+        Wait until an API endpoint returns a response that satisfies a condition.
+
+        Accepts the same polling options as `Wait Until API Status`.
+        """
         return self.request_sender.wait_until_response(method, alias, endpoint, condition_func,
-                                                       timeout, interval, **kwargs)
+                                                       timeout, interval, backoff, max_interval, jitter,
+                                                       terminal_status, **kwargs)
 
     @keyword("Wait Until JSON Path Value")
     def wait_until_json_path_value(self, method, alias, endpoint, json_path, expected_value, timeout = 60, interval = 5,
                                    **kwargs):
-        """Wait until an API endpoint returns a specific value for a JSON path."""
+        """
+        Wait until an API endpoint returns a specific value for a JSON path.
+
+        Accepts the same polling options as `Wait Until API Status`.
+        """
 
         def check_json_path_value(response):
             actual_value = self.response_handler.extract_json(response, json_path)
@@ -266,3 +921,11 @@ class RobotRequestsManager:
 
         return self.wait_until_api_response(method, alias, endpoint, check_json_path_value,
                                             timeout, interval, **kwargs)
+
+    @keyword("Get Last Polling Summary")
+    def get_last_polling_summary(self):
+        """
+        Returns a summary of the last wait keyword: outcome, attempts, not-modified polls,
+        elapsed and total sleep time, and p50/p95/max request latency in seconds.
+        """
+        return self.request_sender.last_poll_summary
@@ -0,0 +1,234 @@
+import hashlib
+import importlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List, Tuple, Union
+from urllib.parse import urlsplit
+from urllib.request import url2pathname
+from robot.api.deco import library
+
+# Keywords that constrain an array as a whole; validated once before the items
+_ARRAY_ITEM_KEYWORDS = ('items', 'prefixItems', 'additionalItems', 'unevaluatedItems', 'contains')
+
+
+@library(doc_format = 'ROBOT', auto_keywords=True)
+class SchemaValidator:
+    """
+    Validates JSON documents against JSON Schema with compiled validators that are cached.
+
+    A schema is compiled (checked and bound to its draft's validator class) once per schema file and
+    modification time or per content, and reused for every later response. All errors of a
+    document are collected into one report. Large arrays whose items share one schema are validated item
+    by item, optionally on an evenly spread sample, and validation stops once ``max_errors`` are found.
+
+    jsonschema is imported on first use, so the library works without it until a schema is validated.
+    """
+
+    def __init__(self, max_cached: int = 128, large_array_threshold: int = 1000):
+        """
+        Initialize the validator cache.
+
+        :param max_cached: Number of compiled schemas kept
+        :param large_array_threshold: Array length from which items are validated one by one
+        """
+        self.max_cached = max_cached
+        self.large_array_threshold = large_array_threshold
+        self.stats = { "compiled": 0, "cache_hits": 0, "validations": 0, "failures": 0 }
+        self._validators = OrderedDict()
+        self._lock = threading.Lock()
+        self._jsonschema = None
+
+    def validate(self, instance: Any, schema: Union[ Dict, str ], max_errors: int = 50,
+                 sample_size: Optional[ int ] = None) -> Dict:
+        """
+        Validate a document and collect its errors.
+
+        :param instance: The decoded JSON document
+        :param schema: Schema as a dictionary, a JSON string or the path of a schema file
+        :param max_errors: Stop after this many errors (0 for no limit)
+        :param sample_size: For large arrays, validate only this many evenly spread items
+        :return: Report with valid, error_count, errors (path, message, validator, schema_path),
+                 truncated, items_checked and elapsed_ms
+        """
+        start = time.perf_counter()
+        validator = self.get_validator(schema)
+        max_errors = int(max_errors or 0)
+        errors = [ ]
+        items_checked = None
+        truncated = False
+
+        items_schema = self._large_array_items(validator.schema, instance)
+        if items_schema is not None:
+            error_iter, items_checked = self._iter_array_errors(validator, instance, items_schema, sample_size)
+        else:
+            error_iter = validator.iter_errors(instance)
+        for error in error_iter:
+            if max_errors and len(errors) >= max_errors:
+                truncated = True
+                break
+            errors.append({
+                "path": self._format_path(error.absolute_path),
+                "message": error.message,
+                "validator": error.validator,
+                "schema_path": "/".join(str(part) for part in error.absolute_schema_path)
+            })
+
+        with self._lock:
+            self.stats[ "validations" ] += 1
+            if errors:
+                self.stats[ "failures" ] += 1
+        return {
+            "valid": not errors,
+            "error_count": len(errors),
+            "errors": errors,
+            "truncated": truncated,
+            "items_checked": items_checked,
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 3)
+        }
+
+    def get_validator(self, schema: Union[ Dict, str ]) -> Any:
+        """
+        Return the compiled validator of a schema, compiling it on first use.
+
+        :param schema: Schema as a dictionary, a JSON string or the path of a schema file
+        :return: A jsonschema validator instance
+        """
+        key, schema_dict, base_path = self._resolve_schema(schema)
+        with self._lock:
+            validator = self._validators.get(key)
+            if validator is not None:
+                self._validators.move_to_end(key)
+                self.stats[ "cache_hits" ] += 1
+                return validator
+
+        if schema_dict is None:
+            schema_dict = self._read_json(base_path)
+        validator = self._compile(schema_dict, base_path)
+        with self._lock:
+            self._validators[ key ] = validator
+            self.stats[ "compiled" ] += 1
+            while len(self._validators) > self.max_cached:
+                self._validators.popitem(last = False)
+        return validator
+
+    def clear(self) -> None:
+        """Drop all compiled validators."""
+        with self._lock:
+            self._validators.clear()
+
+    def get_stats(self) -> Dict:
+        """Return the compile, cache hit, validation and failure counters."""
+        with self._lock:
+            return dict(self.stats, cached = len(self._validators))
+
+    @staticmethod
+    def format_report(report: Dict) -> str:
+        """Render a validation report as one readable message."""
+        if report[ "valid" ]:
+            return f"Response matches the schema ({report[ 'elapsed_ms' ]} ms)"
+        more = " (more errors not shown)" if report[ "truncated" ] else ""
+        lines = [ f"Response does not match the schema: {report[ 'error_count' ]} error(s){more}" ]
+        lines += [ f"  - {error[ 'path' ]}: {error[ 'message' ]} [{error[ 'validator' ]}]"
+                   for error in report[ "errors" ] ]
+        return "\n".join(lines)
+
+    def _resolve_schema(self, schema: Union[ Dict, str ]) -> Tuple[ Tuple, Optional[ Dict ], Optional[ str ] ]:
+        """Return the cache key, the schema when already loaded, and the schema file path if any."""
+        if isinstance(schema, str):
+            text = schema.strip()
+            if text.startswith('{'):
+                schema = json.loads(text)
+            else:
+                path = os.path.abspath(schema)
+                # A changed file gets a new key, so edits are picked up without clearing the cache
+                return ("file", path, os.stat(path).st_mtime_ns), None, path
+        if not isinstance(schema, dict):
+            raise TypeError(f"Schema must be a dictionary, JSON string or file path, not {type(schema).__name__}")
+        # Keyed by content, not $id: a changed schema with the same $id must not reuse the old validator
+        digest = hashlib.sha1(json.dumps(schema, sort_keys = True, default = str).encode("utf-8")).hexdigest()
+        return ("content", digest), schema, None
+
+    def _compile(self, schema: Dict, base_path: Optional[ str ]) -> Any:
+        """Check a schema and create the validator of its draft, resolving file references next to it."""
+        if self._jsonschema is None:
+            try:
+                self._jsonschema = importlib.import_module("jsonschema")
+            except ImportError:
+                raise ImportError("JSON Schema validation needs the jsonschema package") from None
+        validator_class = self._jsonschema.validators.validator_for(schema)
+        validator_class.check_schema(schema)
+        kwargs = { "format_checker": validator_class.FORMAT_CHECKER }
+        registry = self._file_registry(os.path.dirname(base_path) if base_path else os.getcwd(), validator_class)
+        if registry is not None:
+            kwargs[ "registry" ] = registry
+        return validator_class(schema, **kwargs)
+
+    def _file_registry(self, base_dir: str, validator_class: Any) -> Any:
+        """Registry that loads referenced schema files relative to the schema, if referencing is installed."""
+        try:
+            referencing = importlib.import_module("referencing")
+            specifications = importlib.import_module("referencing.jsonschema")
+        except ImportError:
+            return None
+        # Referenced files without $schema use the draft of the referencing schema
+        meta_schema = validator_class.META_SCHEMA
+        specification = specifications.specification_with(meta_schema.get('$id') or meta_schema.get('id', ''),
+                                                          default = specifications.DRAFT202012)
+
+        def retrieve(uri: str) -> Any:
+            parts = urlsplit(uri)
+            if parts.scheme not in ("", "file"):
+                raise LookupError(f"Remote schema references are not loaded: {uri}")
+            path = url2pathname(parts.path)
+            if not os.path.isabs(path):
+                path = os.path.join(base_dir, path)
+            return referencing.Resource.from_contents(self._read_json(path), default_specification = specification)
+
+        return referencing.Registry(retrieve = retrieve)
+
+    @staticmethod
+    def _read_json(path: str) -> Dict:
+        with open(path, encoding = "utf-8") as file:
+            return json.load(file)
+
+    def _large_array_items(self, schema: Any, instance: Any) -> Optional[ Dict ]:
+        """Return the items schema when a large array can be validated item by item, else None."""
+        if not isinstance(instance, list) or len(instance) < self.large_array_threshold \
+                or not isinstance(schema, dict):
+            return None
+        items = schema.get('items')
+        if not isinstance(items, dict) or any(key in schema for key in _ARRAY_ITEM_KEYWORDS if key != 'items'):
+            return None
+        return items
+
+    @staticmethod
+    def _iter_array_errors(validator: Any, instance: List, items_schema: Dict,
+                           sample_size: Optional[ int ]) -> Tuple[ Any, int ]:
+        """Validate the array keywords once, then each (sampled) item, yielding errors lazily."""
+        array_schema = { key: value for key, value in validator.schema.items() if key != 'items' }
+        indexes = range(len(instance))
+        if sample_size and int(sample_size) < len(instance):
+            step = len(instance) / int(sample_size)
+            indexes = sorted({ int(position * step) for position in range(int(sample_size)) } | { len(instance) - 1 })
+
+        def errors():
+            yield from validator.descend(instance, array_schema)
+            for index in indexes:
+                yield from validator.descend(instance[ index ], items_schema, path = index, schema_path = 'items')
+
+        return errors(), len(indexes)
+
+    @staticmethod
+    def _format_path(path: Any) -> str:
+        """Render an error location as a JSONPath-like string, e.g. $.data[3].id."""
+        rendered = "$"
+        for part in path:
+            rendered += f"[{part}]" if isinstance(part, int) else f".{part}"
+        return rendered
+
+
+# Shared by all library instances, so compiled schemas survive between tests
+schema_validator = SchemaValidator()
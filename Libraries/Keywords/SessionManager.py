@@ -1,8 +1,33 @@
 import uuid
-from typing import Dict, Any, Optional
+import socket
+import requests
+from requests.adapters import HTTPAdapter, DEFAULT_POOLSIZE, DEFAULT_POOLBLOCK
+from urllib3.connection import HTTPConnection
+from typing import Dict, Any, Optional, List, Tuple
 from robot.api import logger
 from robot.libraries.BuiltIn import BuiltIn
 from robot.api.deco import keyword, library
+from RequestMetrics import instrument_session
+
+# Session parameters passed on to RequestsLibrary's Create Session
+_SESSION_PARAMS = ('auth', 'verify', 'proxies', 'timeout', 'cookies', 'max_retries', 'backoff_factor',
+                   'retry_status_list', 'retry_method_list', 'disable_warnings')
+# Parameters that configure the connection pools of the session's adapters
+_ADAPTER_PARAMS = ('pool_connections', 'pool_maxsize', 'pool_block', 'tcp_keepalive', 'keepalive_idle',
+                   'keepalive_interval', 'keepalive_count', 'socket_options')
+
+
+class SessionAdapter(HTTPAdapter):
+    """HTTPAdapter that applies socket options, such as TCP keepalive, to every new connection."""
+
+    def __init__(self, socket_options: Optional[ List[ Tuple ] ] = None, **kwargs):
+        self.socket_options = socket_options
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, connections, maxsize, block = DEFAULT_POOLBLOCK, **pool_kwargs):
+        if self.socket_options is not None:
+            pool_kwargs[ 'socket_options' ] = self.socket_options
+        super().init_poolmanager(connections, maxsize, block, **pool_kwargs)
 
 
 @library(doc_format = 'ROBOT', auto_keywords=True)
@@ -16,6 +41,7 @@ class SessionManager:
         BuiltIn().import_library('RequestsLibrary')
         self.requests_lib = BuiltIn().get_library_instance("RequestsLibrary")
         self.sessions = { }
+        self.session_stats = { }
 
     def create_session(self, alias: str, url: str, headers: Optional[ Dict ] = None, **kwargs) -> str:
         """
@@ -24,18 +50,32 @@ class SessionManager:
         :param alias: The session alias
         :param url: The base URL for the session
         :param headers: Optional dictionary of headers
-        :param kwargs: Additional parameters for RequestsLibrary
+        :param kwargs: Additional parameters for RequestsLibrary (auth, verify, proxies, timeout, cookies,
+                       max_retries, backoff_factor, retry_status_list, retry_method_list, disable_warnings),
+                       the client certificate (cert) and connection pool settings:
+            - pool_connections: Number of per-host pools to keep (default 10)
+            - pool_maxsize: Connections kept per host (default 10); size it to the request concurrency
+            - pool_block: Wait for a free connection instead of opening extra ones that are discarded later
+            - tcp_keepalive: Enable TCP keepalive probes on idle pooled connections
+            - keepalive_idle / keepalive_interval / keepalive_count: Keepalive timing (default 60s / 10s / 5)
+            - socket_options: Raw list of (level, option, value) socket options, replacing the above
         :return: The session alias
         """
         headers = headers or { }
         # Filter session-specific parameters
         session_params = { }
         for key, value in kwargs.items():
-            if key in ('auth', 'verify', 'cert', 'proxies', 'timeout'):
+            if key in _SESSION_PARAMS:
                 session_params[ key ] = value
+        adapter_params = { key: value for key, value in kwargs.items() if key in _ADAPTER_PARAMS }
+        if 'cert' in kwargs:
+            adapter_params[ 'cert' ] = kwargs[ 'cert' ]
 
         self.requests_lib.create_session(alias, url, headers = headers, **session_params)
-        self.sessions[ alias ] = { "url": url, "headers": headers, "kwargs": session_params }
+        self.sessions[ alias ] = { "url": url, "headers": headers, "kwargs": session_params,
+                                   "adapter": adapter_params }
+        self.session_stats[ alias ] = { "header_updates": 0, "recreations": 0 }
+        self._configure_session(alias, adapter_params)
         logger.info(f"Session '{alias}' created with URL: {url}")
         return alias
 
@@ -60,6 +100,7 @@ class SessionManager:
         """
         if alias in self.sessions:
             del self.sessions[ alias ]
+            self.session_stats.pop(alias, None)
             logger.info(f"Session '{alias}' deleted successfully")
             return True
         else:
@@ -69,6 +110,7 @@ class SessionManager:
     def delete_all_sessions(self) -> None:
         """Deletes all stored API sessions."""
         self.sessions.clear()
+        self.session_stats.clear()
         logger.info("All API sessions have been deleted.")
 
     def update_session_headers(self, alias: str, new_headers: Dict) -> bool:
@@ -88,9 +130,16 @@ class SessionManager:
             logger.error(f"new_headers must be a dictionary, got {type(new_headers)}")
             return False
 
-        # Remove the session from RequestsLibrary's internal cache
-        if hasattr(self.requests_lib, "_cache") and alias in self.requests_lib._cache:
-            del self.requests_lib._cache[ alias ]
+        session = self.get_session(alias)
+        if session is not None:
+            # Replace the headers on the live session so its connection pool and TLS sessions are kept
+            headers = requests.utils.default_headers()
+            headers.update(new_headers)
+            session.headers = headers
+            self.sessions[ alias ][ "headers" ] = new_headers.copy()
+            self.session_stats.setdefault(alias, { "header_updates": 0, "recreations": 0 })[ "header_updates" ] += 1
+            logger.info(f"Replaced headers for session '{alias}'")
+            return True
 
         # Retrieve session details
         url = self.sessions[ alias ][ "url" ]
@@ -98,21 +147,149 @@ class SessionManager:
                                                                          dict) else { }
 
         try:
-            # Recreate the session with the new headers
+            # The live session is gone, so recreate it with the new headers
             self.requests_lib.create_session(alias, url, headers = new_headers, **kwargs)
 
             # Update our internal tracking
+            adapter_params = self.sessions[ alias ].get("adapter", { })
             self.sessions[ alias ] = {
                 "url": url,
-                "headers": new_headers.copy() if isinstance(new_headers, dict) else { },
-                "kwargs": kwargs
+                "headers": new_headers.copy(),
+                "kwargs": kwargs,
+                "adapter": adapter_params
             }
-            logger.info(f"Replaced headers for session '{alias}'")
+            self._configure_session(alias, adapter_params)
+            self.session_stats.setdefault(alias, { "header_updates": 0, "recreations": 0 })[ "recreations" ] += 1
+            logger.info(f"Recreated session '{alias}' with new headers")
             return True
         except Exception as e:
             logger.error(f"Error updating session headers: {e}")
             return False
 
+    def _configure_session(self, alias: str, adapter_params: Dict) -> None:
+        """Mount pool-sized adapters if requested and instrument the session's connection pools."""
+        session = self.get_session(alias)
+        if session is None:
+            return
+        if adapter_params.get('cert'):
+            session.cert = adapter_params[ 'cert' ]
+
+        pool_params = { key: value for key, value in adapter_params.items() if key in _ADAPTER_PARAMS }
+        if pool_params:
+            # Keep the retry configuration RequestsLibrary set up on its adapters
+            current = session.get_adapter('https://')
+            max_retries = getattr(current, 'max_retries', 0)
+            for prefix in ('http://', 'https://'):
+                session.mount(prefix, SessionAdapter(
+                    socket_options = self._build_socket_options(pool_params),
+                    pool_connections = int(pool_params.get('pool_connections') or DEFAULT_POOLSIZE),
+                    pool_maxsize = int(pool_params.get('pool_maxsize') or DEFAULT_POOLSIZE),
+                    pool_block = self._to_bool(pool_params.get('pool_block', DEFAULT_POOLBLOCK)),
+                    max_retries = max_retries))
+            logger.info(f"Session '{alias}' connection pools: {pool_params}")
+
+        # Record DNS, connect and TLS timings and pool usage of the session's connections
+        instrument_session(session)
+
+    def _build_socket_options(self, pool_params: Dict) -> Optional[ List[ Tuple ] ]:
+        """Socket options for new connections, or None to keep the urllib3 defaults."""
+        if pool_params.get('socket_options') is not None:
+            return [ tuple(option) for option in pool_params[ 'socket_options' ] ]
+        if not self._to_bool(pool_params.get('tcp_keepalive', False)):
+            return None
+
+        options = list(HTTPConnection.default_socket_options)
+        options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+        # Keepalive timing options are platform specific (TCP_KEEPALIVE is the macOS name of TCP_KEEPIDLE)
+        idle_option = getattr(socket, 'TCP_KEEPIDLE', getattr(socket, 'TCP_KEEPALIVE', None))
+        for option, value in ((idle_option, pool_params.get('keepalive_idle', 60)),
+                              (getattr(socket, 'TCP_KEEPINTVL', None), pool_params.get('keepalive_interval', 10)),
+                              (getattr(socket, 'TCP_KEEPCNT', None), pool_params.get('keepalive_count', 5))):
+            if option is not None:
+                options.append((socket.IPPROTO_TCP, option, int(value)))
+        return options
+
+    @staticmethod
+    def _to_bool(value: Any) -> bool:
+        """Accept booleans as well as the strings Robot Framework passes for untyped arguments."""
+        if isinstance(value, str):
+            return value.strip().lower() in ('true', '1', 'yes', 'on')
+        return bool(value)
+
+    def get_session(self, alias: str) -> Optional[ requests.Session ]:
+        """
+        Get the live requests.Session object behind an alias.
+
+        :param alias: The session alias
+        :return: The session object or None if not found
+        """
+        if alias not in self.sessions:
+            return None
+        try:
+            return self.requests_lib._cache.get_connection(alias)
+        except (RuntimeError, KeyError, AttributeError):
+            return None
+
+    def get_connection_stats(self, alias: str) -> Optional[ Dict ]:
+        """
+        Report how often a session reused pooled connections versus opening new ones, and how its pools are used.
+
+        Per pool: maxsize, connections in use and idle, the peak in use, requests, new connections,
+        how often the pool was exhausted, and how many surplus connections were discarded
+        (a sign that pool_maxsize is smaller than the request concurrency).
+
+        :param alias: The session alias
+        :return: Dictionary with request, connection, header update, adapter and pool details, or None if not found
+        """
+        session = self.get_session(alias)
+        if session is None:
+            logger.warn(f"Session '{alias}' not found!")
+            return None
+
+        total_requests = 0
+        new_connections = 0
+        pools = [ ]
+        adapters = { }
+        for prefix, adapter in session.adapters.items():
+            adapters[ prefix ] = {
+                "pool_connections": getattr(adapter, '_pool_connections', None),
+                "pool_maxsize": getattr(adapter, '_pool_maxsize', None),
+                "pool_block": getattr(adapter, '_pool_block', None),
+                "tcp_keepalive": any(option[ 1 ] == socket.SO_KEEPALIVE
+                                     for option in (getattr(adapter, 'socket_options', None) or [ ]))
+            }
+            pool_manager = getattr(adapter, 'poolmanager', None)
+            if pool_manager is None:
+                continue
+            for key in list(pool_manager.pools.keys()):
+                pool = pool_manager.pools.get(key)
+                if pool is None:
+                    continue
+                total_requests += getattr(pool, 'num_requests', 0)
+                new_connections += getattr(pool, 'num_connections', 0)
+                queue = pool.pool
+                pools.append({
+                    "host": f"{pool.scheme}://{pool.host}:{pool.port}",
+                    "maxsize": queue.maxsize if queue is not None else None,
+                    "in_use": queue.maxsize - queue.qsize() if queue is not None else 0,
+                    "idle": sum(1 for conn in list(queue.queue) if conn is not None) if queue is not None else 0,
+                    "peak_in_use": getattr(pool, 'peak_in_use', None),
+                    "requests": getattr(pool, 'num_requests', 0),
+                    "new_connections": getattr(pool, 'num_connections', 0),
+                    "exhausted": getattr(pool, 'num_exhausted', None),
+                    "discarded": getattr(pool, 'num_discarded', None)
+                })
+
+        stats = dict(self.session_stats.get(alias, { "header_updates": 0, "recreations": 0 }))
+        stats.update({
+            "requests": total_requests,
+            "new_connections": new_connections,
+            "reused_connections": max(total_requests - new_connections, 0),
+            "adapters": adapters,
+            "pools": pools
+        })
+        return stats
+
     def get_session_details(self, alias: str) -> Optional[ Dict ]:
         """
         Retrieves the full details of a session.
@@ -126,16 +303,15 @@ class SessionManager:
 
         try:
             # Retrieve session object from RequestsLibrary internal cache
-            if hasattr(self.requests_lib, "_cache") and alias in self.requests_lib._cache:
-                session_object = self.requests_lib._cache[ alias ]
-            else:
+            session_object = self.get_session(alias)
+            if session_object is None:
                 logger.warn(f"Session '{alias}' not found in RequestsLibrary cache!")
                 return None
 
             # Extract session details
             session_details = {
                 "url": self.sessions[ alias ][ "url" ],
-                "headers": getattr(session_object, 'headers', None),
+                "headers": dict(session_object.headers) if getattr(session_object, 'headers', None) is not None else None,
                 "cookies": getattr(session_object, 'cookies', None).get_dict() if getattr(session_object, 'cookies',
                                                                                           None) is not None else None,
                 "timeout": getattr(session_object, 'timeout', None),
@@ -0,0 +1,293 @@
+import atexit
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from typing import Dict, Any, Optional, Callable, Tuple
+from robot.api import logger
+from robot.api.deco import library
+from robot.libraries.BuiltIn import BuiltIn, RobotNotRunningError
+
+if os.name == 'nt':
+    import msvcrt
+else:
+    import fcntl
+
+REGISTRY_FILE_NAME = "robot_api_session_registry.json"
+# Run directories live below this one in the system temp directory, never in the published results
+REGISTRY_ROOT = os.path.join(tempfile.gettempdir(), "robot_api_session_registry")
+# Run directories of finished runs are removed after this many seconds where process ids cannot be checked
+_STALE_RUN_AGE = 86400
+_registry = { "instance": None }
+_removed_at_exit = set()
+
+
+def default_registry_path() -> str:
+    """
+    Return the registry file of the current run.
+
+    Every run gets its own directory in the system temp directory, so tokens are never reused by a
+    later run or a run against another environment, and never end up in the published results. pabot
+    starts a process per suite, so its workers share the directory of the pabot process that started
+    them. Directories of runs that have ended are removed when a registry is opened, and a run outside
+    pabot removes its own directory when it ends.
+
+    :return: Absolute path of the registry file
+    """
+    try:
+        pabot = BuiltIn().get_variable_value('${PABOTQUEUEINDEX}') is not None
+    except RobotNotRunningError:
+        pabot = False
+    run_id = f"pabot-{os.getppid()}" if pabot else f"robot-{os.getpid()}"
+    _remove_stale_runs()
+    if not pabot and run_id not in _removed_at_exit:
+        _removed_at_exit.add(run_id)
+        atexit.register(_remove_run_directory, os.path.join(REGISTRY_ROOT, run_id))
+    return os.path.join(REGISTRY_ROOT, run_id, REGISTRY_FILE_NAME)
+
+
+def _remove_run_directory(directory: str) -> None:
+    shutil.rmtree(directory, ignore_errors = True)
+
+
+def _remove_stale_runs() -> None:
+    """Remove the registry directories of runs whose process has ended."""
+    try:
+        names = os.listdir(REGISTRY_ROOT)
+    except OSError:
+        return
+    for name in names:
+        directory = os.path.join(REGISTRY_ROOT, name)
+        try:
+            if os.name == 'nt':
+                # os.kill would terminate the process on Windows, so fall back to the age of the directory
+                ended = time.time() - os.stat(directory).st_mtime > _STALE_RUN_AGE
+            else:
+                ended = not _process_alive(int(name.rsplit("-", 1)[ -1 ]))
+        except (OSError, ValueError):
+            continue
+        if ended:
+            _remove_run_directory(directory)
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def get_session_registry(create: bool = True) -> Optional[ 'SessionRegistry' ]:
+    """
+    Return the shared session registry of this process.
+
+    :param create: Open the registry at the default path when none was enabled yet
+    :return: The registry, or None when it is not enabled and create is False
+    """
+    if _registry[ "instance" ] is None and create:
+        _registry[ "instance" ] = SessionRegistry()
+    return _registry[ "instance" ]
+
+
+def set_session_registry(registry: Optional[ 'SessionRegistry' ]) -> None:
+    """Use a registry for shared tokens, or stop sharing them with None."""
+    _registry[ "instance" ] = registry
+
+
+def token_key(kind: str, token: str) -> str:
+    """Registry key for what is known about a token (e.g. kind check or refresh), without the token in it."""
+    return f"{kind}:{hashlib.sha256(token.encode('utf-8')).hexdigest()[ :32 ]}"
+
+
+class _FileLock:
+    """Exclusive advisory lock on a file, held between processes (fcntl on POSIX, msvcrt on Windows)."""
+
+    def __init__(self, path: str, timeout: float):
+        self.path = path
+        self.timeout = timeout
+        self._file = None
+
+    def __enter__(self) -> '_FileLock':
+        self._file = open(self.path, "a+b")
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                if os.name == 'nt':
+                    self._file.seek(0)
+                    msvcrt.locking(self._file.fileno(), msvcrt.LK_NBLCK, 1)
+                else:
+                    fcntl.flock(self._file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return self
+            except OSError:
+                if time.monotonic() >= deadline:
+                    self._file.close()
+                    raise TimeoutError(f"Could not lock '{self.path}' within {self.timeout}s")
+                time.sleep(0.05)
+
+    def __exit__(self, *exc_info) -> None:
+        try:
+            if os.name == 'nt':
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        finally:
+            self._file.close()
+
+
+@library(doc_format = 'ROBOT', auto_keywords=True)
+class SessionRegistry:
+    """
+    Stores authentication tokens in a JSON file shared by all processes of a run, e.g. pabot workers.
+
+    Every entry has an expiry and is only returned while it is valid beyond ``refresh_margin``.
+    get_or_create holds a login lock while logging in, so when many workers need the token of the
+    same test user, one of them logs in and the others wait for and reuse its token. The file is
+    replaced atomically on every write and is readable by its owner only. Besides the file, the
+    registry only uses two lock files next to it: one for writes and one for logins.
+    """
+
+    def __init__(self, path: Optional[ str ] = None, refresh_margin: float = 30, lock_timeout: float = 60):
+        """
+        Open a registry.
+
+        :param path: JSON file shared by the workers (default: see default_registry_path)
+        :param refresh_margin: Seconds before expiry at which an entry is no longer handed out
+        :param lock_timeout: Seconds to wait for another process holding the registry or a login lock
+        """
+        self.path = os.path.abspath(path or default_registry_path())
+        self.refresh_margin = float(refresh_margin)
+        self.lock_timeout = float(lock_timeout)
+        self.stats = { "hits": 0, "misses": 0, "waits": 0, "logins": 0, "writes": 0 }
+        self._lock = threading.Lock()
+        # Parsed entries and the (inode, mtime, size) of the file they were read from
+        self._entries = { }
+        self._signature = None
+        os.makedirs(os.path.dirname(self.path), mode = 0o700, exist_ok = True)
+
+    def get(self, key: str) -> Optional[ Dict ]:
+        """
+        Return a valid entry.
+
+        :param key: Entry key; include the environment as well as the user, e.g. ``staging:admin``,
+                    when a registry file is shared by runs against different environments
+        :return: Dictionary with value and expires_at, or None when missing or about to expire
+        """
+        entry = self._read().get(key)
+        if entry is None or entry[ "expires_at" ] - self.refresh_margin <= time.time():
+            return None
+        return entry
+
+    def put(self, key: str, value: Any, expires_at: Optional[ float ] = None, ttl: float = 900) -> Dict:
+        """
+        Store an entry for all workers.
+
+        :param key: Entry key
+        :param value: JSON serializable value, e.g. a dictionary with the token
+        :param expires_at: UNIX timestamp the value expires at
+        :param ttl: Seconds the value is kept when expires_at is not known
+        :return: The stored entry
+        """
+        entry = {
+            "value": value,
+            "expires_at": float(expires_at) if expires_at else time.time() + float(ttl),
+            "stored_at": time.time(),
+            "pid": os.getpid()
+        }
+        with self._lock, _FileLock(self.path + ".lock", self.lock_timeout):
+            entries = self._load()
+            now = time.time()
+            entries = { name: item for name, item in entries.items() if item[ "expires_at" ] > now }
+            entries[ key ] = entry
+            self._write(entries)
+            self.stats[ "writes" ] += 1
+        return entry
+
+    def invalidate(self, key: str) -> None:
+        """Remove an entry, e.g. after the server rejected its token."""
+        with self._lock, _FileLock(self.path + ".lock", self.lock_timeout):
+            entries = self._load()
+            if entries.pop(key, None) is not None:
+                self._write(entries)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock, _FileLock(self.path + ".lock", self.lock_timeout):
+            self._write({ })
+
+    def get_or_create(self, key: str, factory: Callable[ [ ], Tuple[ Any, Optional[ float ] ] ],
+                      ttl: float = 900) -> Dict:
+        """
+        Return a valid entry, creating it with factory when there is none.
+
+        Only one process runs factory for a key at a time; the others wait for its result.
+
+        :param key: Entry key
+        :param factory: Returns the value and its expiry timestamp (or None to use ttl)
+        :param ttl: Seconds the value is kept when factory returns no expiry
+        :return: The entry
+        """
+        entry = self.get(key)
+        if entry is not None:
+            self.stats[ "hits" ] += 1
+            return entry
+
+        started = time.monotonic()
+        # One login at a time; logins are rare, and one lock file keeps the registry directory small
+        with _FileLock(self.path + ".login.lock", self.lock_timeout):
+            entry = self.get(key)
+            if entry is not None:
+                # Another worker logged in while this one waited
+                self.stats[ "waits" ] += 1
+                logger.debug(f"Reused '{key}' from registry after waiting {time.monotonic() - started:.2f}s")
+                return entry
+            self.stats[ "misses" ] += 1
+            value, expires_at = factory()
+            self.stats[ "logins" ] += 1
+            return self.put(key, value, expires_at, ttl)
+
+    def get_stats(self) -> Dict:
+        """Return the registry path, the number of valid entries and the hit/miss counters."""
+        now = time.time()
+        valid = sum(1 for entry in self._read().values() if entry[ "expires_at" ] - self.refresh_margin > now)
+        return dict(self.stats, path = self.path, entries = valid)
+
+    def _read(self) -> Dict[ str, Dict ]:
+        """Return the entries, parsing the file only when it changed since the last read."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return { }
+        signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            if signature != self._signature:
+                self._entries = self._load()
+                self._signature = signature
+            return self._entries
+
+    def _load(self) -> Dict[ str, Dict ]:
+        try:
+            with open(self.path, encoding = "utf-8") as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            return { }
+        except ValueError:
+            logger.warn(f"Ignoring unreadable session registry '{self.path}'")
+            return { }
+        return data.get("entries", { }) if isinstance(data, dict) else { }
+
+    def _write(self, entries: Dict[ str, Dict ]) -> None:
+        """Replace the file atomically, so readers never see a partial write. Caller holds the lock."""
+        temporary = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        descriptor = os.open(temporary, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(descriptor, "w", encoding = "utf-8") as file:
+            json.dump({ "entries": entries }, file)
+        os.replace(temporary, self.path)
+        self._entries = entries
+        self._signature = None
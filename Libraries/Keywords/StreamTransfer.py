@@ -0,0 +1,268 @@
+import hashlib
+import mimetypes
+import os
+import re
+import time
+import uuid
+from typing import Dict, Any, Optional, List, Callable, Iterable, Union
+from urllib.parse import urlparse, unquote
+from robot.libraries.BuiltIn import BuiltIn, RobotNotRunningError
+
+# Fallbacks when the Robot variables from Resources/Variables/FilePaths/Configurations.resource are not set
+_ROOT_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, os.pardir))
+_TRANSFER_DIRECTORIES = {
+    "downloads": ("${DOWNLOADS_DIRECTORY_PATH}", os.path.join(_ROOT_PATH, "Resources", "Downloads")),
+    "uploads": ("${UPLOADS_DIRECTORY_PATH}", os.path.join(_ROOT_PATH, "Resources", "Uploads"))
+}
+_FILENAME = re.compile(r'filename\*?=(?:UTF-8\'\')?"?([^";]+)"?', re.IGNORECASE)
+
+
+def get_transfer_directory(kind: str) -> str:
+    """
+    Return the downloads or uploads directory.
+
+    :param kind: downloads or uploads
+    :return: Value of ${DOWNLOADS_DIRECTORY_PATH} / ${UPLOADS_DIRECTORY_PATH}, or the matching Resources folder
+    """
+    variable, fallback = _TRANSFER_DIRECTORIES[ kind ]
+    try:
+        return BuiltIn().get_variable_value(variable) or fallback
+    except RobotNotRunningError:
+        return fallback
+
+
+def resolve_transfer_path(kind: str, path: Optional[ str ]) -> Optional[ str ]:
+    """Resolve a relative path against the downloads or uploads directory; absolute paths are kept."""
+    if not path:
+        return None
+    if os.path.isabs(path):
+        return path
+    return os.path.join(get_transfer_directory(kind), path)
+
+
+def filename_from_response(response: Any) -> str:
+    """Choose a file name from Content-Disposition or the URL, falling back to a generated name."""
+    match = _FILENAME.search(response.headers.get('Content-Disposition', ''))
+    name = unquote(match.group(1)) if match else os.path.basename(urlparse(response.url or '').path)
+    name = os.path.basename(name.replace('\\', '/'))
+    if not name:
+        extension = mimetypes.guess_extension(response.headers.get('Content-Type', '').split(';')[ 0 ].strip())
+        name = f"download_{uuid.uuid4().hex[ :8 ]}{extension or ''}"
+    return name
+
+
+class TransferProgress:
+    """
+    Reports transfer progress to a callback at most once per interval, and always at the end.
+
+    The callback is a Python callable taking (transferred_bytes, total_bytes) or the name of a
+    Robot Framework keyword called with the same two arguments.
+    """
+
+    def __init__(self, callback: Optional[ Union[ Callable, str ] ], total: Optional[ int ], interval: float = 1.0):
+        self.callback = callback
+        self.total = total
+        self.interval = float(interval)
+        self.transferred = 0
+        self._last_report = time.monotonic()
+
+    def update(self, size: int) -> None:
+        self.transferred += size
+        if self.callback and time.monotonic() - self._last_report >= self.interval:
+            self._report()
+
+    def finish(self) -> None:
+        if self.callback:
+            self._report()
+
+    def _report(self) -> None:
+        self._last_report = time.monotonic()
+        if callable(self.callback):
+            self.callback(self.transferred, self.total)
+        else:
+            BuiltIn().run_keyword(self.callback, self.transferred, self.total)
+
+
+def save_stream(response: Any, path: str, chunk_size: int = 65536, hash_algorithm: Optional[ str ] = "sha256",
+                progress: Optional[ TransferProgress ] = None) -> Dict:
+    """
+    Write a response body to a file chunk by chunk, hashing it on the way.
+
+    The body is written to a ``.part`` file that is renamed when complete, so a failed download never
+    leaves a truncated file under the final name.
+
+    :param response: A requests.Response, ideally sent with stream=True
+    :param path: Destination file
+    :param chunk_size: Bytes read per chunk
+    :param hash_algorithm: hashlib algorithm name, or None to skip hashing
+    :param progress: Progress reporter
+    :return: Dictionary with path, size, hash, algorithm and elapsed seconds
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok = True)
+    digest = hashlib.new(hash_algorithm) if hash_algorithm else None
+    temporary = f"{path}.part"
+    size = 0
+    start = time.monotonic()
+    try:
+        with open(temporary, "wb") as file:
+            for chunk in response.iter_content(chunk_size = int(chunk_size)):
+                if not chunk:
+                    continue
+                file.write(chunk)
+                if digest is not None:
+                    digest.update(chunk)
+                size += len(chunk)
+                if progress is not None:
+                    progress.update(len(chunk))
+        os.replace(temporary, path)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+    finally:
+        response.close()
+    if progress is not None:
+        progress.finish()
+
+    return {
+        "path": path,
+        "size": size,
+        "hash": digest.hexdigest() if digest is not None else None,
+        "algorithm": hash_algorithm,
+        "elapsed": round(time.monotonic() - start, 3)
+    }
+
+
+class MultipartStream:
+    """
+    A multipart/form-data body that is generated while it is sent.
+
+    File parts are read chunk by chunk from a path, an open file or an iterable of bytes, so the
+    upload is never held in memory. When every part has a known size the stream reports its length
+    and requests sends a Content-Length; otherwise the body is sent with chunked transfer encoding.
+    """
+
+    def __init__(self, fields: Optional[ Dict[ str, Any ] ] = None, files: Optional[ List[ Dict ] ] = None,
+                 chunk_size: int = 65536, progress: Optional[ TransferProgress ] = None):
+        """
+        Build the body.
+
+        :param fields: Plain form fields
+        :param files: File parts, each a dictionary with name, source (path, binary file object or
+                      iterable of bytes) and optionally filename and content_type
+        :param chunk_size: Bytes read from a source per chunk
+        :param progress: Progress reporter, updated with the file bytes sent
+        """
+        self.boundary = uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={self.boundary}"
+        self.chunk_size = int(chunk_size)
+        self.progress = progress
+        self._parts = [ ]
+        for name, value in (fields or { }).items():
+            self._parts.append((self._part_header(name, None, None), str(value).encode("utf-8"), None))
+        for part in files or [ ]:
+            source = part[ "source" ]
+            filename = part.get("filename") or (os.path.basename(source) if isinstance(source, str)
+                                                else os.path.basename(getattr(source, 'name', '') or 'file'))
+            content_type = part.get("content_type") or mimetypes.guess_type(filename)[ 0 ] \
+                or "application/octet-stream"
+            start = source.tell() if hasattr(source, 'seek') and hasattr(source, 'tell') else None
+            self._parts.append((self._part_header(part[ "name" ], filename, content_type), source, start))
+        self._length = self._compute_length()
+        self._chunks = None
+        self._buffer = b""
+
+    @property
+    def len(self) -> Optional[ int ]:
+        """Total size of the body, or None when a part is an iterable of unknown size (read by requests)."""
+        return self._length
+
+    @property
+    def rewindable(self) -> bool:
+        """Whether the body can be generated again, e.g. for a retry."""
+        return all(isinstance(source, (bytes, str)) or start is not None for _, source, start in self._parts)
+
+    def rewind(self) -> None:
+        """Start generating the body from the beginning again."""
+        if not self.rewindable:
+            raise ValueError("Multipart body with one-shot parts cannot be sent again")
+        for _, source, start in self._parts:
+            if start is not None:
+                source.seek(start)
+        self._chunks = None
+        self._buffer = b""
+        if self.progress is not None:
+            self.progress.transferred = 0
+
+    def read(self, size: int = -1) -> bytes:
+        if self._chunks is None:
+            self._chunks = self._generate()
+        while size < 0 or len(self._buffer) < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+        if size < 0:
+            data, self._buffer = self._buffer, b""
+        else:
+            data, self._buffer = self._buffer[ :size ], self._buffer[ size: ]
+        return data
+
+    def __iter__(self):
+        if self._chunks is None:
+            self._chunks = self._generate()
+        return self._chunks
+
+    def _generate(self) -> Iterable[ bytes ]:
+        for header, source, _ in self._parts:
+            yield header
+            if isinstance(source, bytes):
+                yield source
+            elif isinstance(source, str):
+                with open(source, "rb") as file:
+                    yield from self._read_chunks(file)
+            elif hasattr(source, 'read'):
+                yield from self._read_chunks(source)
+            else:
+                for chunk in source:
+                    chunk = chunk.encode("utf-8") if isinstance(chunk, str) else chunk
+                    if self.progress is not None:
+                        self.progress.update(len(chunk))
+                    yield chunk
+            yield b"\r\n"
+        yield f"--{self.boundary}--\r\n".encode()
+        if self.progress is not None:
+            self.progress.finish()
+
+    def _read_chunks(self, file: Any) -> Iterable[ bytes ]:
+        while True:
+            chunk = file.read(self.chunk_size)
+            if not chunk:
+                return
+            if self.progress is not None:
+                self.progress.update(len(chunk))
+            yield chunk
+
+    def _part_header(self, name: str, filename: Optional[ str ], content_type: Optional[ str ]) -> bytes:
+        disposition = f'form-data; name="{name}"'
+        if filename is not None:
+            disposition += f'; filename="{filename}"'
+        header = f"--{self.boundary}\r\nContent-Disposition: {disposition}\r\n"
+        if content_type:
+            header += f"Content-Type: {content_type}\r\n"
+        return (header + "\r\n").encode("utf-8")
+
+    def _compute_length(self) -> Optional[ int ]:
+        total = len(f"--{self.boundary}--\r\n")
+        for header, source, start in self._parts:
+            total += len(header) + 2
+            if isinstance(source, bytes):
+                total += len(source)
+            elif isinstance(source, str):
+                total += os.path.getsize(source)
+            elif start is not None and hasattr(source, 'fileno'):
+                total += os.fstat(source.fileno()).st_size - start
+            else:
+                return None
+        return total
@@ -1,62 +1,105 @@
+import atexit
+import time
+import threading
 import requests
 import json
-from typing import Optional, Dict
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, Callable
 from robot.api import logger
 from robot.api.deco import keyword, library
+from SessionRegistry import SessionRegistry, get_session_registry, token_key
+
+# Shared by all library instances, so known token validity, refreshed tokens and the pooled connection to
+# the token endpoint survive the per-test library scope
+_shared = {
+    "http": requests.Session(),
+    "lock": threading.Lock(),
+    "inflight": {},
+    # token -> expiry timestamp taken from auth_expires_at
+    "token_expiry": {},
+    # token -> timestamp until which a successful check is trusted
+    "validated_until": {},
+    # old token -> token issued for it by the endpoint
+    "refreshed": {},
+    "stats": {"http_calls": 0, "cache_hits": 0, "deduplicated": 0}
+}
+atexit.register(_shared["http"].close)
 
 
 @library(doc_format = 'ROBOT', auto_keywords=True)
 class TokenManager:
     """
     Manages token validation and refresh operations.
+
+    Validation results are cached per token and honor ``auth_expires_at``, so a token that is known
+    to be valid is not checked against the token endpoint again. Concurrent refreshes of the same
+    token are collapsed into a single HTTP call. The caches, counters and the connection to the token
+    endpoint are shared by all instances of the process, so they last for the whole run. When a shared SessionRegistry is enabled, checks and
+    refreshes are shared with the other processes of the run (e.g. pabot workers) as well.
     """
 
-    def __init__(self, token_endpoint: Optional[str] = None):
+    def __init__(self, token_endpoint: Optional[str] = None, refresh_margin: float = 30,
+                 validation_ttl: float = 60):
         """
         Initialize token manager.
 
         :param token_endpoint: Endpoint for token validation/refresh
+        :param refresh_margin: Seconds before expiry at which a token is treated as expired,
+                               so it is refreshed proactively
+        :param validation_ttl: Seconds a successful check is trusted when the expiry is unknown
         """
         self.token_endpoint = token_endpoint or "https://donation-platform-api.donations.uat.devops.takamol.support/sessions/refresh_token_check"
+        self.refresh_margin = refresh_margin
+        self.validation_ttl = validation_ttl
+
+        # Pooled connection to the token endpoint and the caches, shared with every other instance
+        self._http = _shared["http"]
+        self._lock = _shared["lock"]
+        self._inflight = _shared["inflight"]
+        self._token_expiry = _shared["token_expiry"]
+        self._validated_until = _shared["validated_until"]
+        self._refreshed = _shared["refreshed"]
+        self.stats = _shared["stats"]
 
     def validate_token(self, headers: Dict) -> bool:
         """
-        Validate if a token is still valid by calling the token check endpoint.
+        Validate if a token is still valid, using the cache before calling the token check endpoint.
+
+        A token whose expiry is within ``refresh_margin`` seconds is reported as invalid so that
+        callers refresh it before it actually expires.
 
         :param headers: Request headers containing the authorization token
         :return: True if token is valid, False otherwise
         """
         try:
-            if not headers or 'Authorization' not in headers:
+            auth_token = self.extract_token_from_headers(headers)
+            if not auth_token:
                 return False
 
-            auth_token = headers['Authorization']
-            if auth_token.startswith('Bearer '):
-                auth_token = auth_token[7:]  # Remove 'Bearer ' prefix
-
-            # Prepare headers for token validation request
-            validation_headers = {
-                'Content-Type': 'application/x-www-form-urlencoded',
-                'RefreshToken': auth_token
-            }
-
-            # Make a request to the token validation endpoint
-            response = requests.post(
-                self.token_endpoint,
-                headers=validation_headers,
-                timeout=10
-            )
-
-            # Check if response is successful and contains valid token data
-            if response.status_code == 200:
-                try:
-                    response_data = response.json()
-                    # Verify the response contains the expected data
-                    return 'auth_token' in response_data and 'auth_expires_at' in response_data
-                except (ValueError, json.JSONDecodeError):
-                    pass
+            now = time.time()
+            expires_at = self._token_expiry.get(auth_token)
+            if expires_at is not None:
+                self._count("cache_hits")
+                return expires_at - self.refresh_margin > now
+            if self._validated_until.get(auth_token, 0) > now:
+                self._count("cache_hits")
+                return True
 
-            return False
+            registry = get_session_registry(create=False)
+            if registry is not None:
+                return self._validate_shared(registry, auth_token)
+
+            # Check the token once, even when many callers validate it at the same time
+            response_data = self._single_flight(("check", auth_token),
+                                                lambda: self._call_token_endpoint(auth_token))
+            if not response_data or 'auth_token' not in response_data or 'auth_expires_at' not in response_data:
+                return False
+
+            expires_at = self._token_expiry.get(auth_token)
+            if expires_at is not None:
+                return expires_at - self.refresh_margin > time.time()
+            self._validated_until[ auth_token ] = time.time() + self.validation_ttl
+            return True
         except Exception as e:
             logger.error(f"Token validation error: {e}")
             return False
@@ -65,39 +108,30 @@ class TokenManager:
         """
         Attempts to refresh the token by calling the refresh token endpoint.
 
+        Concurrent refreshes of the same token share one HTTP call, and a token that was already
+        issued for the current one (for example by a previous check) is reused while it is valid.
+
         :param headers: Request headers containing the current token
         :return: New token if refresh was successful, None otherwise
         """
         try:
-            if not headers or 'Authorization' not in headers:
+            auth_token = self.extract_token_from_headers(headers)
+            if not auth_token:
                 return None
 
-            auth_header = headers['Authorization']
-            if auth_header.startswith('Bearer '):
-                auth_token = auth_header[7:]  # Remove 'Bearer ' prefix
-            else:
-                auth_token = auth_header
-
-            # Prepare headers for token refresh request
-            refresh_headers = {
-                'Content-Type': 'application/x-www-form-urlencoded',
-                'RefreshToken': auth_token
-            }
-
-            # Call refresh token endpoint
-            response = requests.post(
-                self.token_endpoint,
-                headers=refresh_headers,
-                timeout=10
-            )
-
-            if response.status_code == 200:
-                try:
-                    response_data = response.json()
-                    if 'auth_token' in response_data:
-                        return response_data['auth_token']
-                except (ValueError, json.JSONDecodeError):
-                    pass
+            new_token = self._refreshed.get(auth_token)
+            if new_token and self._is_fresh(new_token):
+                self._count("cache_hits")
+                return new_token
+
+            registry = get_session_registry(create=False)
+            if registry is not None:
+                return self._refresh_shared(registry, auth_token)
+
+            response_data = self._single_flight(("refresh", auth_token),
+                                                lambda: self._call_token_endpoint(auth_token))
+            if response_data and 'auth_token' in response_data:
+                return response_data['auth_token']
 
             logger.warn("Failed to refresh token")
             return None
@@ -119,3 +153,195 @@ class TokenManager:
         if auth_header.startswith('Bearer '):
             return auth_header[7:]  # Remove 'Bearer ' prefix
         return auth_header
+
+    def remember_token(self, token: str, expires_at: Optional[float] = None) -> None:
+        """
+        Record the expiry of a token obtained elsewhere (e.g. a login), so it is not checked again.
+
+        :param token: The token
+        :param expires_at: UNIX timestamp the token expires at; unknown expiries are trusted for validation_ttl
+        """
+        with self._lock:
+            if expires_at is not None:
+                self._token_expiry[token] = expires_at
+            else:
+                self._validated_until[token] = time.time() + self.validation_ttl
+
+    def clear_cache(self) -> None:
+        """Forget all cached token validity and refresh results of the process."""
+        with self._lock:
+            self._token_expiry.clear()
+            self._validated_until.clear()
+            self._refreshed.clear()
+
+    def _is_fresh(self, token: str) -> bool:
+        """Check whether a cached token is known to be valid beyond the refresh margin."""
+        expires_at = self._token_expiry.get(token)
+        if expires_at is None:
+            return self._validated_until.get(token, 0) > time.time()
+        return expires_at - self.refresh_margin > time.time()
+
+    def _call_token_endpoint(self, auth_token: str) -> Optional[Dict]:
+        """
+        Call the token endpoint and record what it returns.
+
+        :param auth_token: The token being checked or refreshed
+        :return: The response data if the call succeeded, None otherwise
+        """
+        # Prepare headers for token request
+        token_headers = {
+            'Content-Type': 'application/x-www-form-urlencoded',
+            'RefreshToken': auth_token
+        }
+
+        self._count("http_calls")
+        response = self._http.post(
+            self.token_endpoint,
+            headers=token_headers,
+            timeout=10
+        )
+        if response.status_code != 200:
+            return None
+
+        try:
+            response_data = response.json()
+        except (ValueError, json.JSONDecodeError):
+            return None
+        if not isinstance(response_data, dict) or 'auth_token' not in response_data:
+            return None
+
+        new_token = response_data['auth_token']
+        expires_at = self.parse_expiry(response_data.get('auth_expires_at'))
+        with self._lock:
+            self._prune()
+            if expires_at is not None:
+                self._token_expiry[new_token] = expires_at
+            if new_token != auth_token:
+                self._refreshed[auth_token] = new_token
+                if expires_at is None:
+                    self._validated_until[new_token] = time.time() + self.validation_ttl
+        return response_data
+
+    def _validate_shared(self, registry: SessionRegistry, auth_token: str) -> bool:
+        """Check a token once for all processes sharing the registry."""
+        def check():
+            response_data = self._single_flight(("check", auth_token),
+                                                lambda: self._call_token_endpoint(auth_token))
+            if not response_data or 'auth_token' not in response_data or 'auth_expires_at' not in response_data:
+                raise LookupError("Token check failed")
+            new_token = response_data['auth_token']
+            if new_token != auth_token:
+                # The check issued a new token, so the other workers can refresh without calling again
+                new_expiry = self._token_expiry.get(new_token)
+                registry.put(token_key("refresh", auth_token),
+                             {"auth_token": new_token, "expires_known": new_expiry is not None},
+                             new_expiry, self.validation_ttl)
+            expires_at = self._token_expiry.get(auth_token)
+            return {"expires_known": expires_at is not None}, expires_at
+
+        try:
+            entry = registry.get_or_create(token_key("check", auth_token), check, ttl=self.validation_ttl)
+        except LookupError:
+            return False
+        self._remember_entry(auth_token, entry)
+        return entry["expires_at"] - self.refresh_margin > time.time()
+
+    def _refresh_shared(self, registry: SessionRegistry, auth_token: str) -> Optional[str]:
+        """Refresh a token once for all processes sharing the registry; the others reuse the new token."""
+        def refresh():
+            response_data = self._single_flight(("refresh", auth_token),
+                                                lambda: self._call_token_endpoint(auth_token))
+            if not response_data or 'auth_token' not in response_data:
+                raise LookupError("Token refresh failed")
+            new_token = response_data['auth_token']
+            expires_at = self._token_expiry.get(new_token)
+            return {"auth_token": new_token, "expires_known": expires_at is not None}, expires_at
+
+        try:
+            entry = registry.get_or_create(token_key("refresh", auth_token), refresh, ttl=self.validation_ttl)
+        except LookupError:
+            logger.warn("Failed to refresh token")
+            return None
+        new_token = entry["value"]["auth_token"]
+        with self._lock:
+            self._refreshed[auth_token] = new_token
+        self._remember_entry(new_token, entry)
+        return new_token
+
+    def _remember_entry(self, token: str, entry: Dict) -> None:
+        """Copy the validity of a token from a registry entry into the local cache."""
+        with self._lock:
+            if entry["value"].get("expires_known"):
+                self._token_expiry[token] = entry["expires_at"]
+            else:
+                self._validated_until[token] = entry["expires_at"]
+
+    def _single_flight(self, key: Any, func: Callable[[], Any]) -> Any:
+        """
+        Run func once per key at a time; concurrent callers with the same key wait for and share the result.
+
+        :param key: Identifies the operation (e.g. ("refresh", token))
+        :param func: The operation to run
+        :return: The result of func
+        """
+        with self._lock:
+            flight = self._inflight.get(key)
+            is_leader = flight is None
+            if is_leader:
+                flight = {"event": threading.Event(), "result": None}
+                self._inflight[key] = flight
+            else:
+                self.stats["deduplicated"] += 1
+
+        if not is_leader:
+            flight["event"].wait(30)
+            return flight["result"]
+
+        try:
+            flight["result"] = func()
+            return flight["result"]
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight["event"].set()
+
+    def _prune(self) -> None:
+        """Drop expired cache entries once the cache grows large. Caller holds the lock."""
+        if len(self._token_expiry) + len(self._validated_until) < 1000:
+            return
+        now = time.time()
+        # Pruned in place, as the caches are shared with the other instances
+        for cache in (self._token_expiry, self._validated_until):
+            for token in [token for token, until in cache.items() if until <= now]:
+                del cache[token]
+        known = set(self._token_expiry) | set(self._validated_until)
+        for old in [old for old, new in self._refreshed.items() if new not in known]:
+            del self._refreshed[old]
+
+    def _count(self, name: str) -> None:
+        """Increment a counter; the stats are updated from batch worker threads as well."""
+        with self._lock:
+            self.stats[name] += 1
+
+    @staticmethod
+    def parse_expiry(value: Any) -> Optional[float]:
+        """
+        Convert auth_expires_at to a UNIX timestamp.
+
+        Accepts epoch seconds or milliseconds (as numbers or strings) and ISO 8601 strings.
+        """
+        if value is None or value == "":
+            return None
+        try:
+            timestamp = float(value)
+            return timestamp / 1000 if timestamp > 1e11 else timestamp
+        except (TypeError, ValueError):
+            pass
+        try:
+            parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+            if parsed.tzinfo is None:
+                parsed = parsed.replace(tzinfo=timezone.utc)
+            return parsed.timestamp()
+        except ValueError:
+            logger.debug(f"Could not parse auth_expires_at value: {value}")
+            return None